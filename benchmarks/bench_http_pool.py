@@ -0,0 +1,106 @@
+"""
+Connection-reuse benchmark of the shared Ollama HTTP pool.
+
+Runs the same sequence of evaluations against a local stub Ollama server (or a real
+one with `--url`) with:
+
+- `client_per_call`: a fresh HTTP client for every call, so every call opens a connection
+- `no_keepalive`: the shared pool with keep-alive disabled
+- `shared_pool`: the shared keep-alive pool
+
+and reports the mean/p95 latency and the number of connections opened. Against a local
+stub the savings are the TCP handshake only; against a remote HTTPS endpoint they also
+include the TLS handshake.
+
+Usage:
+    python -m benchmarks.bench_http_pool --calls 200 --concurrency 4
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import Callable, List, Optional
+
+from recruitair.api.backends import BackendPool
+from recruitair.api.http_pool import SharedHTTPPool
+from recruitair.api.model import OLlamaEvaluator
+
+from .stub_ollama import StubOllamaServer
+from .stubs import make_prompt
+
+
+def make_evaluator(url: str, http_pool: SharedHTTPPool) -> OLlamaEvaluator:
+    return OLlamaEvaluator(
+        model="dolphin3",
+        version="8b",
+        prompt_uri="prompts:/criteria-extraction/1",
+        prompt_loader=lambda uri: make_prompt(),
+        backend_pool=BackendPool([url]),
+        http_pool=http_pool,
+    )
+
+
+async def run(get_evaluator: Callable[[], OLlamaEvaluator], calls: int, concurrency: int) -> List[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def one(idx: int):
+        async with semaphore:
+            evaluator = get_evaluator()
+            start = time.perf_counter()
+            await evaluator.aevaluate(f"offer {idx}")
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(idx) for idx in range(calls)))
+    return latencies
+
+
+def main():
+    p = argparse.ArgumentParser(description="Measure connection reuse of the shared Ollama HTTP pool")
+    p.add_argument("--url", default=None, help="Ollama base URL (default: a local stub server)")
+    p.add_argument("--delay", type=float, default=0.005, help="Response delay of the stub server, in seconds")
+    p.add_argument("--calls", type=int, default=200, help="Evaluations per variant (default: 200)")
+    p.add_argument("--concurrency", type=int, default=4, help="Concurrent evaluations (default: 4)")
+    args = p.parse_args()
+
+    stub: Optional[StubOllamaServer] = None
+    if args.url is None:
+        stub = StubOllamaServer(delay=args.delay).start()
+    url = args.url or stub.url
+
+    report = {}
+    try:
+        fresh_pools: List[SharedHTTPPool] = []
+
+        def client_per_call() -> OLlamaEvaluator:
+            fresh_pools.append(SharedHTTPPool())
+            return make_evaluator(url, fresh_pools[-1])
+
+        no_keepalive_pool = SharedHTTPPool(max_keepalive_connections=0)
+        no_keepalive = make_evaluator(url, no_keepalive_pool)
+        shared_pool = SharedHTTPPool()
+        shared = make_evaluator(url, shared_pool)
+
+        variants = [
+            ("client_per_call", client_per_call, lambda: sum(pool.connections_opened for pool in fresh_pools)),
+            ("no_keepalive", lambda: no_keepalive, lambda: no_keepalive_pool.connections_opened),
+            ("shared_pool", lambda: shared, lambda: shared_pool.connections_opened),
+        ]
+        for name, get_evaluator, connections in variants:
+            latencies = asyncio.run(run(get_evaluator, args.calls, args.concurrency))
+            ordered = sorted(latencies)
+            report[name] = {
+                "mean_ms": round(statistics.mean(latencies) * 1000, 2),
+                "p95_ms": round(ordered[int(0.95 * (len(ordered) - 1))] * 1000, 2),
+                "connections_opened": connections(),
+            }
+    finally:
+        if stub is not None:
+            stub.stop()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
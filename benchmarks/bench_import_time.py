@@ -0,0 +1,147 @@
+"""
+Import-time benchmark and budget for the API and CLI entry points.
+
+Each module is imported in fresh interpreters with `python -X importtime`, keeping the
+fastest of `--repeat` runs to filter out scheduling noise. The run fails (exit code 1)
+when an import:
+
+- exceeds its time budget
+- loads more modules than its recorded baseline plus a margin; unlike the time, this count
+  does not depend on the machine's load, so it catches a new eager import reliably
+- pulls in a module that must stay lazy, such as MLflow or LangChain for `recruitair.api.main`
+
+Usage:
+    python -m benchmarks.bench_import_time
+    python -m benchmarks.bench_import_time --module recruitair.api.main --budget-ms 700 --top 15
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+import re
+import subprocess
+import sys
+from typing import Dict, List, NamedTuple, Optional
+
+PROJ_ROOT = Path(__file__).resolve().parents[1]
+
+_IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+# Modules that must not be imported as a side effect of importing each entry point
+LAZY_MODULES: Dict[str, List[str]] = {
+    "recruitair.api.main": ["mlflow", "langchain_ollama", "langchain_core", "loguru", "numpy"],
+    "recruitair.job_offers.batch_extract": ["mlflow", "langchain_ollama", "langchain_core"],
+    "recruitair.job_offers.extract_criteria": ["mlflow", "langchain_ollama", "langchain_core"],
+}
+
+# Default budgets in milliseconds, about 1.5x the recorded import times (fastest of 3 runs: api.main
+# ~470ms, the CLIs ~125ms), which leaves room for a loaded CI runner
+BUDGETS_MS: Dict[str, float] = {
+    "recruitair.api.main": 700,
+    "recruitair.job_offers.batch_extract": 200,
+    "recruitair.job_offers.extract_criteria": 200,
+}
+
+# Number of modules loaded by each import, as recorded; re-record them when an import is added on purpose.
+# numpy alone loads about 100 modules.
+BASELINE_MODULES: Dict[str, int] = {
+    "recruitair.api.main": 522,
+    "recruitair.job_offers.batch_extract": 239,
+    "recruitair.job_offers.extract_criteria": 220,
+}
+MODULES_MARGIN = 0.1
+# Runs per module; the fastest is compared against the budget
+DEFAULT_REPEAT = 3
+
+
+class ImportProfile(NamedTuple):
+    module: str
+    total_ms: float
+    # Cumulative import time of every imported module, in milliseconds
+    modules: Dict[str, float]
+
+
+def profile_import(module: str, repeat: int = 1) -> ImportProfile:
+    """Import `module` in `repeat` fresh interpreters and parse the `-X importtime` report of the fastest."""
+    profiles = [_profile_import_once(module) for _ in range(repeat)]
+    return min(profiles, key=lambda profile: profile.total_ms)
+
+
+def _profile_import_once(module: str) -> ImportProfile:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(PROJ_ROOT), os.getenv("PYTHONPATH")]))}
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    modules: Dict[str, float] = {}
+    for line in proc.stderr.splitlines():
+        match = _IMPORTTIME_RE.match(line)
+        if match:
+            modules[match.group(4)] = int(match.group(2)) / 1000
+    return ImportProfile(module=module, total_ms=modules.get(module, 0.0), modules=modules)
+
+
+def max_modules(module: str) -> Optional[int]:
+    """The most modules an import of `module` may load: its recorded baseline plus the margin."""
+    baseline = BASELINE_MODULES.get(module)
+    return None if baseline is None else int(baseline * (1 + MODULES_MARGIN))
+
+
+def check_budget(
+    profile: ImportProfile, budget_ms: float, lazy_modules: List[str], module_budget: Optional[int] = None
+) -> List[str]:
+    """Return the budget violations of an import profile (empty when it is within budget)."""
+    violations = []
+    if profile.total_ms > budget_ms:
+        violations.append(f"import {profile.module} took {profile.total_ms:.0f}ms (budget {budget_ms:.0f}ms)")
+    if module_budget is not None and len(profile.modules) > module_budget:
+        violations.append(
+            f"import {profile.module} loaded {len(profile.modules)} modules (budget {module_budget})"
+        )
+    for name in lazy_modules:
+        if name in profile.modules:
+            violations.append(f"import {profile.module} eagerly imports {name}")
+    return violations
+
+
+def main():
+    p = argparse.ArgumentParser(description="Measure import time of the entry points against a budget")
+    p.add_argument("--module", action="append", default=None, help="Module to import (repeatable)")
+    p.add_argument("--budget-ms", type=float, default=None, help="Override the time budget of every module")
+    p.add_argument("--top", type=int, default=10, help="Number of slowest imports to report per module")
+    p.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help=f"Runs per module, keeping the fastest (default: {DEFAULT_REPEAT})",
+    )
+    args = p.parse_args()
+
+    report = {}
+    violations: List[str] = []
+    for module in args.module or list(BUDGETS_MS):
+        profile = profile_import(module, repeat=args.repeat)
+        budget = args.budget_ms if args.budget_ms is not None else BUDGETS_MS.get(module, float("inf"))
+        violations += check_budget(profile, budget, LAZY_MODULES.get(module, []), max_modules(module))
+        slowest = sorted(
+            ((name, ms) for name, ms in profile.modules.items() if name != module), key=lambda x: -x[1]
+        )
+        report[module] = {
+            "total_ms": round(profile.total_ms, 1),
+            "budget_ms": budget,
+            "modules": len(profile.modules),
+            "max_modules": max_modules(module),
+            "slowest": {name: round(ms, 1) for name, ms in slowest[: args.top]},
+        }
+
+    print(json.dumps({"imports": report, "violations": violations}, indent=2))
+    if violations:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""
+Load test of the criteria-extraction API: throughput, tail latency and error rates.
+
+By default the API (`recruitair.api.main:app`) is started in this process with uvicorn,
+in front of a local stub Ollama server (see `stub_ollama.py`) and a seeded prompt
+snapshot, so no model server or MLflow is needed. Pass `--ollama-url` to put a real
+Ollama behind it, or `--api-url` to load an already running deployment instead. With
+everything in one process the stub, the API and the driver share the GIL, so absolute
+numbers are pessimistic; compare runs made the same way.
+
+Offers are replayed from `--offers` (a JSONL file such as
+data/interim/preprocessed_jobs.jsonl) or generated. The load is either closed-loop,
+`--concurrency` clients sending back to back, or open-loop, Poisson arrivals at `--rps`
+whatever the response times. Open-loop latencies are measured from the scheduled send
+time, so a stalled server is not hidden by the driver waiting for it.
+
+The report is JSON: p50/p95/p99 latency of the successful requests, throughput, status
+counts and error rate. With `--baseline` (a previous report), the run exits with status 1
+when it regresses by more than `--tolerance`.
+
+Usage:
+    python -m benchmarks.bench_load --concurrency 16 --requests 500
+    python -m benchmarks.bench_load --rps 20 --duration 30 --stub-delay 0.5 --stub-delay-sigma 0.5 \\
+        --stub-tokens-per-second 50 --output load.json
+    python -m benchmarks.bench_load --rps 20 --duration 30 --baseline load.json
+"""
+
+import argparse
+import asyncio
+from contextlib import contextmanager
+import itertools
+import json
+import os
+from pathlib import Path
+import random
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional
+
+import httpx
+
+from recruitair.config.data_preprocess_config import INTERIM_DATA_DIR
+from recruitair.job_offers.batch_extract import iter_offers
+from recruitair.job_offers.extract_criteria import SAMPLE_JOB_OFFER
+
+from .stub_ollama import StubOllamaServer
+from .stubs import make_prompt
+
+# Points the API at an MLflow server that is never contacted, the prompt comes from the seeded snapshot
+_OFFLINE_TRACKING_URI = "http://mlflow.invalid"
+# Absolute increase of the error rate tolerated by `--baseline`, on top of the relative tolerance
+ERROR_RATE_SLACK = 0.01
+
+
+class Sample(NamedTuple):
+    """Outcome of one request: its latency and HTTP status, or "transport_error"."""
+
+    latency: float
+    status: str
+
+
+def synthetic_offers(count: int, seed: Optional[int] = None) -> List[str]:
+    """Distinct offers of varied length, built from the sample offer, so the result cache never answers."""
+    rng = random.Random(seed)
+    paragraphs = [paragraph.strip() for paragraph in SAMPLE_JOB_OFFER.strip().split(".") if paragraph.strip()]
+    offers = []
+    for idx in range(count):
+        body = ". ".join(rng.choices(paragraphs, k=rng.randint(3, 12)))
+        offers.append(f"Job offer #{idx}\n\n{body}.")
+    return offers
+
+
+def load_offers(path: Optional[Path], text_field: str, limit: int, seed: Optional[int] = None) -> List[str]:
+    """Up to `limit` offers from a JSONL file, or synthetic ones when there is no file."""
+    if path is None or not path.exists():
+        if path is not None:
+            print(f"WARNING: {path} not found, using synthetic offers", file=sys.stderr)
+        return synthetic_offers(limit, seed)
+    offers = [text for _, text in itertools.islice(iter_offers(path, text_field), limit)]
+    if not offers:
+        raise ValueError(f"No offers with a '{text_field}' field in {path}")
+    return offers
+
+
+async def _send(client: httpx.AsyncClient, endpoint: str, offer: str, sent_at: float) -> Sample:
+    try:
+        response = await client.post(endpoint, json={"offer_text": offer})
+        status = str(response.status_code)
+    except httpx.HTTPError:
+        status = "transport_error"
+    return Sample(time.perf_counter() - sent_at, status)
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    offers: List[str],
+    endpoint: str = "/eval",
+    requests: Optional[int] = None,
+    duration: Optional[float] = None,
+    concurrency: int = 8,
+    rps: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> List[Sample]:
+    """
+    Send offers (cycling over `offers`) to `endpoint` until `requests` have been sent or
+    `duration` seconds have passed, closed-loop with `concurrency` clients or open-loop at `rps`.
+    """
+    if requests is None and duration is None:
+        raise ValueError("Set a number of requests, a duration or both")
+    start = time.perf_counter()
+    deadline = None if duration is None else start + duration
+    counter = itertools.count()
+
+    def next_offer() -> Optional[str]:
+        idx = next(counter)
+        if (requests is not None and idx >= requests) or (deadline is not None and time.perf_counter() >= deadline):
+            return None
+        return offers[idx % len(offers)]
+
+    if rps is None:
+        samples: List[Sample] = []
+
+        async def worker():
+            while (offer := next_offer()) is not None:
+                samples.append(await _send(client, endpoint, offer, time.perf_counter()))
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return samples
+
+    rng = random.Random(seed)
+    tasks = []
+    scheduled = start
+    while (offer := next_offer()) is not None:
+        await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+        tasks.append(asyncio.ensure_future(_send(client, endpoint, offer, scheduled)))
+        scheduled += rng.expovariate(rps)
+    return list(await asyncio.gather(*tasks))
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(samples: List[Sample], elapsed: float) -> Dict[str, Any]:
+    """Machine-readable report of a run; latencies are of the successful (2xx) requests only."""
+    ok = [sample.latency for sample in samples if sample.status.startswith("2")]
+    status_counts: Dict[str, int] = {}
+    for sample in samples:
+        status_counts[sample.status] = status_counts.get(sample.status, 0) + 1
+    latency_ms = None
+    if ok:
+        latency_ms = {
+            "p50": round(percentile(ok, 50) * 1000, 2),
+            "p95": round(percentile(ok, 95) * 1000, 2),
+            "p99": round(percentile(ok, 99) * 1000, 2),
+            "mean": round(statistics.mean(ok) * 1000, 2),
+            "max": round(max(ok) * 1000, 2),
+        }
+    return {
+        "requests": len(samples),
+        "elapsed_s": round(elapsed, 3),
+        "offered_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "throughput_rps": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(1 - len(ok) / len(samples), 4) if samples else 0.0,
+        "status_counts": dict(sorted(status_counts.items())),
+        "latency_ms": latency_ms,
+    }
+
+
+def find_regressions(report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Metrics of `report` worse than `baseline` by more than `tolerance` (relative)."""
+    regressions = []
+    if baseline.get("latency_ms") and report.get("latency_ms"):
+        for name in ("p50", "p95", "p99"):
+            before, after = baseline["latency_ms"][name], report["latency_ms"][name]
+            if after > before * (1 + tolerance):
+                regressions.append(f"latency {name} {before}ms -> {after}ms")
+    elif baseline.get("latency_ms"):
+        regressions.append("no successful requests")
+    if report["throughput_rps"] < baseline["throughput_rps"] * (1 - tolerance):
+        regressions.append(f"throughput {baseline['throughput_rps']} -> {report['throughput_rps']} rps")
+    if report["error_rate"] > baseline["error_rate"] * (1 + tolerance) + ERROR_RATE_SLACK:
+        regressions.append(f"error rate {baseline['error_rate']} -> {report['error_rate']}")
+    return regressions
+
+
+def _free_socket() -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind(("127.0.0.1", 0))
+    return sock
+
+
+def api_environment(ollama_url: str, snapshot_dir: str, result_cache: bool) -> Dict[str, str]:
+    """Settings of an API in front of `ollama_url` that loads its prompt from `snapshot_dir`."""
+    return {
+        "MLFLOW_TRACKING_URI": os.environ.get("MLFLOW_TRACKING_URI", _OFFLINE_TRACKING_URI),
+        "RECRUITAIR_OLLAMA_BASE_URL": ollama_url,
+        "RECRUITAIR_PROMPT_SNAPSHOT_DIR": snapshot_dir,
+        "RECRUITAIR_RESULT_CACHE_ENABLED": str(result_cache).lower(),
+    }
+
+
+def seed_prompt_snapshot(snapshot_dir: str, tracking_uri: str):
+    """Write the stub prompt as the snapshot of the configured prompt, so that startup never reaches MLflow."""
+    from recruitair.api.config import settings
+    from recruitair.api.prompt_cache import PromptSnapshotCache
+
+    PromptSnapshotCache(snapshot_dir, namespace=tracking_uri, loader=lambda uri: make_prompt()).load(
+        f"prompts:/{settings.prompt}/{settings.prompt_version}"
+    )
+
+
+@contextmanager
+def local_api(ollama_url: str, result_cache: bool) -> Iterator[str]:
+    """
+    Serve `recruitair.api.main:app` with uvicorn in a background thread, in front of
+    `ollama_url`, and yield its base URL once it is ready.
+    """
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        # The settings are read when the API is imported
+        os.environ.update(api_environment(ollama_url, snapshot_dir, result_cache))
+        seed_prompt_snapshot(snapshot_dir, os.environ["MLFLOW_TRACKING_URI"])
+        import uvicorn
+
+        sock = _free_socket()
+        server = uvicorn.Server(uvicorn.Config("recruitair.api.main:app", log_level="warning"))
+        thread = threading.Thread(target=server.run, kwargs={"sockets": [sock]}, name="load-test-api", daemon=True)
+        thread.start()
+        try:
+            while not server.started:
+                if not thread.is_alive():
+                    raise RuntimeError("The API failed to start")
+                time.sleep(0.05)
+            host, port = sock.getsockname()[:2]
+            api_url = f"http://{host}:{port}"
+            # Like a readiness probe, wait for the model warm-up before sending traffic
+            while httpx.get(f"{api_url}/health").status_code != 200:
+                time.sleep(0.05)
+            yield api_url
+        finally:
+            server.should_exit = True
+            thread.join()
+            sock.close()
+
+
+async def run(args: argparse.Namespace, api_url: str, offers: List[str]) -> Dict[str, Any]:
+    # Never let the driver's own connection pool be the bottleneck
+    limits = httpx.Limits(max_connections=None if args.rps else args.concurrency)
+    async with httpx.AsyncClient(base_url=api_url, limits=limits, timeout=args.timeout) as client:
+        start = time.perf_counter()
+        samples = await drive(
+            client,
+            offers,
+            endpoint=args.endpoint,
+            requests=args.requests,
+            duration=args.duration,
+            concurrency=args.concurrency,
+            rps=args.rps,
+            seed=args.seed,
+        )
+        return summarize(samples, time.perf_counter() - start)
+
+
+def main():
+    p = argparse.ArgumentParser(description="Load test the criteria-extraction API against a stub or real Ollama")
+    p.add_argument("--api-url", default=None, help="Load a running API (default: serve the app in-process)")
+    p.add_argument("--ollama-url", default=None, help="Ollama behind the in-process API (default: a stub server)")
+    p.add_argument("--endpoint", default="/eval", help="Endpoint to load (default: /eval)")
+    p.add_argument(
+        "--offers",
+        type=Path,
+        default=INTERIM_DATA_DIR / "preprocessed_jobs.jsonl",
+        help="JSONL file of offers to replay (default: INTERIM_DATA_DIR/preprocessed_jobs.jsonl, else synthetic)",
+    )
+    p.add_argument("--text-field", default="job_description", help="JSON field holding the offer text")
+    p.add_argument("--max-offers", type=int, default=1000, help="Distinct offers to replay (default: 1000)")
+    p.add_argument("--requests", type=int, default=None, help="Requests to send (default: 200 without --duration)")
+    p.add_argument("--duration", type=float, default=None, help="Seconds to send requests for")
+    p.add_argument("--concurrency", type=int, default=8, help="Closed-loop clients (default: 8)")
+    p.add_argument("--rps", type=float, default=None, help="Open-loop arrival rate, overrides --concurrency")
+    p.add_argument("--timeout", type=float, default=120, help="Client timeout per request, in seconds")
+    p.add_argument("--result-cache", action="store_true", help="Keep the API result cache enabled")
+    p.add_argument("--stub-delay", type=float, default=0.2, help="Median time to first token of the stub, in seconds")
+    p.add_argument("--stub-delay-sigma", type=float, default=0.3, help="Log-normal sigma of the stub delay")
+    p.add_argument("--stub-tokens-per-second", type=float, default=0, help="Generation speed of the stub (0: instant)")
+    p.add_argument("--stub-error-rate", type=float, default=0.0, help="Fraction of stub chats answered with a 500")
+    p.add_argument("--seed", type=int, default=0, help="Seed of the stub, the arrivals and the synthetic offers")
+    p.add_argument("--output", type=Path, default=None, help="Also write the JSON report to this file")
+    p.add_argument("--baseline", type=Path, default=None, help="Previous report to check for regressions")
+    p.add_argument("--tolerance", type=float, default=0.1, help="Relative regression tolerated (default: 0.1)")
+    args = p.parse_args()
+    if args.requests is None and args.duration is None:
+        args.requests = 200
+
+    offers = load_offers(args.offers, args.text_field, args.max_offers, args.seed)
+    stub: Optional[StubOllamaServer] = None
+    if args.api_url is None and args.ollama_url is None:
+        stub = StubOllamaServer(
+            delay=args.stub_delay,
+            delay_sigma=args.stub_delay_sigma,
+            tokens_per_second=args.stub_tokens_per_second,
+            error_rate=args.stub_error_rate,
+            seed=args.seed,
+        ).start()
+
+    try:
+        if args.api_url is not None:
+            report = asyncio.run(run(args, args.api_url, offers))
+        else:
+            with local_api(args.ollama_url or stub.url, args.result_cache) as api_url:
+                report = asyncio.run(run(args, api_url, offers))
+    finally:
+        if stub is not None:
+            stub.stop()
+
+    report["config"] = {
+        "endpoint": args.endpoint,
+        "mode": "open_loop" if args.rps else "closed_loop",
+        "concurrency": None if args.rps else args.concurrency,
+        "rps": args.rps,
+        "distinct_offers": len(offers),
+        "backend": args.api_url or args.ollama_url or "stub",
+    }
+    if stub is not None:
+        report["config"]["stub"] = {
+            "delay_s": args.stub_delay,
+            "delay_sigma": args.stub_delay_sigma,
+            "tokens_per_second": args.stub_tokens_per_second,
+            "error_rate": args.stub_error_rate,
+        }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output is not None:
+        args.output.write_text(output + "\n", encoding="utf-8")
+
+    if args.baseline is not None:
+        regressions = find_regressions(report, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Latency benchmark of long offers, extracted whole vs chunked in parallel.
+
+The model is a stub whose latency grows linearly with the offer length (a fixed
+overhead plus `--ms-per-kchar` per 1,000 characters), which is a rough model of
+prefill plus a generation that grows with the number of requirements in the offer.
+
+Usage:
+    python -m benchmarks.bench_long_offers --lengths 1000 4000 8000 10000 --repeat 20
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from typing import List
+
+from recruitair.api.chunking import ChunkedEvaluator
+from recruitair.api.model import BaseEvaluatorModel
+from recruitair.job_offers.models import KeyCriteriaResponse, KeyCriterion
+
+
+class LengthProportionalModel(BaseEvaluatorModel):
+    def __init__(self, base_s: float, s_per_kchar: float):
+        self.base_s = base_s
+        self.s_per_kchar = s_per_kchar
+
+    async def aevaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        await asyncio.sleep(self.base_s + self.s_per_kchar * len(job_offer) / 1000)
+        return KeyCriteriaResponse(key_criteria=[KeyCriterion(description=job_offer[:40], importance=50)])
+
+
+def make_offer(length: int) -> str:
+    sections = []
+    idx = 0
+    while sum(len(s) + 2 for s in sections) < length:
+        sentences = " ".join(f"Candidates need skill {idx}.{n} for this role." for n in range(8))
+        sections.append(f"Section {idx}:\n{sentences}")
+        idx += 1
+    return "\n\n".join(sections)[:length]
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def measure(model: BaseEvaluatorModel, offer: str, repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await model.aevaluate(offer)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    p = argparse.ArgumentParser(description="Measure long-offer latency with and without chunked extraction")
+    p.add_argument("--lengths", type=int, nargs="+", default=[1000, 2500, 4000, 6000, 8000, 10000])
+    p.add_argument("--repeat", type=int, default=10, help="Evaluations per length and variant (default: 10)")
+    p.add_argument("--base-ms", type=float, default=50, help="Fixed latency of each model call")
+    p.add_argument("--ms-per-kchar", type=float, default=100, help="Latency added per 1,000 offer characters")
+    p.add_argument("--threshold-chars", type=int, default=4000)
+    p.add_argument("--chunk-chars", type=int, default=2500)
+    p.add_argument("--overlap-chars", type=int, default=250)
+    args = p.parse_args()
+
+    inner = LengthProportionalModel(args.base_ms / 1000, args.ms_per_kchar / 1000)
+    chunked = ChunkedEvaluator(
+        inner, threshold_chars=args.threshold_chars, chunk_chars=args.chunk_chars, overlap_chars=args.overlap_chars
+    )
+
+    report = {}
+    for length in args.lengths:
+        offer = make_offer(length)
+        report[length] = {}
+        for name, model in (("whole", inner), ("chunked", chunked)):
+            samples = asyncio.run(measure(model, offer, args.repeat))
+            report[length][name] = {
+                "p50_ms": round(statistics.median(samples) * 1000, 1),
+                "p95_ms": round(percentile(samples, 95) * 1000, 1),
+            }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
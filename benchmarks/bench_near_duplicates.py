@@ -0,0 +1,120 @@
+"""
+Lookup latency, recall and memory of the near-duplicate MinHash index at scale.
+
+The index is filled with `--offers` offers of random words, indexed from their text, and padded
+with random signatures up to `--entries` (bulk-loaded with `add_signatures`, as a real
+index of that size would take hours to fill through the model). It is then queried with:
+
+- `reposts`: each indexed offer with a location line added and two sentences swapped,
+  which should reuse the original offer's criteria (recall)
+- `unseen`: random signatures, which should never match (false positives)
+
+and reports the p50/p95 lookup latency from text (shingling and hashing included) and
+from a precomputed signature, the recall, and the memory used by the index arrays.
+
+Usage:
+    python -m benchmarks.bench_near_duplicates --entries 1000000 --threshold 0.9
+"""
+
+import argparse
+import json
+import time
+from typing import Callable, List
+
+import numpy as np
+
+from recruitair.api.minhash import MinHashIndex
+from recruitair.job_offers.models import KeyCriteriaResponse, KeyCriterion
+
+from .bench_load import percentile
+
+
+def random_offers(count: int, rng: np.random.Generator, vocabulary: int = 20_000) -> List[str]:
+    """Offers of 10-30 sentences of random words; unlike the load test's offers, no two share sentences."""
+    offers = []
+    for idx in range(count):
+        sentences = [
+            " ".join(f"w{word}" for word in rng.integers(0, vocabulary, size=rng.integers(8, 20)))
+            for _ in range(rng.integers(10, 30))
+        ]
+        offers.append(f"Job offer #{idx}\n\n" + ". ".join(sentences) + ".")
+    return offers
+
+
+def repost(offer: str) -> str:
+    """The offer edited as a reposting would: a location line added and two sentences swapped."""
+    title, body = offer.split("\n\n", 1)
+    sentences = body.split(". ")
+    if len(sentences) > 2:
+        sentences[0], sentences[1] = sentences[1], sentences[0]
+    return f"{title} - Madrid (hybrid)\n\n" + ". ".join(sentences)
+
+
+def timed(lookup: Callable, queries: List) -> List[float]:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        lookup(query)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def latency_ms(latencies: List[float]) -> dict:
+    return {
+        "p50": round(percentile(latencies, 50) * 1000, 3),
+        "p95": round(percentile(latencies, 95) * 1000, 3),
+    }
+
+
+def main():
+    p = argparse.ArgumentParser(description="Measure lookup latency, recall and memory of the near-duplicate index")
+    p.add_argument("--entries", type=int, default=1_000_000, help="Indexed entries (default: 1000000)")
+    p.add_argument("--offers", type=int, default=2000, help="Entries indexed from offer text (default: 2000)")
+    p.add_argument("--threshold", type=float, default=0.9, help="Similarity threshold (default: 0.9)")
+    p.add_argument("--num-perm", type=int, default=64, help="MinHash signature length (default: 64)")
+    p.add_argument("--queries", type=int, default=1000, help="Queries per kind (default: 1000)")
+    args = p.parse_args()
+
+    index = MinHashIndex(threshold=args.threshold, num_perm=args.num_perm, max_entries=args.entries)
+    rng = np.random.default_rng(0)
+    start = time.perf_counter()
+    filler = KeyCriteriaResponse(key_criteria=[KeyCriterion(description="filler", importance=50)])
+    padding = max(0, args.entries - args.offers)
+    for chunk in range(0, padding, 100_000):
+        count = min(100_000, padding - chunk)
+        signatures = rng.integers(0, 2**32, size=(count, args.num_perm), dtype=np.uint64).astype(np.uint32)
+        index.add_signatures(signatures, [filler] * count)
+    offers = random_offers(args.offers, rng)
+    for idx, offer in enumerate(offers):
+        index.add(offer, KeyCriteriaResponse(key_criteria=[KeyCriterion(description=f"offer {idx}", importance=50)]))
+    build_seconds = time.perf_counter() - start
+
+    picked = rng.choice(len(offers), size=min(args.queries, len(offers)), replace=False)
+    reposts = [repost(offers[idx]) for idx in picked]
+    found = [index.lookup(text) for text in reposts]
+    recalled = sum(
+        match is not None and match[0].key_criteria[0].description == f"offer {idx}"
+        for match, idx in zip(found, picked)
+    )
+    unseen = rng.integers(0, 2**32, size=(args.queries, args.num_perm), dtype=np.uint64).astype(np.uint32)
+    false_positives = sum(index.lookup_signature(signature) is not None for signature in unseen)
+    signatures = [index.signature(text) for text in reposts]
+
+    report = {
+        "entries": len(index),
+        "bands": index.bands,
+        "rows": index.rows,
+        "build_s": round(build_seconds, 2),
+        "index_mb": round(index.nbytes / 2**20, 1),
+        "lookup_text_ms": latency_ms(timed(index.lookup, reposts)),
+        "lookup_signature_ms": latency_ms(timed(index.lookup_signature, signatures)),
+        "repost_hit_rate": round(sum(match is not None for match in found) / len(found), 3),
+        "repost_recall": round(recalled / len(found), 3),
+        "mean_repost_similarity": round(float(np.mean([m[1] for m in found if m is not None] or [0])), 3),
+        "unseen_false_positive_rate": round(false_positives / len(unseen), 4),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Overhead of the LangChain evaluator (`OLlamaEvaluator`) vs the direct-HTTP one (`OllamaHTTPEvaluator`).
+
+Both evaluators call a stub Ollama server running in its own process, so that the CPU
+time measured here is the client's only. For each client, reports:
+
+- `sync` / `async`: mean and p95 latency and CPU time per call (sequential sync calls,
+  and async calls `--concurrency` at a time)
+- `peak_kib_per_call`: peak Python memory allocated during one call
+- `import`: time to import the client library in a fresh interpreter, and the resident
+  memory of that interpreter afterwards
+
+Usage:
+    python -m benchmarks.bench_ollama_clients --calls 500 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Type
+
+from recruitair.api.backends import BackendPool
+from recruitair.api.http_pool import SharedHTTPPool
+from recruitair.api.model import OLlamaEvaluator
+from recruitair.api.ollama_http import OllamaHTTPEvaluator
+
+from .bench_import_time import PROJ_ROOT, profile_import
+from .bench_workers import _serve_stub
+from .stubs import make_prompt
+
+CLIENTS: Dict[str, Type[OLlamaEvaluator]] = {"langchain": OLlamaEvaluator, "http": OllamaHTTPEvaluator}
+# The library each client needs on top of the API itself
+LIBRARIES = {"langchain": "langchain_ollama", "http": "httpx"}
+
+
+def _latency_ms(latencies: List[float]) -> Dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "mean": round(statistics.fmean(ordered) * 1000, 3),
+        "p95": round(ordered[int(0.95 * (len(ordered) - 1))] * 1000, 3),
+    }
+
+
+def measure_sync(evaluator: OLlamaEvaluator, calls: int) -> Dict[str, Any]:
+    latencies = []
+    cpu = time.process_time()
+    for idx in range(calls):
+        start = time.perf_counter()
+        evaluator.evaluate(f"offer {idx}")
+        latencies.append(time.perf_counter() - start)
+    cpu = time.process_time() - cpu
+    return {"latency_ms": _latency_ms(latencies), "cpu_us_per_call": round(cpu / calls * 1e6, 1)}
+
+
+def measure_async(evaluator: OLlamaEvaluator, calls: int, concurrency: int) -> Dict[str, Any]:
+    async def run() -> List[float]:
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies: List[float] = []
+
+        async def one(idx: int):
+            async with semaphore:
+                start = time.perf_counter()
+                await evaluator.aevaluate(f"offer {idx}")
+                latencies.append(time.perf_counter() - start)
+
+        await asyncio.gather(*(one(idx) for idx in range(calls)))
+        return latencies
+
+    cpu = time.process_time()
+    latencies = asyncio.run(run())
+    cpu = time.process_time() - cpu
+    return {"latency_ms": _latency_ms(latencies), "cpu_us_per_call": round(cpu / calls * 1e6, 1)}
+
+
+def peak_kib(fn: Callable[[], object]) -> float:
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return round(peak / 1024, 1)
+
+
+# Current resident memory; the max RSS (getrusage) would include that of the parent forking the interpreter
+_PRINT_RSS_KIB = "print(next(line.split()[1] for line in open('/proc/self/status') if line.startswith('VmRSS')))"
+
+
+def measure_import(library: str) -> Dict[str, float]:
+    rss = subprocess.run(
+        [sys.executable, "-c", f"import {library}; {_PRINT_RSS_KIB}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={**os.environ, "PYTHONPATH": str(PROJ_ROOT)},
+    )
+    return {"ms": round(profile_import(library).total_ms, 1), "rss_mib": round(int(rss.stdout) / 1024, 1)}
+
+
+def main():
+    p = argparse.ArgumentParser(description="Compare the overhead of the LangChain and direct-HTTP Ollama clients")
+    p.add_argument("--calls", type=int, default=500, help="Calls per client and mode (default: 500)")
+    p.add_argument("--concurrency", type=int, default=8, help="Concurrent async calls (default: 8)")
+    p.add_argument("--stub-delay", type=float, default=0.0, help="Response delay of the stub Ollama, in seconds")
+    args = p.parse_args()
+
+    urls: "multiprocessing.Queue[str]" = multiprocessing.Queue()
+    stub = multiprocessing.Process(target=_serve_stub, args=(urls, args.stub_delay), daemon=True)
+    stub.start()
+    report: Dict[str, Any] = {}
+    try:
+        url = urls.get(timeout=30)
+        for name, evaluator_class in CLIENTS.items():
+            evaluator = evaluator_class(
+                model="dolphin3",
+                version="8b",
+                prompt_uri="prompts:/criteria-extraction/1",
+                prompt_loader=lambda uri: make_prompt(),
+                backend_pool=BackendPool([url]),
+                http_pool=SharedHTTPPool(),
+            )
+            # Warm the connections and lazy imports up before measuring
+            for idx in range(20):
+                evaluator.evaluate(f"warm-up {idx}")
+            report[name] = {
+                "sync": measure_sync(evaluator, args.calls),
+                "async": measure_async(evaluator, args.calls, args.concurrency),
+                "peak_kib_per_call": peak_kib(lambda: evaluator.evaluate("offer")),
+                "import": measure_import(LIBRARIES[name]),
+            }
+    finally:
+        stub.terminate()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Startup-time benchmark of OLlamaEvaluator with and without a warm prompt snapshot.
+
+By default MLflow is simulated by a loader that sleeps `--mlflow-latency` seconds before
+returning the prompt. Pass `--tracking-uri` to load the real prompt from an MLflow server.
+
+Usage:
+    python -m benchmarks.bench_prompt_snapshot --mlflow-latency 1.5 --repeat 5
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+
+from recruitair.api.model import OLlamaEvaluator
+from recruitair.api.prompt_cache import PromptSnapshotCache
+
+from .stubs import make_prompt
+
+
+def main():
+    p = argparse.ArgumentParser(description="Measure evaluator startup with cold and warm prompt snapshots")
+    p.add_argument("--mlflow-latency", type=float, default=1.5, help="Simulated MLflow load latency in seconds")
+    p.add_argument("--tracking-uri", default=None, help="Load the prompt from this MLflow server instead")
+    p.add_argument("--prompt-uri", default="prompts:/criteria-extraction/1", help="Prompt URI to load")
+    p.add_argument("--repeat", type=int, default=5, help="Startups measured per variant (default: 5)")
+    args = p.parse_args()
+
+    if args.tracking_uri:
+        import mlflow
+
+        mlflow.set_tracking_uri(args.tracking_uri)
+        loader = mlflow.genai.load_prompt
+    else:
+
+        def loader(prompt_uri: str):
+            time.sleep(args.mlflow_latency)
+            return make_prompt()
+
+    def startup(prompt_loader) -> float:
+        start = time.perf_counter()
+        OLlamaEvaluator(model="dolphin3", version="8b", prompt_uri=args.prompt_uri, prompt_loader=prompt_loader)
+        return time.perf_counter() - start
+
+    results = {}
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        results["no_snapshot"] = [startup(loader) for _ in range(args.repeat)]
+
+        cold = []
+        for idx in range(args.repeat):
+            cache = PromptSnapshotCache(f"{snapshot_dir}/cold-{idx}", namespace=args.tracking_uri or "", loader=loader)
+            cold.append(startup(cache.load))
+        results["cold_snapshot"] = cold
+
+        warm_cache = PromptSnapshotCache(f"{snapshot_dir}/warm", namespace=args.tracking_uri or "", loader=loader)
+        warm_cache.load(args.prompt_uri)
+        results["warm_snapshot"] = [startup(warm_cache.load) for _ in range(args.repeat)]
+
+    summary = {
+        name: {"median_s": statistics.median(samples), "max_s": max(samples)} for name, samples in results.items()
+    }
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Per-response CPU time and allocations of the /eval success path, by number of criteria.
+
+For responses of 5, 20 and 50 criteria, measures:
+
+- `decode`: validating the Ollama JSON into `KeyCriteriaResponse` (shared by both paths)
+- `pydantic_response`: the previous path, rebuilding `EvalResponse.CriteriaItem` models in a
+  loop and letting FastAPI validate and serialize them again through the `response_model`
+- `compact_response`: building the items as dicts in one pass and rendering them with orjson
+  in a `CompactJSONResponse`
+
+Usage:
+    python -m benchmarks.bench_response_path --iterations 20000
+"""
+
+import argparse
+import json
+
+from fastapi.routing import APIRoute
+
+from recruitair.api.main import app
+from recruitair.api.responses import CompactJSONResponse, criteria_items
+from recruitair.api.schemas import EvalResponse
+from recruitair.job_offers.models import KeyCriteriaResponse
+
+from .bench_structured_chain import _measure
+
+
+def ollama_output(criteria: int) -> str:
+    return json.dumps(
+        {
+            "key_criteria": [
+                {"description": f"At least {idx} years of experience with Python and SQL", "importance": idx % 101}
+                for idx in range(criteria)
+            ]
+        }
+    )
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark per-response CPU time and allocations of the /eval response")
+    p.add_argument("--iterations", type=int, default=20000, help="Calls per variant (default: 20000)")
+    p.add_argument("--criteria", type=int, nargs="+", default=[5, 20, 50], help="Criteria per response")
+    args = p.parse_args()
+
+    route = next(r for r in app.routes if isinstance(r, APIRoute) and r.path == "/eval")
+    field = route.response_field
+
+    def pydantic_response(response: KeyCriteriaResponse) -> bytes:
+        content = EvalResponse(
+            criteria=[
+                EvalResponse.CriteriaItem(description=c.description, importance=c.importance / 100)
+                for c in response.key_criteria
+            ]
+        )
+        # What FastAPI does with the returned model for an endpoint with a response_model
+        value, _ = field.validate(content, {}, loc=("response",))
+        return field.serialize_json(value)
+
+    report = {}
+    for criteria in args.criteria:
+        document = ollama_output(criteria)
+        response = KeyCriteriaResponse.model_validate_json(document)
+        assert json.loads(pydantic_response(response)) == json.loads(
+            CompactJSONResponse({"criteria": criteria_items(response)}).body
+        )
+        report[criteria] = {
+            "decode": _measure(lambda: KeyCriteriaResponse.model_validate_json(document), args.iterations),
+            "pydantic_response": _measure(lambda: pydantic_response(response), args.iterations),
+            "compact_response": _measure(
+                lambda: CompactJSONResponse({"criteria": criteria_items(response)}).body, args.iterations
+            ),
+        }
+        for variant in report[criteria].values():
+            variant["us_per_call"] = round(variant.pop("ms_per_call") * 1000, 2)
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Micro-benchmark of the per-request Python overhead of OLlamaEvaluator.
+
+Compares rebuilding the structured-output runnable and regex-formatting the MLflow
+prompt on every call (the original hot path) against the chain and compiled prompt
+built once, and against the schema-bound model streamed and validated straight from
+the JSON text, as `OLlamaEvaluator` does now to time each stage. Ollama is replaced by
+a stub chat model, so the numbers only measure client-side overhead.
+
+Usage:
+    python -m benchmarks.bench_structured_chain --iterations 2000
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+from typing import Callable
+
+from recruitair.api.prompts import CompiledPrompt
+from recruitair.job_offers.models import KeyCriteriaResponse
+
+from .stubs import StubChatOllama, make_prompt
+
+OFFER = "We are looking for a Software Engineer with experience in Python and machine learning. " * 10
+
+
+def _measure(fn: Callable[[], object], iterations: int) -> dict:
+    for _ in range(min(50, iterations)):
+        fn()
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    before = tracemalloc.take_snapshot()
+    fn()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    retained_blocks = sum(stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0)
+
+    return {
+        "ms_per_call": elapsed / iterations * 1000,
+        "peak_kib_per_call": peak / 1024,
+        "retained_blocks_per_call": retained_blocks,
+    }
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark per-call overhead of the structured-output chain")
+    p.add_argument("--iterations", type=int, default=2000, help="Calls per variant (default: 2000)")
+    args = p.parse_args()
+
+    llm = StubChatOllama(model="dolphin3:8b", temperature=0)
+    prompt = make_prompt()
+
+    def per_request_chain():
+        response = llm.with_structured_output(prompt.response_format, method="json_schema").invoke(
+            prompt.format(job_offer_text=OFFER)
+        )
+        return KeyCriteriaResponse.model_validate(response)
+
+    chain = llm.with_structured_output(prompt.response_format, method="json_schema")
+    compiled = CompiledPrompt.from_prompt_version(prompt)
+
+    def prebuilt_chain():
+        return KeyCriteriaResponse.model_validate(chain.invoke(compiled.format(job_offer_text=OFFER)))
+
+    json_llm = llm.bind(format=prompt.response_format)
+
+    def streamed():
+        pieces = [chunk.text for chunk in json_llm.stream(compiled.format(job_offer_text=OFFER))]
+        return KeyCriteriaResponse.model_validate_json("".join(pieces))
+
+    results = {
+        "before": _measure(per_request_chain, args.iterations),
+        "after": _measure(prebuilt_chain, args.iterations),
+        "streamed": _measure(streamed, args.iterations),
+    }
+    results["saved_ms_per_call"] = results["before"]["ms_per_call"] - results["after"]["ms_per_call"]
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Throughput scaling of the API with the number of gunicorn worker processes.
+
+For each worker count, the API is served by gunicorn with `recruitair.api.gunicorn_conf`
+in front of a stub Ollama server running in its own process, and loaded closed-loop by
+the `bench_load` driver. The report gives the throughput and latency per worker count,
+the speedup over the first count, and checks that `/metrics` counted every request of
+every worker. The stub answers almost instantly by default, so the API's own CPU time is
+the bottleneck; scaling stops at the number of cores.
+
+Usage:
+    python -m benchmarks.bench_workers --workers 1 2 4 --requests 2000 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import httpx
+
+from .bench_load import _free_socket, api_environment, drive, seed_prompt_snapshot, summarize, synthetic_offers
+from .stub_ollama import StubOllamaServer
+
+
+def _serve_stub(urls: "multiprocessing.Queue[str]", delay: float):
+    with StubOllamaServer(delay=delay) as stub:
+        urls.put(stub.url)
+        # Serve until the benchmark terminates this process
+        while True:
+            time.sleep(3600)
+
+
+def _requests_counted(api_url: str) -> float:
+    text = httpx.get(f"{api_url}/metrics").text
+    for line in text.splitlines():
+        if line.startswith("recruitair_eval_requests_total "):
+            return float(line.split()[1])
+    return 0.0
+
+
+async def _load(api_url: str, offers: List[str], requests: int, concurrency: int) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=api_url, limits=limits, timeout=120) as client:
+        # Warm every worker's evaluator and connections before measuring
+        await drive(client, offers, requests=concurrency * 4, concurrency=concurrency)
+        start = time.perf_counter()
+        samples = await drive(client, offers, requests=requests, concurrency=concurrency)
+        return summarize(samples, time.perf_counter() - start)
+
+
+def measure(workers: int, env: Dict[str, str], offers: List[str], requests: int, concurrency: int) -> Dict[str, Any]:
+    sock = _free_socket()
+    host, port = sock.getsockname()[:2]
+    # Let gunicorn bind the port itself
+    sock.close()
+    api_url = f"http://{host}:{port}"
+    server_env = os.environ | env | {"RECRUITAIR_WORKERS": str(workers), "RECRUITAIR_BIND": f"{host}:{port}"}
+    with tempfile.TemporaryDirectory() as metrics_dir:
+        server_env["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+        server = subprocess.Popen(
+            [sys.executable, "-m", "gunicorn", "recruitair.api.main:app", "-c", "python:recruitair.api.gunicorn_conf"],
+            env=server_env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            for _ in range(600):
+                try:
+                    if httpx.get(f"{api_url}/health").status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                if server.poll() is not None:
+                    raise RuntimeError("gunicorn exited during startup")
+                time.sleep(0.1)
+            else:
+                raise RuntimeError("gunicorn did not start in time")
+            report = asyncio.run(_load(api_url, offers, requests, concurrency))
+            # Warm-up and measured requests, all of them whichever worker answers the scrape
+            report["requests_counted_by_metrics"] = _requests_counted(api_url)
+            report["requests_sent"] = requests + concurrency * 4
+        finally:
+            server.terminate()
+            server.wait(timeout=60)
+    return report
+
+
+def main():
+    p = argparse.ArgumentParser(description="Measure API throughput scaling with the number of worker processes")
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Worker counts to measure")
+    p.add_argument("--requests", type=int, default=1000, help="Measured requests per worker count (default: 1000)")
+    p.add_argument("--concurrency", type=int, default=32, help="Closed-loop clients (default: 32)")
+    p.add_argument("--stub-delay", type=float, default=0.0, help="Response delay of the stub Ollama, in seconds")
+    args = p.parse_args()
+
+    urls: "multiprocessing.Queue[str]" = multiprocessing.Queue()
+    stub = multiprocessing.Process(target=_serve_stub, args=(urls, args.stub_delay), daemon=True)
+    stub.start()
+    report: Dict[str, Any] = {"cpu_count": os.cpu_count(), "runs": {}}
+    try:
+        with tempfile.TemporaryDirectory() as snapshot_dir:
+            env = api_environment(urls.get(timeout=30), snapshot_dir, result_cache=False)
+            seed_prompt_snapshot(snapshot_dir, env["MLFLOW_TRACKING_URI"])
+            offers = synthetic_offers(args.requests)
+            for workers in args.workers:
+                report["runs"][workers] = measure(workers, env, offers, args.requests, args.concurrency)
+    finally:
+        stub.terminate()
+
+    baseline = report["runs"][args.workers[0]]["throughput_rps"]
+    for run in report["runs"].values():
+        run["speedup"] = round(run["throughput_rps"] / baseline, 2) if baseline else None
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+A stub Ollama HTTP server, for exercising the real HTTP client path without a model.
+
+It implements the subset of the Ollama API used by the evaluator (`POST /api/chat`,
+streamed or not, and `GET /api/version` for health checks) and answers every chat with
+a fixed structured response. The time to first token follows a log-normal distribution
+around `delay`, the response is generated at `tokens_per_second`, and a fraction
+`error_rate` of the chats fail with a 500, so load tests can see realistic tails.
+
+Usage:
+    with StubOllamaServer(delay=0.1) as server:
+        OLlamaEvaluator(..., ollama_base_url=server.url)
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import math
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from .stubs import RESPONSE_CONTENT
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "_Server"
+    protocol_version = "HTTP/1.1"
+    # Kept-alive connections would otherwise stall on delayed ACKs between the small writes
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):  # pylint: disable=W0622
+        pass
+
+    def _send_json(self, status: int, body: Dict[str, Any]):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):  # pylint: disable=C0103
+        stub = self.server.stub
+        if stub.failing:
+            self._send_json(500, {"error": "stub backend is failing"})
+        elif self.path == "/api/version":
+            self._send_json(200, {"version": "0.0.0-stub"})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):  # pylint: disable=C0103
+        stub = self.server.stub
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        if self.path != "/api/chat":
+            self._send_json(404, {"error": "not found"})
+            return
+        with stub.lock:
+            stub.requests.append(body)
+            stub.in_flight += 1
+            stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+        try:
+            delay, fail = stub.sample()
+            time.sleep(delay)
+            if stub.failing or fail:
+                self._send_json(500, {"error": "stub backend is failing"})
+            elif body.get("stream", True):
+                self._stream_chat(body, delay)
+            else:
+                time.sleep(stub.generation_seconds())
+                self._send_json(200, stub.chat_parts(body.get("model", ""), delay)[-1] | {"message": stub.message()})
+        finally:
+            with stub.lock:
+                stub.in_flight -= 1
+
+    def _stream_chat(self, body: Dict[str, Any], delay: float):
+        stub = self.server.stub
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        parts = stub.chat_parts(body.get("model", ""), delay)
+        for part in parts:
+            # Pace the pieces like tokens coming out of the model
+            time.sleep(stub.generation_seconds() / len(parts))
+            line = json.dumps(part).encode("utf-8") + b"\n"
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(line), line))
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    stub: "StubOllamaServer"
+
+
+class StubOllamaServer:
+    """
+    Threaded stub Ollama server listening on a free local port.
+
+    `delay` is the median time to first token and `delay_sigma` the standard deviation
+    of its logarithm (0 for a fixed delay). `tokens_per_second` paces the generation of
+    the response (0 for instant), and `error_rate` is the probability of a 500 answer.
+    `seed` makes the latencies and errors reproducible.
+    """
+
+    def __init__(
+        self,
+        delay: float = 0.0,
+        content: str = RESPONSE_CONTENT,
+        chunk_chars: int = 0,
+        port: int = 0,
+        delay_sigma: float = 0.0,
+        tokens_per_second: float = 0.0,
+        error_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.delay = delay
+        self.content = content
+        self.chunk_chars = chunk_chars
+        self.delay_sigma = delay_sigma
+        self.tokens_per_second = tokens_per_second
+        self.error_rate = error_rate
+        self.failing = False
+        self._rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests: List[Dict[str, Any]] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._port = port
+        self._server: Optional[_Server] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        assert self._server is not None, "server is not running"
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def message(self) -> Dict[str, str]:
+        return {"role": "assistant", "content": self.content}
+
+    @property
+    def eval_count(self) -> int:
+        """Tokens in the response, at roughly 4 characters per token."""
+        return max(1, math.ceil(len(self.content) / 4))
+
+    def generation_seconds(self) -> float:
+        return self.eval_count / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    def sample(self) -> Tuple[float, bool]:
+        """Draw the time to first token and whether the chat fails, for one request."""
+        with self.lock:
+            delay = self.delay
+            if self.delay_sigma and self.delay:
+                delay = self._rng.lognormvariate(math.log(self.delay), self.delay_sigma)
+            return delay, self._rng.random() < self.error_rate
+
+    def chat_parts(self, model: str, delay: Optional[float] = None) -> List[Dict[str, Any]]:
+        prompt_seconds = self.delay if delay is None else delay
+        step = self.chunk_chars or len(self.content)
+        pieces = [self.content[i : i + step] for i in range(0, len(self.content), step)] or [""]
+        parts: List[Dict[str, Any]] = [
+            {"model": model, "message": {"role": "assistant", "content": piece}, "done": False}
+            for piece in pieces[:-1]
+        ]
+        parts.append(
+            {
+                "model": model,
+                "message": {"role": "assistant", "content": pieces[-1]},
+                "done": True,
+                "done_reason": "stop",
+                "total_duration": int((prompt_seconds + self.generation_seconds()) * 1e9),
+                "prompt_eval_count": 20,
+                "prompt_eval_duration": int(prompt_seconds * 1e9),
+                "eval_count": self.eval_count,
+                "eval_duration": int(self.generation_seconds() * 1e9),
+            }
+        )
+        return parts
+
+    def start(self) -> "StubOllamaServer":
+        self._server = _Server(("127.0.0.1", self._port), _Handler)
+        self._server.stub = self
+        # Keep the port across restarts, to simulate a backend going down and coming back
+        self._port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, kwargs={"poll_interval": 0.05}, name="stub-ollama", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "StubOllamaServer":
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
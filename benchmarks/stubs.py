@@ -0,0 +1,78 @@
+"""Stand-ins for Ollama and MLflow used by the benchmarks and the test-suite."""
+
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, ClassVar, Iterator
+
+from langchain_ollama import ChatOllama
+from mlflow.entities.model_registry import PromptVersion
+
+from recruitair.job_offers.models import KeyCriteriaResponse
+
+PROMPT_TEMPLATE = "Extract the key criteria of this job offer:\n{{ job_offer_text }}"
+RESPONSE_CONTENT = json.dumps({"key_criteria": [{"description": "Python programming", "importance": 80}]})
+
+
+def make_prompt(template: str = PROMPT_TEMPLATE) -> PromptVersion:
+    """Build the criteria-extraction prompt locally, without an MLflow server."""
+    return PromptVersion(
+        "criteria-extraction",
+        1,
+        template,
+        response_format=KeyCriteriaResponse.model_json_schema(),
+    )
+
+
+class StubChatOllama(ChatOllama):
+    """ChatOllama that answers with a fixed structured response instead of calling Ollama."""
+
+    delay: float = 0.0
+    content: str = RESPONSE_CONTENT
+    chunk_chars: int = 0
+    """If set, stream the content in pieces of this many characters, like Ollama streams tokens."""
+    in_flight: ClassVar[int] = 0
+    max_in_flight: ClassVar[int] = 0
+    requests: ClassVar[list[dict[str, Any]]] = []
+
+    @classmethod
+    def reset(cls) -> None:
+        cls.in_flight = 0
+        cls.max_in_flight = 0
+        cls.requests = []
+
+    def _responses(self, messages, stop, **kwargs) -> list[dict[str, Any]]:
+        StubChatOllama.requests.append(self._chat_params(messages, stop, **kwargs))
+        step = self.chunk_chars or len(self.content)
+        pieces = [self.content[i : i + step] for i in range(0, len(self.content), step)]
+        parts: list[dict[str, Any]] = [
+            {"model": self.model, "message": {"role": "assistant", "content": piece}, "done": False}
+            for piece in pieces[:-1]
+        ]
+        parts.append(
+            {
+                "model": self.model,
+                "message": {"role": "assistant", "content": pieces[-1] if pieces else ""},
+                "done": True,
+                "done_reason": "stop",
+                "prompt_eval_count": 20,
+                "eval_count": len(pieces),
+            }
+        )
+        return parts
+
+    def _create_chat_stream(self, messages, stop=None, **kwargs) -> Iterator[dict[str, Any]]:
+        if self.delay:
+            time.sleep(self.delay)
+        yield from self._responses(messages, stop, **kwargs)
+
+    async def _acreate_chat_stream(self, messages, stop=None, **kwargs) -> AsyncIterator[dict[str, Any]]:
+        cls = StubChatOllama
+        cls.in_flight += 1
+        cls.max_in_flight = max(cls.max_in_flight, cls.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+            for part in self._responses(messages, stop, **kwargs):
+                yield part
+        finally:
+            cls.in_flight -= 1
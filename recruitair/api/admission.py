@@ -0,0 +1,289 @@
+"""
+Admission control and priority scheduling of model evaluations.
+
+At most `max_in_flight` evaluations run at once; the others wait in a bounded FIFO
+queue per priority lane (e.g. interactive recruiter requests vs bulk backfills).
+Free slots are handed to the lanes by strict priority or weighted round-robin, and a
+lane can reserve slots that other lanes never use. Requests that would overflow their
+queue, or that would wait longer than their lane allows, are rejected right away with
+a `Retry-After` hint instead of queueing until the client times out.
+"""
+
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+import math
+import time
+from typing import AsyncIterator, Callable, Deque, Dict, Iterator, NamedTuple, Optional
+
+from recruitair.job_offers.models import KeyCriteriaResponse, KeyCriterion
+
+from .deadlines import remaining_time
+from .model import BaseEvaluatorModel
+from .monitoring import (
+    ADMISSION_IN_FLIGHT,
+    ADMISSION_LANE_LATENCY_SECONDS,
+    ADMISSION_QUEUE_DEPTH,
+    ADMISSION_QUEUE_WAIT_SECONDS,
+    ADMISSION_REJECTED_TOTAL,
+)
+
+INTERACTIVE_LANE = "interactive"
+BULK_LANE = "bulk"
+
+# Weight of the latest evaluation in the moving average of service times
+_EWMA_ALPHA = 0.2
+
+_current_lane: ContextVar[Optional[str]] = ContextVar("recruitair_priority_lane", default=None)
+
+
+@contextmanager
+def lane_scope(lane: str) -> Iterator[None]:
+    """Run the block's evaluations in the priority lane `lane`."""
+    token = _current_lane.set(lane)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+class LaneConfig(NamedTuple):
+    """Scheduling parameters of one priority lane."""
+
+    # Share of the free slots under weighted round-robin; the order of the lanes sets strict priority
+    weight: int = 1
+    # Slots that only this lane may use
+    reserved: int = 0
+    max_queue_depth: int = 64
+    max_queue_wait_seconds: float = 3.0
+
+
+class AdmissionRejected(Exception):
+    """Raised when an evaluation is shed instead of queued."""
+
+    def __init__(self, status_code: int, reason: str, retry_after: int):
+        super().__init__(f"Evaluation rejected ({reason}), retry after {retry_after}s")
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter(NamedTuple):
+    future: asyncio.Future
+    lane: str
+
+
+class AdmissionController:
+    """
+    Bounded-queue admission of concurrent evaluations, for a single event loop.
+
+    A full queue is answered with 429 (the client is sending too much), and a queue
+    wait over the lane's limit, observed or predicted from the average service time,
+    with 503 (the service is saturated). The wait limit is shortened to the time left
+    before the request deadline, if any.
+
+    With `policy="strict"`, a free slot always goes to the first lane (in `lanes`
+    order) with a waiting request; with `policy="weighted"`, slots are shared between
+    lanes with waiting requests in proportion to their weights. Evaluations run in
+    the lane set with `lane_scope`, or `default_lane`.
+
+    `capacity`, if given, returns the number of slots currently usable, e.g. following
+    the healthy backends; it is capped by `max_in_flight`.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int,
+        max_queue_depth: int = 64,
+        max_queue_wait_seconds: float = 3.0,
+        lanes: Optional[Dict[str, LaneConfig]] = None,
+        policy: str = "weighted",
+        default_lane: Optional[str] = None,
+        clock: Callable[[], float] = time.monotonic,
+        capacity: Optional[Callable[[], int]] = None,
+    ):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        if policy not in ("strict", "weighted"):
+            raise ValueError(f"Unknown admission policy {policy!r}, expected 'strict' or 'weighted'")
+        if lanes is None:
+            lanes = {
+                INTERACTIVE_LANE: LaneConfig(
+                    max_queue_depth=max_queue_depth, max_queue_wait_seconds=max_queue_wait_seconds
+                )
+            }
+        if sum(lane.reserved for lane in lanes.values()) >= max_in_flight:
+            raise ValueError("Reserved slots must leave at least one shared slot")
+        self.max_in_flight = max_in_flight
+        self.lanes = dict(lanes)
+        self.policy = policy
+        self.default_lane = default_lane or next(iter(self.lanes))
+        self._clock = clock
+        self._capacity = capacity
+        self._in_flight: Dict[str, int] = {name: 0 for name in self.lanes}
+        self._waiters: Dict[str, Deque[_Waiter]] = {name: deque() for name in self.lanes}
+        # Smooth weighted round-robin state, as in nginx's upstream balancer
+        self._current_weights: Dict[str, int] = {name: 0 for name in self.lanes}
+        self._service_seconds: Optional[float] = None
+        self._update_gauges()
+
+    @property
+    def in_flight(self) -> int:
+        return sum(self._in_flight.values())
+
+    @property
+    def slots(self) -> int:
+        """Evaluations that may run at once now."""
+        if self._capacity is None:
+            return self.max_in_flight
+        return max(1, min(self.max_in_flight, self._capacity()))
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(len(waiters) for waiters in self._waiters.values())
+
+    def _lane(self) -> str:
+        lane = _current_lane.get()
+        return lane if lane in self.lanes else self.default_lane
+
+    def predicted_wait(self, lane: Optional[str] = None) -> float:
+        """Expected wait of a request joining the queue of `lane` now, from the average service time."""
+        if self._service_seconds is None:
+            return 0.0
+        lane = lane or self.default_lane
+        return self._service_seconds * (len(self._waiters[lane]) + 1) / self.slots
+
+    def _can_start(self, lane: str) -> bool:
+        # Slots reserved by other lanes and not used by them are off limits, short of the last shared one
+        slots = self.slots
+        held_back = sum(
+            max(0, config.reserved - self._in_flight[name]) for name, config in self.lanes.items() if name != lane
+        )
+        return self.in_flight < slots - min(held_back, slots - 1)
+
+    def _reject(self, lane: str, status_code: int, reason: str):
+        ADMISSION_REJECTED_TOTAL.labels(lane=lane, reason=reason).inc()
+        retry_after = max(1, math.ceil(self.predicted_wait(lane)))
+        raise AdmissionRejected(status_code, reason, retry_after)
+
+    def _update_gauges(self):
+        for name in self.lanes:
+            ADMISSION_IN_FLIGHT.labels(lane=name).set(self._in_flight[name])
+            ADMISSION_QUEUE_DEPTH.labels(lane=name).set(len(self._waiters[name]))
+
+    def _next_lane(self) -> Optional[str]:
+        ready = [name for name in self.lanes if self._waiters[name] and self._can_start(name)]
+        if not ready:
+            return None
+        if self.policy == "strict":
+            return ready[0]
+        total = 0
+        for name in ready:
+            self._current_weights[name] += self.lanes[name].weight
+            total += self.lanes[name].weight
+        chosen = max(ready, key=lambda name: self._current_weights[name])
+        self._current_weights[chosen] -= total
+        return chosen
+
+    def _dispatch(self):
+        """Hand free slots over to waiting requests, lane by lane according to the policy."""
+        while (lane := self._next_lane()) is not None:
+            waiter = self._waiters[lane].popleft()
+            if waiter.future.done():
+                continue
+            self._in_flight[lane] += 1
+            waiter.future.set_result(None)
+        self._update_gauges()
+
+    async def _acquire(self, lane: str):
+        config = self.lanes[lane]
+        if self._can_start(lane) and not self.queue_depth:
+            self._in_flight[lane] += 1
+            self._update_gauges()
+            ADMISSION_QUEUE_WAIT_SECONDS.labels(lane=lane).observe(0)
+            return
+        if len(self._waiters[lane]) >= config.max_queue_depth:
+            self._reject(lane, 429, "queue_full")
+        # Waiting past the request deadline is pointless, the caller would be gone by then
+        remaining = remaining_time()
+        max_wait = config.max_queue_wait_seconds if remaining is None else min(config.max_queue_wait_seconds, remaining)
+        if self.predicted_wait(lane) > max_wait:
+            self._reject(lane, 503, "predicted_wait")
+
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), lane)
+        self._waiters[lane].append(waiter)
+        # A slot may be free for this lane while others are queued in lanes that cannot use it
+        self._dispatch()
+        start = self._clock()
+        try:
+            # The slot is taken on the waiter's behalf by `_dispatch`
+            await asyncio.wait_for(waiter.future, timeout=max_wait)
+        except asyncio.TimeoutError:
+            # Unless the slot was handed over just as the wait timed out
+            if waiter.future.cancelled() or not waiter.future.done():
+                self._reject(lane, 503, "queue_timeout")
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Got the slot just as the caller went away, pass it on
+                self._release(lane)
+            raise
+        finally:
+            if waiter in self._waiters[lane]:
+                self._waiters[lane].remove(waiter)
+            self._update_gauges()
+            ADMISSION_QUEUE_WAIT_SECONDS.labels(lane=lane).observe(self._clock() - start)
+
+    def _release(self, lane: str):
+        self._in_flight[lane] -= 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Hold an evaluation slot for the duration of the block, or raise `AdmissionRejected`."""
+        lane = self._lane()
+        arrived = self._clock()
+        await self._acquire(lane)
+        start = self._clock()
+        try:
+            yield
+        finally:
+            end = self._clock()
+            elapsed = end - start
+            if self._service_seconds is None:
+                self._service_seconds = elapsed
+            else:
+                self._service_seconds += _EWMA_ALPHA * (elapsed - self._service_seconds)
+            ADMISSION_LANE_LATENCY_SECONDS.labels(lane=lane).observe(end - arrived)
+            self._release(lane)
+
+
+class AdmissionControlledEvaluator(BaseEvaluatorModel):
+    """
+    Evaluator wrapper that admits async evaluations through an `AdmissionController`.
+
+    The sync `evaluate` is only used outside the API (scripts, tests) and is not admitted.
+    """
+
+    def __init__(self, inner: BaseEvaluatorModel, controller: AdmissionController):
+        self._inner = inner
+        self._controller = controller
+
+    def evaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        return self._inner.evaluate(job_offer)
+
+    async def aevaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        async with self._controller.admit():
+            return await self._inner.aevaluate(job_offer)
+
+    async def astream_criteria(self, job_offer: str) -> AsyncIterator[KeyCriterion]:
+        async with self._controller.admit():
+            async for criterion in self._inner.astream_criteria(job_offer):
+                yield criterion
+
+    async def warmup(self) -> None:
+        await self._inner.warmup()
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._inner.version
@@ -0,0 +1,232 @@
+"""
+Pool of Ollama backends with least-outstanding-requests routing.
+
+Each call goes to the healthy backend with the fewest outstanding requests, and async
+calls can be capped per backend. Backends that keep failing, or that fail a periodic
+health check, are ejected for a while and readmitted once they answer health checks
+again.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager, contextmanager
+import logging
+import threading
+import time
+from typing import AsyncIterator, Callable, Iterator, List, Optional, Sequence
+
+from .monitoring import (
+    OLLAMA_BACKEND_ERRORS_TOTAL,
+    OLLAMA_BACKEND_HEALTHY,
+    OLLAMA_BACKEND_IN_FLIGHT,
+    OLLAMA_BACKEND_LATENCY_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Label of the backend used when no base URL is configured (the Ollama client default)
+DEFAULT_BACKEND_LABEL = "default"
+
+
+class OllamaResponseError(Exception):
+    """Error answered by the Ollama API to a direct HTTP call, with its HTTP status."""
+
+    def __init__(self, error: str, status_code: int):
+        super().__init__(error)
+        self.error = error
+        self.status_code = status_code
+
+
+def _is_backend_error(exc: BaseException) -> bool:
+    """Whether an exception means the backend itself is unhealthy, as opposed to e.g. a bad model output."""
+    import httpx
+    from ollama import ResponseError
+
+    if isinstance(exc, (ResponseError, OllamaResponseError)):
+        return exc.status_code >= 500
+    return isinstance(exc, (ConnectionError, TimeoutError, httpx.TransportError))
+
+
+class OllamaBackend:
+    """Routing state of a single Ollama endpoint."""
+
+    def __init__(self, url: Optional[str], max_concurrency: Optional[int] = None):
+        self.url = url
+        self.label = url or DEFAULT_BACKEND_LABEL
+        # Calls routed to the backend, running or waiting for one of its slots
+        self.in_flight = 0
+        # Caps the async calls running on the backend at once
+        self.slots = asyncio.Semaphore(max_concurrency) if max_concurrency else None
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+
+    def __repr__(self) -> str:
+        return f"OllamaBackend({self.label!r}, in_flight={self.in_flight})"
+
+
+class BackendPool:
+    """
+    Routes calls over several Ollama backends, least outstanding requests first.
+
+    A backend is ejected for `eject_seconds` after `failure_threshold` consecutive
+    backend errors, or as soon as a health check fails. When every backend is ejected,
+    calls are spread over all of them rather than failing outright.
+
+    With `max_concurrency`, at most that many async calls (`aacquire`) run on each backend
+    at once; the others wait for a slot of the backend they were routed to, which counts
+    them as outstanding there, so that later calls go elsewhere.
+    """
+
+    def __init__(
+        self,
+        urls: Sequence[Optional[str]],
+        max_concurrency: Optional[int] = None,
+        failure_threshold: int = 3,
+        eject_seconds: float = 30.0,
+        health_check_interval: float = 10.0,
+        health_check_timeout: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if not urls:
+            raise ValueError("BackendPool needs at least one backend URL")
+        self.backends: List[OllamaBackend] = [OllamaBackend(url, max_concurrency) for url in urls]
+        self.max_concurrency = max_concurrency
+        self._failure_threshold = failure_threshold
+        self._eject_seconds = eject_seconds
+        self._health_check_interval = health_check_interval
+        self._health_check_timeout = health_check_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        # Rotates the starting point of the scan so that ties are broken round-robin
+        self._next = 0
+        self._stop = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+        for backend in self.backends:
+            OLLAMA_BACKEND_HEALTHY.labels(backend=backend.label).set(1)
+
+    def is_healthy(self, backend: OllamaBackend) -> bool:
+        return backend.ejected_until <= self._clock()
+
+    def routable_count(self) -> int:
+        """Number of backends calls are currently routed to: the healthy ones, or all of them if none is."""
+        now = self._clock()
+        return sum(backend.ejected_until <= now for backend in self.backends) or len(self.backends)
+
+    def _pick(self) -> OllamaBackend:
+        with self._lock:
+            now = self._clock()
+            count = len(self.backends)
+            ordered = [self.backends[(self._next + idx) % count] for idx in range(count)]
+            self._next = (self._next + 1) % count
+            candidates = [b for b in ordered if b.ejected_until <= now] or ordered
+            backend = min(candidates, key=lambda b: b.in_flight)
+            backend.in_flight += 1
+        return backend
+
+    def _unroute(self, backend: OllamaBackend):
+        with self._lock:
+            backend.in_flight -= 1
+
+    def _release(self, backend: OllamaBackend, elapsed: float, exc: Optional[BaseException]):
+        OLLAMA_BACKEND_IN_FLIGHT.labels(backend=backend.label).dec()
+        OLLAMA_BACKEND_LATENCY_SECONDS.labels(backend=backend.label).observe(elapsed)
+        failed = exc is not None and _is_backend_error(exc)
+        with self._lock:
+            backend.in_flight -= 1
+            if not failed:
+                backend.consecutive_failures = 0
+                return
+            backend.consecutive_failures += 1
+            eject = backend.consecutive_failures >= self._failure_threshold
+        OLLAMA_BACKEND_ERRORS_TOTAL.labels(backend=backend.label).inc()
+        if eject:
+            self.eject(backend)
+
+    @contextmanager
+    def acquire(self) -> Iterator[OllamaBackend]:
+        """Reserve the least loaded healthy backend for the duration of one call."""
+        backend = self._pick()
+        OLLAMA_BACKEND_IN_FLIGHT.labels(backend=backend.label).inc()
+        start = time.perf_counter()
+        try:
+            yield backend
+        except BaseException as exc:
+            self._release(backend, time.perf_counter() - start, exc)
+            raise
+        self._release(backend, time.perf_counter() - start, None)
+
+    @asynccontextmanager
+    async def aacquire(self) -> AsyncIterator[OllamaBackend]:
+        """Async `acquire`, which also waits for a free slot of the backend under `max_concurrency`."""
+        backend = self._pick()
+        if backend.slots is not None:
+            try:
+                await backend.slots.acquire()
+            except BaseException:
+                # Cancelled while waiting: the backend was never called
+                self._unroute(backend)
+                raise
+        OLLAMA_BACKEND_IN_FLIGHT.labels(backend=backend.label).inc()
+        start = time.perf_counter()
+        try:
+            yield backend
+        except BaseException as exc:
+            self._release(backend, time.perf_counter() - start, exc)
+            raise
+        finally:
+            if backend.slots is not None:
+                backend.slots.release()
+        self._release(backend, time.perf_counter() - start, None)
+
+    def eject(self, backend: OllamaBackend):
+        with self._lock:
+            already_ejected = backend.ejected_until > self._clock()
+            backend.ejected_until = self._clock() + self._eject_seconds
+        OLLAMA_BACKEND_HEALTHY.labels(backend=backend.label).set(0)
+        if not already_ejected:
+            logger.warning("Ejecting Ollama backend %s for %.0fs", backend.label, self._eject_seconds)
+
+    def readmit(self, backend: OllamaBackend):
+        with self._lock:
+            was_ejected = backend.ejected_until > self._clock()
+            backend.ejected_until = 0.0
+            backend.consecutive_failures = 0
+        OLLAMA_BACKEND_HEALTHY.labels(backend=backend.label).set(1)
+        if was_ejected:
+            logger.info("Readmitting Ollama backend %s", backend.label)
+
+    def check_health(self):
+        """Probe every backend once, ejecting the ones that do not answer and readmitting the others."""
+        import httpx
+
+        for backend in self.backends:
+            if backend.url is None:
+                continue
+            try:
+                httpx.get(f"{backend.url.rstrip('/')}/api/version", timeout=self._health_check_timeout).raise_for_status()
+            except httpx.HTTPError:
+                OLLAMA_BACKEND_ERRORS_TOTAL.labels(backend=backend.label).inc()
+                self.eject(backend)
+            else:
+                self.readmit(backend)
+
+    def start_health_checks(self) -> Optional[threading.Thread]:
+        """Run `check_health` periodically in a daemon thread; a no-op for a single backend."""
+        if len(self.backends) < 2 or self._health_check_interval <= 0 or self._health_thread is not None:
+            return self._health_thread
+
+        def run():
+            while not self._stop.wait(self._health_check_interval):
+                try:
+                    self.check_health()
+                except Exception:  # pylint: disable=W0718
+                    logger.exception("Ollama backend health check failed")
+
+        self._health_thread = threading.Thread(target=run, name="ollama-health-check", daemon=True)
+        self._health_thread.start()
+        return self._health_thread
+
+    def close(self):
+        self._stop.set()
+        if self._health_thread is not None:
+            self._health_thread.join()
+            self._health_thread = None
@@ -0,0 +1,279 @@
+"""
+Content-addressed result cache for extracted key criteria.
+
+Results are keyed by a hash of the normalized offer text together with the
+model and prompt identifiers, so a new model or prompt version never serves
+stale criteria.
+"""
+
+import asyncio
+from collections import OrderedDict
+import hashlib
+import logging
+from pathlib import Path
+import re
+import sqlite3
+import threading
+import time
+from typing import AsyncIterator, Callable, Iterable, Optional
+import unicodedata
+
+from recruitair.job_offers.models import KeyCriteriaResponse, KeyCriterion
+
+from .model import BaseEvaluatorModel
+from .monitoring import RESULT_CACHE_EVICTIONS_TOTAL, RESULT_CACHE_HITS_TOTAL, RESULT_CACHE_MISSES_TOTAL
+from .near_duplicates import ApproximateKeyCriteriaResponse, ApproximateKeyCriterion
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_offer_text(offer_text: str) -> str:
+    """Normalize an offer so that trivially different submissions share a cache key."""
+    return _WHITESPACE_RE.sub(" ", unicodedata.normalize("NFC", offer_text)).strip()
+
+
+def make_cache_key(offer_text: str, *parts: str) -> str:
+    """Build a content-addressed key from the normalized offer text and model/prompt identifiers."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    digest.update(normalize_offer_text(offer_text).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class BaseResultCache:
+    """Interface for result cache tiers"""
+
+    name = "base"
+
+    def get(self, key: str) -> Optional[KeyCriteriaResponse]:
+        raise NotImplementedError()
+
+    def set(self, key: str, value: KeyCriteriaResponse) -> None:
+        raise NotImplementedError()
+
+    async def aget(self, key: str) -> Optional[KeyCriteriaResponse]:
+        """Async `get`; tiers doing blocking I/O override it to run off the event loop."""
+        return self.get(key)
+
+    async def aset(self, key: str, value: KeyCriteriaResponse) -> None:
+        self.set(key, value)
+
+
+class InMemoryLRUCache(BaseResultCache):
+    """Thread-safe in-process LRU tier with size and TTL eviction."""
+
+    name = "memory"
+
+    def __init__(
+        self, max_entries: int = 4096, ttl_seconds: Optional[float] = None, clock: Callable[[], float] = time.monotonic
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, KeyCriteriaResponse]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[KeyCriteriaResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if self._ttl_seconds is not None and self._clock() - stored_at > self._ttl_seconds:
+                del self._entries[key]
+                RESULT_CACHE_EVICTIONS_TOTAL.labels(tier=self.name, reason="ttl").inc()
+                return None
+            self._entries.move_to_end(key)
+        RESULT_CACHE_HITS_TOTAL.labels(tier=self.name).inc()
+        return value
+
+    def set(self, key: str, value: KeyCriteriaResponse) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                RESULT_CACHE_EVICTIONS_TOTAL.labels(tier=self.name, reason="size").inc()
+
+
+class SQLiteResultCache(BaseResultCache):
+    """On-disk tier backed by SQLite, so cached results survive restarts."""
+
+    name = "sqlite"
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS criteria_cache ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS criteria_cache_accessed ON criteria_cache (accessed_at)")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM criteria_cache").fetchone()[0]
+
+    def get(self, key: str) -> Optional[KeyCriteriaResponse]:
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute("SELECT value, stored_at FROM criteria_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            value, stored_at = row
+            if self._ttl_seconds is not None and now - stored_at > self._ttl_seconds:
+                self._conn.execute("DELETE FROM criteria_cache WHERE key = ?", (key,))
+                RESULT_CACHE_EVICTIONS_TOTAL.labels(tier=self.name, reason="ttl").inc()
+                return None
+            self._conn.execute("UPDATE criteria_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        RESULT_CACHE_HITS_TOTAL.labels(tier=self.name).inc()
+        return KeyCriteriaResponse.model_validate_json(value)
+
+    def set(self, key: str, value: KeyCriteriaResponse) -> None:
+        now = self._clock()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO criteria_cache (key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, value.model_dump_json(), now, now),
+            )
+            if self._max_entries is not None:
+                evicted = self._conn.execute(
+                    "DELETE FROM criteria_cache WHERE key IN ("
+                    " SELECT key FROM criteria_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self._max_entries,),
+                ).rowcount
+                if evicted > 0:
+                    RESULT_CACHE_EVICTIONS_TOTAL.labels(tier=self.name, reason="size").inc(evicted)
+
+    async def aget(self, key: str) -> Optional[KeyCriteriaResponse]:
+        # A slow disk or a locked database must not hold up the event loop
+        return await asyncio.to_thread(self.get, key)
+
+    async def aset(self, key: str, value: KeyCriteriaResponse) -> None:
+        await asyncio.to_thread(self.set, key, value)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class TieredResultCache(BaseResultCache):
+    """Looks up tiers in order (fastest first) and promotes hits into the faster tiers."""
+
+    name = "tiered"
+
+    def __init__(self, tiers: Iterable[BaseResultCache]):
+        self._tiers = list(tiers)
+        if not self._tiers:
+            raise ValueError("TieredResultCache needs at least one tier")
+
+    def get(self, key: str) -> Optional[KeyCriteriaResponse]:
+        for idx, tier in enumerate(self._tiers):
+            value = tier.get(key)
+            if value is not None:
+                for faster in self._tiers[:idx]:
+                    faster.set(key, value)
+                return value
+        return None
+
+    def set(self, key: str, value: KeyCriteriaResponse) -> None:
+        for tier in self._tiers:
+            tier.set(key, value)
+
+    async def aget(self, key: str) -> Optional[KeyCriteriaResponse]:
+        for idx, tier in enumerate(self._tiers):
+            value = await tier.aget(key)
+            if value is not None:
+                for faster in self._tiers[:idx]:
+                    await faster.aset(key, value)
+                return value
+        return None
+
+    async def aset(self, key: str, value: KeyCriteriaResponse) -> None:
+        for tier in self._tiers:
+            await tier.aset(key, value)
+
+
+class CachedEvaluator(BaseEvaluatorModel):
+    """
+    Evaluator wrapper that serves repeated offers from a result cache.
+
+    Criteria reused from a near-duplicate offer are not cached: the cache tiers store
+    exact results only, and would serve them again without their approximate flag.
+    """
+
+    def __init__(self, inner: BaseEvaluatorModel, cache: BaseResultCache, key_parts: Iterable[str]):
+        self._inner = inner
+        self._cache = cache
+        self._key_parts = tuple(key_parts)
+
+    def cache_key(self, job_offer: str) -> str:
+        return make_cache_key(job_offer, *self._key_parts)
+
+    def evaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        key = self.cache_key(job_offer)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        RESULT_CACHE_MISSES_TOTAL.inc()
+        response = self._inner.evaluate(job_offer)
+        if not isinstance(response, ApproximateKeyCriteriaResponse):
+            self._cache.set(key, response)
+        return response
+
+    async def aevaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        key = self.cache_key(job_offer)
+        cached = await self._cache.aget(key)
+        if cached is not None:
+            return cached
+        RESULT_CACHE_MISSES_TOTAL.inc()
+        response = await self._inner.aevaluate(job_offer)
+        if not isinstance(response, ApproximateKeyCriteriaResponse):
+            await self._cache.aset(key, response)
+        return response
+
+    async def astream_criteria(self, job_offer: str) -> AsyncIterator[KeyCriterion]:
+        key = self.cache_key(job_offer)
+        cached = await self._cache.aget(key)
+        if cached is not None:
+            for criterion in cached.key_criteria:
+                yield criterion
+            return
+        RESULT_CACHE_MISSES_TOTAL.inc()
+        criteria = []
+        async for criterion in self._inner.astream_criteria(job_offer):
+            criteria.append(criterion)
+            yield criterion
+        # Only reached when the stream completed, so partial results are never cached
+        if not any(isinstance(criterion, ApproximateKeyCriterion) for criterion in criteria):
+            await self._cache.aset(key, KeyCriteriaResponse(key_criteria=criteria))
+
+    async def warmup(self) -> None:
+        await self._inner.warmup()
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._inner.version
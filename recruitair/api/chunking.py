@@ -0,0 +1,185 @@
+"""
+Map-reduce extraction for long job offers.
+
+Long offers are split into overlapping, section-aware chunks whose criteria are
+extracted in parallel and then merged, so the latency of a long offer tracks its
+slowest chunk instead of one generation over the whole document.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import difflib
+import re
+from typing import AsyncIterator, Iterable, List, Optional
+
+from recruitair.job_offers.models import KeyCriteriaResponse, KeyCriterion
+
+from .model import BaseEvaluatorModel
+from .monitoring import LONG_OFFER_CHUNKS
+
+# A blank line, or a line that looks like a section heading ("Requirements:", "## Benefits", "ABOUT US")
+_SECTION_BREAK_RE = re.compile(r"\n\s*\n|\n(?=\s*(?:#{1,6}\s|[A-Z][A-Z &/-]{2,}\n|[^\n]{1,60}:\s*\n))")
+_SENTENCE_BREAK_RE = re.compile(r"(?<=[.!?;])\s+|\n")
+_NON_WORD_RE = re.compile(r"[^\w]+")
+
+
+def _split_sections(text: str) -> List[str]:
+    return [section.strip() for section in _SECTION_BREAK_RE.split(text) if section.strip()]
+
+
+def _split_long_section(section: str, max_chars: int) -> List[str]:
+    if len(section) <= max_chars:
+        return [section]
+    pieces: List[str] = []
+    current = ""
+    for sentence in _SENTENCE_BREAK_RE.split(section):
+        if not sentence:
+            continue
+        while len(sentence) > max_chars:
+            # No sentence boundary to cut at, fall back to a hard split
+            pieces.append(sentence[:max_chars])
+            sentence = sentence[max_chars:]
+        if current and len(current) + 1 + len(sentence) > max_chars:
+            pieces.append(current)
+            current = sentence
+        else:
+            current = f"{current} {sentence}" if current else sentence
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def _tail(text: str, max_chars: int) -> str:
+    if max_chars <= 0:
+        return ""
+    if len(text) <= max_chars:
+        return text
+    tail = text[-max_chars:]
+    # Start the overlap on a word boundary
+    space = tail.find(" ")
+    return tail[space + 1 :] if space != -1 else tail
+
+
+def split_offer(text: str, max_chars: int = 2500, overlap_chars: int = 250) -> List[str]:
+    """
+    Split an offer into chunks of at most about `max_chars` characters.
+
+    Chunks are packed from whole sections (paragraphs or headed blocks) where possible,
+    and each chunk starts with the last `overlap_chars` characters of the previous one so
+    that a requirement spanning a boundary is seen whole by at least one chunk.
+    """
+    if overlap_chars >= max_chars:
+        raise ValueError("overlap_chars must be smaller than max_chars")
+    pieces: List[str] = []
+    for section in _split_sections(text):
+        pieces.extend(_split_long_section(section, max_chars - overlap_chars))
+
+    chunks: List[str] = []
+    current = ""
+    for piece in pieces:
+        if current and len(current) + 2 + len(piece) > max_chars:
+            chunks.append(current)
+            overlap = _tail(current, overlap_chars)
+            current = f"{overlap}\n\n{piece}" if overlap else piece
+        else:
+            current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _normalize_description(description: str) -> str:
+    return _NON_WORD_RE.sub(" ", description.lower()).strip()
+
+
+def merge_criteria(responses: Iterable[KeyCriteriaResponse], similarity_threshold: float = 0.85) -> KeyCriteriaResponse:
+    """
+    Merge the criteria extracted from several chunks of the same offer.
+
+    Near-identical descriptions (by normalized string similarity) are deduplicated: the
+    longest description is kept, as the most exhaustive, together with the highest
+    importance any chunk gave it. Criteria keep the order in which they first appeared.
+    """
+    merged: List[KeyCriterion] = []
+    keys: List[str] = []
+    for response in responses:
+        for criterion in response.key_criteria:
+            key = _normalize_description(criterion.description)
+            match: Optional[int] = None
+            for idx, existing in enumerate(keys):
+                if existing == key or difflib.SequenceMatcher(None, existing, key).ratio() >= similarity_threshold:
+                    match = idx
+                    break
+            if match is None:
+                merged.append(criterion)
+                keys.append(key)
+                continue
+            current = merged[match]
+            longest = criterion if len(criterion.description) > len(current.description) else current
+            merged[match] = KeyCriterion(
+                description=longest.description,
+                importance=max(current.importance, criterion.importance),
+            )
+            keys[match] = _normalize_description(longest.description)
+    return KeyCriteriaResponse(key_criteria=merged)
+
+
+class ChunkedEvaluator(BaseEvaluatorModel):
+    """Evaluator wrapper that extracts long offers chunk by chunk, in parallel, and merges the criteria."""
+
+    def __init__(
+        self,
+        inner: BaseEvaluatorModel,
+        threshold_chars: int = 4000,
+        chunk_chars: int = 2500,
+        overlap_chars: int = 250,
+        similarity_threshold: float = 0.85,
+    ):
+        self._inner = inner
+        self._threshold_chars = threshold_chars
+        self._chunk_chars = chunk_chars
+        self._overlap_chars = overlap_chars
+        self._similarity_threshold = similarity_threshold
+
+    def _chunks(self, job_offer: str) -> Optional[List[str]]:
+        # Observes the chunk count, so it is called once per evaluation
+        if len(job_offer) <= self._threshold_chars:
+            return None
+        chunks = split_offer(job_offer, self._chunk_chars, self._overlap_chars)
+        LONG_OFFER_CHUNKS.observe(len(chunks))
+        return chunks if len(chunks) > 1 else None
+
+    def evaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        chunks = self._chunks(job_offer)
+        if chunks is None:
+            return self._inner.evaluate(job_offer)
+        with ThreadPoolExecutor(max_workers=len(chunks), thread_name_prefix="offer-chunk") as pool:
+            responses = list(pool.map(self._inner.evaluate, chunks))
+        return merge_criteria(responses, self._similarity_threshold)
+
+    async def aevaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        chunks = self._chunks(job_offer)
+        if chunks is None:
+            return await self._inner.aevaluate(job_offer)
+        return await self._aevaluate_chunks(chunks)
+
+    async def astream_criteria(self, job_offer: str) -> AsyncIterator[KeyCriterion]:
+        chunks = self._chunks(job_offer)
+        if chunks is None:
+            async for criterion in self._inner.astream_criteria(job_offer):
+                yield criterion
+            return
+        # Merged criteria are only known once every chunk is done
+        for criterion in (await self._aevaluate_chunks(chunks)).key_criteria:
+            yield criterion
+
+    async def _aevaluate_chunks(self, chunks: List[str]) -> KeyCriteriaResponse:
+        responses = await asyncio.gather(*(self._inner.aevaluate(chunk) for chunk in chunks))
+        return merge_criteria(responses, self._similarity_threshold)
+
+    async def warmup(self) -> None:
+        await self._inner.warmup()
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._inner.version
@@ -1,3 +1,6 @@
+from pathlib import Path
+from typing import Literal
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -7,11 +10,165 @@ class Settings(BaseSettings):
     # Don't forget to set MLFLOW_TRACKING_URI in your environment variables
     prompt: str = Field("criteria-extraction", description="MLflow prompt URI; override via env")
     prompt_version: str = Field("1", description="Prompt version to load")
+    prompt_snapshot_dir: str | None = Field(
+        str(Path.home() / ".cache" / "recruitair" / "prompts"),
+        description="Directory of local prompt snapshots used at startup (None always loads from MLflow)",
+    )
+    prompt_snapshot_ttl_seconds: float = Field(
+        3600, ge=0, description="Age after which a prompt snapshot is refreshed from MLflow in the background"
+    )
 
     model: str = Field("dolphin3", description="OLlama model name")
     model_version: str = Field("8b", description="OLlama model version")
     ollama_base_url: str | None = Field(None, description="Base URL for OLlama API; override via env")
+    ollama_base_urls: list[str] = Field(
+        [], description="Several OLlama base URLs to balance calls over (JSON list); takes precedence over ollama_base_url"
+    )
+    ollama_client: Literal["langchain", "http"] = Field(
+        "langchain",
+        description="How the evaluator calls Ollama: through LangChain's ChatOllama, or directly over HTTP ('http')",
+    )
+    ollama_keep_alive: str | None = Field(
+        "30m",
+        description="How long Ollama keeps the model loaded after a call, e.g. '30m' or '-1m' for ever "
+        "(None uses Ollama's default of 5 minutes)",
+    )
+    ollama_num_ctx: int | None = Field(None, ge=1, description="Context window of the model (None uses Ollama's)")
+    ollama_num_ctx_buckets: list[int] = Field(
+        [],
+        description="Context windows to choose num_ctx from per request, the smallest fitting the estimated prompt "
+        "and output (JSON list; [] always uses ollama_num_ctx). Ollama reloads the model when num_ctx changes",
+    )
+    ollama_chars_per_token: float = Field(
+        3.0, gt=0, description="Characters per token used to estimate prompt sizes; lower is more conservative"
+    )
+    ollama_expected_output_tokens: int = Field(
+        512, ge=0, description="Tokens reserved for the response when choosing a context window bucket"
+    )
+    ollama_num_predict: int | None = Field(
+        None, description="Max tokens generated per call, -1 for no limit (None uses Ollama's default)"
+    )
+    ollama_num_thread: int | None = Field(
+        None, ge=1, description="CPU threads Ollama uses for generation (None lets Ollama decide)"
+    )
+    warmup_generations: int = Field(
+        1, ge=0, description="Generations of the warm-up offer run on each OLlama backend at startup (0 disables)"
+    )
+    warmup_offer_text: str = Field(
+        "We are hiring a software engineer with experience in Python and SQL.",
+        description="Offer extracted by the warm-up generations, with the real prompt",
+    )
+    backend_failure_threshold: int = Field(
+        3, ge=1, description="Consecutive errors after which an OLlama backend is temporarily ejected"
+    )
+    backend_eject_seconds: float = Field(30, ge=0, description="How long an ejected OLlama backend receives no calls")
+    backend_health_check_interval_seconds: float = Field(
+        10, ge=0, description="Interval of OLlama backend health checks when several are configured (0 disables)"
+    )
+    http_max_connections: int = Field(32, ge=1, description="Max HTTP connections to the OLlama backends")
+    http_max_keepalive_connections: int = Field(
+        16, ge=0, description="Max idle HTTP connections kept alive to the OLlama backends"
+    )
+    http_keepalive_expiry_seconds: float | None = Field(
+        60, description="Idle time after which a kept-alive HTTP connection is closed (None keeps it forever)"
+    )
+    http_connect_timeout_seconds: float = Field(5, gt=0, description="Timeout to connect to an OLlama backend")
+    http_read_timeout_seconds: float | None = Field(
+        300, description="Timeout of an OLlama call, read/write/pool included (None waits forever)"
+    )
     api_root_path: str = Field("", description="API root path; override via env")
+    workers: int = Field(
+        1, ge=1, description="API worker processes when served with gunicorn; the concurrency limits apply per worker"
+    )
+    max_concurrent_llm_calls: int = Field(
+        4, ge=1, description="Max number of concurrent async calls sent to each OLlama backend"
+    )
+    batch_max_concurrency: int = Field(8, ge=1, description="Max offers of one /eval/batch evaluated concurrently")
+
+    offer_normalization_steps: list[str] = Field(
+        ["strip_markup", "collapse_whitespace", "drop_boilerplate"],
+        description="Normalization steps applied to offers before prompting, in order (JSON list; [] disables)",
+    )
+    offer_boilerplate_sections: list[str] = Field(
+        [], description="Extra regexes of section headings whose section is dropped, besides the defaults"
+    )
+    offer_boilerplate_paragraphs: list[str] = Field(
+        [], description="Extra regexes of paragraphs that are dropped, besides the defaults"
+    )
+
+    request_timeout_seconds: float | None = Field(
+        30, gt=0, description="Default deadline of an evaluation request (None disables it)"
+    )
+    request_timeout_header: str = Field(
+        "X-Request-Timeout", description="Request header a client can set its own deadline with, in seconds"
+    )
+    max_request_timeout_seconds: float = Field(120, gt=0, description="Upper bound of client-provided deadlines")
+
+    admission_control_enabled: bool = Field(True, description="Shed evaluations beyond a bounded wait queue")
+    admission_max_in_flight: int | None = Field(
+        None,
+        ge=1,
+        description="Max evaluations running at once (None means max_concurrent_llm_calls times the healthy backends)",
+    )
+    admission_max_queue_depth: int = Field(
+        64, ge=0, description="Max interactive evaluations waiting for a slot; beyond it requests get 429"
+    )
+    admission_max_queue_wait_seconds: float = Field(
+        3.0, gt=0, description="Max time an interactive evaluation waits for a slot; beyond it requests get 503"
+    )
+    admission_policy: Literal["strict", "weighted"] = Field(
+        "weighted", description="How free slots are shared between priority lanes"
+    )
+    interactive_weight: int = Field(4, ge=1, description="Weight of the interactive lane under the weighted policy")
+    interactive_reserved_in_flight: int = Field(
+        1, ge=0, description="Evaluation slots reserved for interactive traffic"
+    )
+    bulk_weight: int = Field(1, ge=1, description="Weight of the bulk lane under the weighted policy")
+    bulk_max_queue_depth: int = Field(256, ge=0, description="Max bulk evaluations waiting for a slot")
+    bulk_max_queue_wait_seconds: float = Field(30, gt=0, description="Max time a bulk evaluation waits for a slot")
+    priority_header: str = Field(
+        "X-Priority", description="Request header selecting the priority lane ('interactive' or 'bulk')"
+    )
+    priority_api_keys: dict[str, Literal["interactive", "bulk"]] = Field(
+        {}, description="Priority lane of the clients sending each X-API-Key value (JSON object)"
+    )
+
+    long_offer_mode_enabled: bool = Field(
+        False, description="Extract criteria of long offers chunk by chunk, in parallel"
+    )
+    long_offer_threshold_chars: int = Field(4000, ge=1, description="Offers longer than this are chunked")
+    long_offer_chunk_chars: int = Field(2500, ge=100, description="Target size of each long-offer chunk")
+    long_offer_chunk_overlap_chars: int = Field(250, ge=0, description="Characters shared by consecutive chunks")
+    long_offer_merge_similarity: float = Field(
+        0.85, ge=0, le=1, description="Similarity above which criteria of different chunks are merged"
+    )
+    single_flight_enabled: bool = Field(
+        True, description="Coalesce concurrent identical requests into a single upstream call"
+    )
+    result_cache_enabled: bool = Field(True, description="Serve repeated offers from the result cache")
+    result_cache_max_entries: int = Field(4096, ge=1, description="Max entries kept in the in-memory cache tier")
+    result_cache_ttl_seconds: float | None = Field(
+        7 * 24 * 3600, description="Time-to-live of cached results, in seconds (None disables expiry)"
+    )
+    result_cache_sqlite_path: str | None = Field(
+        None, description="Path of the optional on-disk SQLite cache tier; override via env"
+    )
+    result_cache_sqlite_max_entries: int | None = Field(
+        None, description="Max entries kept in the on-disk cache tier (None means unbounded)"
+    )
+    near_duplicate_enabled: bool = Field(
+        False, description="Reuse the criteria of an extracted near-duplicate offer instead of calling the model"
+    )
+    near_duplicate_threshold: float = Field(
+        0.9, gt=0, le=1, description="Estimated Jaccard similarity of word shingles above which an offer is reused"
+    )
+    near_duplicate_max_entries: int = Field(
+        100_000, ge=1, description="Max offers kept in the near-duplicate index (oldest dropped first)"
+    )
+    near_duplicate_flag_header: str | None = Field(
+        "X-Approximate-Match",
+        description="Response header with the similarity of a reused near-duplicate (None does not flag them)",
+    )
 
 
 settings = Settings()
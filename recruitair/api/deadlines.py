@@ -0,0 +1,138 @@
+"""
+Per-request deadlines and cancellation of abandoned evaluations.
+
+The deadline of the current request is carried in a context variable, so every layer
+below the endpoint (admission queue, evaluator wrappers, the Ollama call) can see how
+much time is left. When the deadline expires or the client disconnects, the evaluation
+task is cancelled, which closes the in-flight HTTP request to Ollama and stops the
+generation.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+import time
+from typing import AsyncIterator, Awaitable, Callable, Optional, TypeVar
+
+from .monitoring import LLM_COMPUTE_SECONDS_SAVED_TOTAL, LLM_GENERATIONS_CANCELLED_TOTAL
+
+T = TypeVar("T")
+
+# How often the client connection is polled while an evaluation runs
+DISCONNECT_POLL_INTERVAL_SECONDS = 0.25
+# Weight of the latest generation in the moving average of generation times
+_EWMA_ALPHA = 0.2
+
+
+class RequestDeadline:
+    """Deadline of one request, and why its evaluation was cancelled, if it was."""
+
+    def __init__(self, timeout: Optional[float], clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self.expires_at = None if timeout is None else clock() + timeout
+        self.cancel_reason: Optional[str] = None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left until the deadline (never negative), or None without a deadline."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - self._clock())
+
+
+class DeadlineExceeded(Exception):
+    """Raised when an evaluation is cancelled, because of its deadline or a client disconnect."""
+
+    def __init__(self, reason: str):
+        super().__init__(f"Evaluation cancelled ({reason})")
+        self.reason = reason
+
+
+_current_deadline: ContextVar[Optional[RequestDeadline]] = ContextVar("recruitair_request_deadline", default=None)
+
+
+def current_deadline() -> Optional[RequestDeadline]:
+    return _current_deadline.get()
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left for the current request, or None when it has no deadline."""
+    deadline = _current_deadline.get()
+    return None if deadline is None else deadline.remaining()
+
+
+async def _wait_for_disconnect(is_disconnected: Callable[[], Awaitable[bool]]):
+    while not await is_disconnected():
+        await asyncio.sleep(DISCONNECT_POLL_INTERVAL_SECONDS)
+
+
+async def run_with_deadline(
+    coro: Awaitable[T],
+    deadline: RequestDeadline,
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+) -> T:
+    """
+    Run `coro` under `deadline`, cancelling it when the deadline expires or when
+    `is_disconnected` reports that the client went away.
+
+    Raises `DeadlineExceeded` with reason "deadline" or "disconnect" in that case.
+    """
+    token = _current_deadline.set(deadline)
+    # The task copies the current context, deadline included
+    task = asyncio.ensure_future(coro)
+    _current_deadline.reset(token)
+    watcher = asyncio.ensure_future(_wait_for_disconnect(is_disconnected)) if is_disconnected else None
+    try:
+        waiting = {task} if watcher is None else {task, watcher}
+        done, _ = await asyncio.wait(waiting, timeout=deadline.remaining(), return_when=asyncio.FIRST_COMPLETED)
+        if task in done:
+            return task.result()
+        deadline.cancel_reason = "disconnect" if watcher is not None and watcher in done else "deadline"
+        task.cancel()
+        # Let the evaluation unwind (closing the upstream request) before answering
+        await asyncio.gather(task, return_exceptions=True)
+        raise DeadlineExceeded(deadline.cancel_reason)
+    finally:
+        task.cancel()
+        if watcher is not None:
+            watcher.cancel()
+
+
+@asynccontextmanager
+async def deadline_scope(deadline: RequestDeadline) -> AsyncIterator[None]:
+    """
+    Make `deadline` current for the block and cancel the block when it expires, raising
+    `TimeoutError`. Used where the evaluation cannot run as a separate task, e.g. a stream.
+    """
+    token = _current_deadline.set(deadline)
+    try:
+        async with asyncio.timeout(deadline.remaining()):
+            yield
+    finally:
+        _current_deadline.reset(token)
+
+
+class GenerationCostTracker:
+    """
+    Tracks the average duration of completed generations, to estimate the compute a
+    cancelled generation would still have used.
+    """
+
+    def __init__(self):
+        self._average_seconds: Optional[float] = None
+
+    def completed(self, elapsed: float):
+        if self._average_seconds is None:
+            self._average_seconds = elapsed
+        else:
+            self._average_seconds += _EWMA_ALPHA * (elapsed - self._average_seconds)
+
+    def cancelled(self, elapsed: float):
+        deadline = _current_deadline.get()
+        reason = "cancelled"
+        if deadline is not None and deadline.cancel_reason is not None:
+            reason = deadline.cancel_reason
+        elif deadline is not None and deadline.remaining() == 0:
+            reason = "deadline"
+        LLM_GENERATIONS_CANCELLED_TOTAL.labels(reason=reason).inc()
+        if self._average_seconds is not None:
+            LLM_COMPUTE_SECONDS_SAVED_TOTAL.inc(max(0.0, self._average_seconds - elapsed))
@@ -1,11 +1,21 @@
 from functools import lru_cache
+import json
 import logging
 import os
+from typing import Any, Callable, Optional, Tuple
 
-import mlflow
-
+from .admission import BULK_LANE, INTERACTIVE_LANE, AdmissionControlledEvaluator, AdmissionController, LaneConfig
+from .backends import BackendPool
+from .cache import BaseResultCache, CachedEvaluator, InMemoryLRUCache, SQLiteResultCache, TieredResultCache
+from .chunking import ChunkedEvaluator
 from .config import settings
+from .http_pool import get_shared_http_pool
 from .model import BaseEvaluatorModel, OLlamaEvaluator
+from .near_duplicates import NearDuplicateEvaluator
+from .ollama_http import OllamaHTTPEvaluator
+from .normalization import NORMALIZATION_VERSION, NormalizingEvaluator, OfferNormalizer
+from .prompt_cache import PromptSnapshotCache
+from .singleflight import SingleFlightEvaluator
 
 logger = logging.getLogger("uvicorn.error")
 
@@ -15,16 +25,212 @@ def get_model() -> BaseEvaluatorModel:
     """Get the evaluator model and prompt, loading it if necessary."""
     if os.getenv("MLFLOW_TRACKING_URI") is None:
         raise EnvironmentError("Please set the MLFLOW_TRACKING_URI environment variable.")
+    import mlflow
+
     mlflow.set_tracking_uri(os.getenv("MLFLOW_TRACKING_URI"))
 
     logger.info(
-        "Loading OLlamaEvaluator model for model=%s, version=%s base_uri=%s, for prompt=%s/%s"
-        % (settings.model, settings.model_version, settings.ollama_base_url, settings.prompt, settings.prompt_version)
+        "Loading Ollama evaluator (%s client) for model=%s, version=%s base_uri=%s, for prompt=%s/%s"
+        % (
+            settings.ollama_client,
+            settings.model,
+            settings.model_version,
+            settings.ollama_base_urls or settings.ollama_base_url,
+            settings.prompt,
+            settings.prompt_version,
+        )
     )
 
-    return OLlamaEvaluator(
+    prompt_uri = get_prompt_uri()
+    prompt_loader = get_prompt_loader()
+
+    backend_pool = get_backend_pool()
+    evaluator_class = OllamaHTTPEvaluator if settings.ollama_client == "http" else OLlamaEvaluator
+    model: BaseEvaluatorModel = evaluator_class(
         model=settings.model,
         version=settings.model_version,
-        prompt_uri=f"prompts:/{settings.prompt}/{settings.prompt_version}",
-        ollama_base_url=settings.ollama_base_url,
+        prompt_uri=prompt_uri,
+        prompt_loader=prompt_loader,
+        backend_pool=backend_pool,
+        http_pool=get_shared_http_pool(),
+        ollama_options={
+            "keep_alive": settings.ollama_keep_alive,
+            "num_ctx": settings.ollama_num_ctx,
+            "num_predict": settings.ollama_num_predict,
+            "num_thread": settings.ollama_num_thread,
+        },
+        warmup_offer=settings.warmup_offer_text,
+        warmup_generations=settings.warmup_generations,
+        num_ctx_buckets=settings.ollama_num_ctx_buckets,
+        chars_per_token=settings.ollama_chars_per_token,
+        expected_output_tokens=settings.ollama_expected_output_tokens,
+    )
+
+    if settings.long_offer_mode_enabled:
+        model = ChunkedEvaluator(
+            model,
+            threshold_chars=settings.long_offer_threshold_chars,
+            chunk_chars=settings.long_offer_chunk_chars,
+            overlap_chars=settings.long_offer_chunk_overlap_chars,
+            similarity_threshold=settings.long_offer_merge_similarity,
+        )
+
+    normalizer = get_offer_normalizer()
+    if normalizer is not None:
+        # Above the chunking, so that long offers are measured and split once normalized
+        model = NormalizingEvaluator(model, normalizer)
+
+    if settings.admission_control_enabled:
+        capacity: Optional[Callable[[], int]] = None
+        max_in_flight = settings.admission_max_in_flight
+        if max_in_flight is None:
+            max_in_flight = settings.max_concurrent_llm_calls * len(backend_pool.backends)
+
+            def routable_capacity() -> int:
+                # Ejected backends get no calls, so their slots do not count
+                return settings.max_concurrent_llm_calls * backend_pool.routable_count()
+
+            capacity = routable_capacity
+
+        controller = AdmissionController(
+            max_in_flight=max_in_flight,
+            lanes={
+                INTERACTIVE_LANE: LaneConfig(
+                    weight=settings.interactive_weight,
+                    # Always leave bulk traffic at least one slot
+                    reserved=min(settings.interactive_reserved_in_flight, max_in_flight - 1),
+                    max_queue_depth=settings.admission_max_queue_depth,
+                    max_queue_wait_seconds=settings.admission_max_queue_wait_seconds,
+                ),
+                BULK_LANE: LaneConfig(
+                    weight=settings.bulk_weight,
+                    max_queue_depth=settings.bulk_max_queue_depth,
+                    max_queue_wait_seconds=settings.bulk_max_queue_wait_seconds,
+                ),
+            },
+            policy=settings.admission_policy,
+            capacity=capacity,
+        )
+        # Below the cache and single-flight wrappers, so that hits and coalesced calls are never queued
+        model = AdmissionControlledEvaluator(model, controller)
+
+    key_parts = get_result_key_parts(prompt_uri)
+    if settings.single_flight_enabled:
+        model = SingleFlightEvaluator(model, key_parts=key_parts)
+    if settings.near_duplicate_enabled:
+        # numpy is only needed for the index
+        from .minhash import MinHashIndex
+
+        # Below the exact result cache, which answers repeated offers more cheaply
+        index = MinHashIndex(
+            threshold=settings.near_duplicate_threshold, max_entries=settings.near_duplicate_max_entries
+        )
+        model = NearDuplicateEvaluator(model, index)
+    if settings.result_cache_enabled:
+        model = CachedEvaluator(model, cache=get_result_cache(), key_parts=key_parts)
+
+    return model
+
+
+def get_prompt_uri() -> str:
+    return f"prompts:/{settings.prompt}/{settings.prompt_version}"
+
+
+def get_result_key_parts(prompt_uri: str) -> Tuple[str, ...]:
+    """
+    Identity of the results the evaluator returns for an offer, for the result cache and single-flight keys.
+
+    Normalization and long-offer chunking change what the model sees, so their settings are part of it.
+    """
+    normalization = json.dumps(
+        [
+            NORMALIZATION_VERSION,
+            settings.offer_normalization_steps,
+            settings.offer_boilerplate_sections,
+            settings.offer_boilerplate_paragraphs,
+        ]
+    )
+    long_offers = json.dumps(
+        [
+            settings.long_offer_mode_enabled,
+            settings.long_offer_threshold_chars,
+            settings.long_offer_chunk_chars,
+            settings.long_offer_chunk_overlap_chars,
+            settings.long_offer_merge_similarity,
+        ]
+    )
+    return (settings.model, settings.model_version, prompt_uri, settings.prompt_version, normalization, long_offers)
+
+
+def get_prompt_loader() -> Optional[Callable[[str], Any]]:
+    """Loader of the local prompt snapshots, or None to always load the prompt from MLflow."""
+    if settings.prompt_snapshot_dir is None:
+        return None
+    return PromptSnapshotCache(
+        settings.prompt_snapshot_dir,
+        ttl_seconds=settings.prompt_snapshot_ttl_seconds,
+        namespace=os.environ["MLFLOW_TRACKING_URI"],
+    ).load
+
+
+def preload_model_dependencies():
+    """
+    Import the model libraries and fetch the prompt snapshot, before worker processes are forked.
+
+    The workers then share the imported modules with the parent and load the prompt from the
+    local snapshot. The evaluator itself is still built in each worker: its HTTP connections,
+    health-check thread and event-loop state do not survive a fork.
+    """
+    if os.getenv("MLFLOW_TRACKING_URI") is None:
+        raise EnvironmentError("Please set the MLFLOW_TRACKING_URI environment variable.")
+    if settings.ollama_client == "langchain":
+        import langchain_ollama  # noqa: F401  # pylint: disable=W0611
+    else:
+        import httpx  # noqa: F401  # pylint: disable=W0611
+    import mlflow
+
+    mlflow.set_tracking_uri(os.getenv("MLFLOW_TRACKING_URI"))
+    prompt_loader = get_prompt_loader()
+    if prompt_loader is not None:
+        prompt_loader(get_prompt_uri())
+
+
+def get_backend_pool() -> BackendPool:
+    """Build the pool of OLlama backends configured in the settings."""
+    return BackendPool(
+        settings.ollama_base_urls or [settings.ollama_base_url],
+        max_concurrency=settings.max_concurrent_llm_calls,
+        failure_threshold=settings.backend_failure_threshold,
+        eject_seconds=settings.backend_eject_seconds,
+        health_check_interval=settings.backend_health_check_interval_seconds,
+    )
+
+
+def get_offer_normalizer() -> Optional[OfferNormalizer]:
+    """Build the offer normalization pipeline configured in the settings."""
+    if not settings.offer_normalization_steps:
+        return None
+    return OfferNormalizer.from_names(
+        settings.offer_normalization_steps,
+        boilerplate_sections=settings.offer_boilerplate_sections,
+        boilerplate_paragraphs=settings.offer_boilerplate_paragraphs,
+        chars_per_token=settings.ollama_chars_per_token,
+    )
+
+
+def get_result_cache() -> BaseResultCache:
+    """Build the result cache tiers configured in the settings."""
+    memory = InMemoryLRUCache(
+        max_entries=settings.result_cache_max_entries,
+        ttl_seconds=settings.result_cache_ttl_seconds,
+    )
+    if settings.result_cache_sqlite_path is None:
+        return memory
+
+    logger.info("Using on-disk result cache at %s", settings.result_cache_sqlite_path)
+    disk = SQLiteResultCache(
+        settings.result_cache_sqlite_path,
+        max_entries=settings.result_cache_sqlite_max_entries,
+        ttl_seconds=settings.result_cache_ttl_seconds,
     )
+    return TieredResultCache([memory, disk])
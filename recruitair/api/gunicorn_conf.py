@@ -0,0 +1,46 @@
+"""
+Gunicorn configuration of the multi-worker API.
+
+Usage:
+    RECRUITAIR_WORKERS=4 gunicorn recruitair.api.main:app -c python:recruitair.api.gunicorn_conf
+
+The app, the model libraries and the prompt snapshot are loaded once in the master and
+shared with the forked workers; each worker then builds its own evaluator at startup.
+Prometheus samples of all the workers are kept in `PROMETHEUS_MULTIPROC_DIR` (a fresh
+temporary directory unless set) and aggregated by `/metrics`.
+"""
+
+import os
+from pathlib import Path
+import tempfile
+
+# Must be set before prometheus_client is imported, i.e. before the app is preloaded
+if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+    os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="recruitair-metrics-")
+_metrics_dir = Path(os.environ["PROMETHEUS_MULTIPROC_DIR"])
+_metrics_dir.mkdir(parents=True, exist_ok=True)
+# Samples left by a previous run would be added to the new ones
+for _stale in _metrics_dir.glob("*.db"):
+    _stale.unlink()
+
+from recruitair.api.config import settings  # noqa: E402  # pylint: disable=C0413
+
+bind = os.getenv("RECRUITAIR_BIND", "0.0.0.0:8000")
+workers = settings.workers
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+# Let in-flight evaluations finish on a graceful restart
+graceful_timeout = int(settings.max_request_timeout_seconds)
+
+
+def on_starting(server):  # pylint: disable=W0613
+    from recruitair.api.dependencies import preload_model_dependencies
+
+    preload_model_dependencies()
+
+
+def child_exit(server, worker):  # pylint: disable=W0613
+    from prometheus_client import multiprocess
+
+    # Drop the live gauges of the dead worker, its counters and histograms are kept
+    multiprocess.mark_process_dead(worker.pid)
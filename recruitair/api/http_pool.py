@@ -0,0 +1,145 @@
+"""
+Shared keep-alive HTTP connection pool for the upstream Ollama calls.
+
+By default every `ChatOllama` builds its own httpx clients, each with a private
+connection pool and no timeouts. Handing them the transports of one `SharedHTTPPool`
+instead bounds the number of upstream connections of the whole process, keeps them
+alive between calls and makes the new-connection rate observable.
+"""
+
+from functools import lru_cache
+import threading
+from typing import Any, Dict, List, Optional
+
+from .monitoring import OLLAMA_HTTP_CONNECTIONS_OPENED_TOTAL, OLLAMA_HTTP_POOL_CONNECTIONS
+
+# httpcore trace events: a new connection, and the start and end of a request, which holds its connection in between
+_CONNECTION_OPENED = "connection.connect_tcp.complete"
+_REQUEST_STARTED = "http11.send_request_headers.started"
+_REQUEST_ENDED = frozenset({"http11.response_closed.complete", "http11.response_closed.failed"})
+_TRANSPORTS = ("sync", "async")
+
+
+def _is_open(stream: Any) -> bool:
+    sock = stream.get_extra_info("socket")
+    return sock is not None and sock.fileno() != -1
+
+
+class SharedHTTPPool:
+    """Sync and async httpx transports, with the same limits, shared by every Ollama client."""
+
+    def __init__(
+        self,
+        max_connections: int = 32,
+        max_keepalive_connections: int = 16,
+        keepalive_expiry: Optional[float] = 60.0,
+        connect_timeout: float = 5.0,
+        read_timeout: Optional[float] = 300.0,
+    ):
+        # httpx is only needed once a model is loaded
+        import httpx
+
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(read_timeout, connect=connect_timeout)
+        self.connections_opened = 0
+        self._sync_transport = httpx.HTTPTransport(limits=self.limits)
+        self._async_transport = httpx.AsyncHTTPTransport(limits=self.limits)
+        # Per transport, the network streams of the connections it opened and the requests in progress
+        self._streams: Dict[str, List[Any]] = {name: [] for name in _TRANSPORTS}
+        self._requests: Dict[str, int] = {name: 0 for name in _TRANSPORTS}
+        self._lock = threading.Lock()
+        for name in _TRANSPORTS:
+            self._update_gauges(name)
+
+    def _update_gauges(self, name: str):
+        # Connection states are followed from the trace events only, as the transports do not expose
+        # their pool. The gauges are refreshed on those events rather than computed at scrape time, so
+        # that they also work with multi-process metrics, where only stored values are collected.
+        with self._lock:
+            streams = self._streams[name] = [stream for stream in self._streams[name] if _is_open(stream)]
+            active = min(self._requests[name], len(streams))
+        OLLAMA_HTTP_POOL_CONNECTIONS.labels(transport=name, state="idle").set(len(streams) - active)
+        OLLAMA_HTTP_POOL_CONNECTIONS.labels(transport=name, state="active").set(active)
+
+    def _trace(self, transport: str, event: str, info: Dict[str, Any]):
+        with self._lock:
+            if event == _CONNECTION_OPENED:
+                self.connections_opened += 1
+                self._streams[transport].append(info["return_value"])
+            elif event == _REQUEST_STARTED:
+                self._requests[transport] += 1
+            elif event in _REQUEST_ENDED:
+                self._requests[transport] -= 1
+            else:
+                return
+        if event == _CONNECTION_OPENED:
+            OLLAMA_HTTP_CONNECTIONS_OPENED_TOTAL.labels(transport=transport).inc()
+        self._update_gauges(transport)
+
+    def _trace_sync(self, event: str, info: Dict[str, Any]):
+        self._trace("sync", event, info)
+
+    async def _trace_async(self, event: str, info: Dict[str, Any]):
+        self._trace("async", event, info)
+
+    def _on_sync_request(self, request: Any):
+        request.extensions["trace"] = self._trace_sync
+
+    async def _on_async_request(self, request: Any):
+        request.extensions["trace"] = self._trace_async
+
+    def sync_client_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments that make an `httpx.Client` use this pool."""
+        return {
+            "transport": self._sync_transport,
+            "timeout": self.timeout,
+            "event_hooks": {"request": [self._on_sync_request]},
+        }
+
+    def async_client_kwargs(self) -> Dict[str, Any]:
+        """Keyword arguments that make an `httpx.AsyncClient` use this pool."""
+        return {
+            "transport": self._async_transport,
+            "timeout": self.timeout,
+            "event_hooks": {"request": [self._on_async_request]},
+        }
+
+    def chat_ollama_kwargs(self) -> Dict[str, Dict[str, Any]]:
+        """Keyword arguments that make a `ChatOllama` use this pool."""
+        return {"sync_client_kwargs": self.sync_client_kwargs(), "async_client_kwargs": self.async_client_kwargs()}
+
+    def close(self):
+        """Close the sync transport and its connections."""
+        self._sync_transport.close()
+        self._update_gauges("sync")
+
+    async def aclose(self):
+        """Close both transports and their connections, from the event loop the async one ran on."""
+        self.close()
+        await self._async_transport.aclose()
+        self._update_gauges("async")
+
+
+@lru_cache()
+def get_shared_http_pool() -> SharedHTTPPool:
+    """Get the process-wide HTTP pool, configured from the API settings."""
+    from .config import settings
+
+    return SharedHTTPPool(
+        max_connections=settings.http_max_connections,
+        max_keepalive_connections=settings.http_max_keepalive_connections,
+        keepalive_expiry=settings.http_keepalive_expiry_seconds,
+        connect_timeout=settings.http_connect_timeout_seconds,
+        read_timeout=settings.http_read_timeout_seconds,
+    )
+
+
+async def aclose_shared_http_pool():
+    """Close the process-wide HTTP pool, if it was created; the next `get_shared_http_pool()` builds a new one."""
+    if get_shared_http_pool.cache_info().currsize:
+        await get_shared_http_pool().aclose()
+        get_shared_http_pool.cache_clear()
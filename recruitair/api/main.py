@@ -1,23 +1,42 @@
+import asyncio
 from contextlib import asynccontextmanager
 import logging
+import os
 import time
 
-from fastapi import Depends, FastAPI, HTTPException, Response
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from fastapi import Depends, FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest
+from fastapi.responses import StreamingResponse
+import orjson
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, generate_latest, multiprocess
+from pydantic import ValidationError
+
+from recruitair.job_offers.models import KeyCriteriaResponse
 
+from .admission import BULK_LANE, INTERACTIVE_LANE, AdmissionRejected, lane_scope
 from .config import settings
+from .deadlines import DeadlineExceeded, RequestDeadline, deadline_scope, run_with_deadline
 from .dependencies import get_model
+from .http_pool import aclose_shared_http_pool
 from .model import BaseEvaluatorModel
 from .monitoring import (
+    EVAL_BATCH_SIZE,
     EVAL_REQUEST_LATENCY_SECONDS,
+    EVAL_REQUESTS_CANCELLED_TOTAL,
     EVAL_REQUESTS_FAILED_TOTAL,
     EVAL_REQUESTS_TOTAL,
+    EVAL_STREAM_INTER_CRITERION_SECONDS,
+    EVAL_STREAM_TIME_TO_FIRST_CRITERION_SECONDS,
+    FIRST_REQUEST_LATENCY_SECONDS,
     MODEL_EVALUATION_ERRORS_TOTAL,
     MODEL_EVALUATION_LATENCY_SECONDS,
     OFFER_TEXT_LENGTH,
 )
-from .schemas import EvalRequest, EvalResponse
+from .near_duplicates import ApproximateKeyCriteriaResponse
+from .responses import CompactJSONResponse, criteria_items, criterion_item
+from .schemas import EvalBatchItem, EvalBatchRequest, EvalBatchResponse, EvalRequest, EvalResponse
 
 logger = logging.getLogger("uvicorn.error")
 
@@ -27,12 +46,31 @@ async def lifespan(app: FastAPI):
     """
     FastAPI lifespan hook used to warm up the model once at startup
     and log the loaded prompt/version.
+
+    The warm-up generations run in the background, so that /health can report the API
+    as not ready until they finish.
     """
     logger.info("Preloading prompt at startup...")
     _get_model = app.dependency_overrides.get(get_model, get_model)
     model: BaseEvaluatorModel = _get_model()
     logger.info("Loaded prompt version: %s", getattr(model, "version", "unknown"))
+    app.state.ready = False
+    warmup = asyncio.create_task(_warm_up(app, model))
     yield
+    warmup.cancel()
+    await aclose_shared_http_pool()
+
+
+async def _warm_up(app: FastAPI, model: BaseEvaluatorModel):
+    start = time.perf_counter()
+    try:
+        await model.warmup()
+    except Exception as exc:  # noqa: BLE001
+        # The first requests then pay for the warm-up, which beats never becoming ready
+        logger.exception("Model warm-up failed: %s", exc)
+    else:
+        logger.info("Model warmed up in %.1fs", time.perf_counter() - start)
+    app.state.ready = True
 
 
 app = FastAPI(
@@ -50,14 +88,63 @@ app.add_middleware(
 )
 
 
+def get_request_deadline(http_request: Request) -> RequestDeadline:
+    """Deadline of the request, from the timeout header if the client sent one, else the settings default."""
+    header = http_request.headers.get(settings.request_timeout_header)
+    if header is None:
+        return RequestDeadline(settings.request_timeout_seconds)
+    try:
+        timeout = float(header)
+    except ValueError:
+        timeout = float("nan")
+    if not 0 < timeout <= settings.max_request_timeout_seconds:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{settings.request_timeout_header} must be a number of seconds in "
+            f"(0, {settings.max_request_timeout_seconds:g}]",
+        )
+    return RequestDeadline(timeout)
+
+
+def _request_lane(http_request: Request, default: str) -> str:
+    lane = http_request.headers.get(settings.priority_header)
+    if lane is None:
+        api_key = http_request.headers.get("X-API-Key")
+        return settings.priority_api_keys.get(api_key, default) if api_key else default
+    if lane not in (INTERACTIVE_LANE, BULK_LANE):
+        raise HTTPException(
+            status_code=400, detail=f"{settings.priority_header} must be '{INTERACTIVE_LANE}' or '{BULK_LANE}'"
+        )
+    return lane
+
+
+def get_request_lane(http_request: Request) -> str:
+    """Priority lane of the request, from the priority header or the client's API key; interactive by default."""
+    return _request_lane(http_request, INTERACTIVE_LANE)
+
+
+def get_batch_lane(http_request: Request) -> str:
+    """Priority lane of a batch request; batches are bulk traffic unless the client says otherwise."""
+    return _request_lane(http_request, BULK_LANE)
+
+
 @app.post("/eval", response_model=EvalResponse)
-def evaluate(
+async def evaluate(
     request: EvalRequest,
+    http_request: Request,
     model: BaseEvaluatorModel = Depends(get_model),
-) -> EvalResponse:
+    deadline: RequestDeadline = Depends(get_request_deadline),
+    lane: str = Depends(get_request_lane),
+) -> CompactJSONResponse:
     """
     Evaluate a job offer to extract the key criteria.
 
+    The evaluation is cancelled, and the Ollama generation with it, when the request
+    deadline expires (504) or the client disconnects. It is scheduled in the
+    interactive lane unless the priority header or API key say otherwise. Criteria
+    reused from a near-duplicate offer are flagged with its similarity in the
+    `near_duplicate_flag_header` response header.
+
     This endpoint is instrumented with Prometheus metrics:
     - request count
     - request latency
@@ -65,8 +152,136 @@ def evaluate(
     - failures
     - input length distribution
     """
+    with lane_scope(lane):
+        response = await _evaluate_offer(model, request.offer_text, deadline, http_request.is_disconnected)
+    headers: Optional[Dict[str, str]] = None
+    similarity = _approximate_similarity(response)
+    if similarity is not None and settings.near_duplicate_flag_header:
+        headers = {settings.near_duplicate_flag_header: f"{similarity:.3f}"}
+    # Serialized as is, without being validated again against EvalResponse
+    return CompactJSONResponse({"criteria": criteria_items(response)}, headers=headers)
+
+
+@app.post("/eval/batch", response_model=EvalBatchResponse)
+async def evaluate_batch(
+    request: EvalBatchRequest,
+    http_request: Request,
+    model: BaseEvaluatorModel = Depends(get_model),
+    deadline: RequestDeadline = Depends(get_request_deadline),
+    lane: str = Depends(get_batch_lane),
+) -> CompactJSONResponse:
+    """
+    Evaluate several job offers at once, returning one result per offer in the same order.
+
+    Offers are evaluated concurrently (up to `batch_max_concurrency` at a time) and an
+    invalid offer (one /eval would reject), a failing one, or one still running at the
+    request deadline, yields an error for that item only. Every item updates the same
+    Prometheus metrics as a single /eval request. Batches are scheduled in the bulk lane
+    unless the priority header or API key say otherwise.
+    """
+    EVAL_BATCH_SIZE.observe(len(request.items))
+    semaphore = asyncio.Semaphore(settings.batch_max_concurrency)
+
+    async def run(item: EvalBatchItem) -> Dict[str, Any]:
+        # An EvalBatchResponse.Result, built as a dict like the /eval response
+        try:
+            EvalRequest(offer_text=item.offer_text)
+        except ValidationError as exc:
+            return {"criteria": None, "error": _validation_error(exc), "approximate_similarity": None}
+        async with semaphore:
+            try:
+                response = await _evaluate_offer(model, item.offer_text, deadline)
+            except HTTPException as exc:
+                return {"criteria": None, "error": exc.detail, "approximate_similarity": None}
+            return {
+                "criteria": criteria_items(response),
+                "error": None,
+                "approximate_similarity": _approximate_similarity(response),
+            }
+
+    try:
+        # Items share the request deadline; a client disconnect cancels all of them at once
+        with lane_scope(lane):
+            results = await run_with_deadline(
+                asyncio.gather(*(run(item) for item in request.items)),
+                RequestDeadline(None),
+                http_request.is_disconnected,
+            )
+    except DeadlineExceeded as exc:
+        EVAL_REQUESTS_CANCELLED_TOTAL.labels(reason=exc.reason).inc()
+        raise HTTPException(status_code=499, detail="Client closed request") from exc
+    return CompactJSONResponse({"results": results})
+
+
+@app.post(
+    "/eval/stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def evaluate_stream(
+    request: EvalRequest,
+    model: BaseEvaluatorModel = Depends(get_model),
+    deadline: RequestDeadline = Depends(get_request_deadline),
+    lane: str = Depends(get_request_lane),
+) -> StreamingResponse:
+    """
+    Stream the key criteria of a job offer as newline-delimited JSON.
+
+    Each line is an `EvalResponse.CriteriaItem`, emitted as soon as the model has
+    generated it. If the model fails mid-stream, the request deadline expires or the
+    request is shed by admission control, a final `{"error": ...}` line is sent. A client
+    disconnect cancels the stream, and the Ollama generation with it.
+    """
+    return StreamingResponse(
+        _stream_offer(model, request.offer_text, deadline, lane), media_type="application/x-ndjson"
+    )
+
+
+async def _stream_offer(
+    model: BaseEvaluatorModel, offer_text: str, deadline: RequestDeadline, lane: str
+) -> AsyncIterator[bytes]:
+    EVAL_REQUESTS_TOTAL.inc()
+    OFFER_TEXT_LENGTH.observe(len(offer_text or ""))
+
+    start_request = time.perf_counter()
+    last_emit = None
+    try:
+        async with deadline_scope(deadline):
+            with lane_scope(lane):
+                async for criterion in model.astream_criteria(offer_text):
+                    now = time.perf_counter()
+                    if last_emit is None:
+                        EVAL_STREAM_TIME_TO_FIRST_CRITERION_SECONDS.observe(now - start_request)
+                    else:
+                        EVAL_STREAM_INTER_CRITERION_SECONDS.observe(now - last_emit)
+                    last_emit = now
+                    yield orjson.dumps(criterion_item(criterion)) + b"\n"
+    except TimeoutError:
+        EVAL_REQUESTS_CANCELLED_TOTAL.labels(reason="deadline").inc()
+        EVAL_REQUESTS_FAILED_TOTAL.inc()
+        yield b'{"error": "Evaluation deadline exceeded"}\n'
+    except AdmissionRejected as exc:
+        yield orjson.dumps({"error": "Server overloaded, retry later", "retry_after": exc.retry_after}) + b"\n"
+    except Exception as exc:  # noqa: BLE001
+        MODEL_EVALUATION_ERRORS_TOTAL.inc()
+        EVAL_REQUESTS_FAILED_TOTAL.inc()
+        logger.exception("Model evaluation failed: %s", exc)
+        yield b'{"error": "Model prediction failed"}\n'
+    finally:
+        elapsed = time.perf_counter() - start_request
+        MODEL_EVALUATION_LATENCY_SECONDS.observe(elapsed)
+        _observe_request_latency(elapsed)
+
+
+async def _evaluate_offer(
+    model: BaseEvaluatorModel,
+    offer_text: str,
+    deadline: RequestDeadline,
+    is_disconnected: Optional[Callable[[], Awaitable[bool]]] = None,
+) -> KeyCriteriaResponse:
+    """Run the model on one offer under the request deadline, updating the per-request metrics."""
     EVAL_REQUESTS_TOTAL.inc()
-    OFFER_TEXT_LENGTH.observe(len(request.offer_text or ""))
+    OFFER_TEXT_LENGTH.observe(len(offer_text or ""))
 
     start_request = time.perf_counter()
 
@@ -74,7 +289,9 @@ def evaluate(
         # Measure only the model evaluation part separately
         start_model = time.perf_counter()
         try:
-            response = model.evaluate(request.offer_text)
+            response = await run_with_deadline(model.aevaluate(offer_text), deadline, is_disconnected)
+        except (AdmissionRejected, DeadlineExceeded):
+            raise
         except Exception as exc:  # noqa: BLE001
             MODEL_EVALUATION_ERRORS_TOTAL.inc()
             logger.exception("Model evaluation failed: %s", exc)
@@ -82,30 +299,63 @@ def evaluate(
         finally:
             MODEL_EVALUATION_LATENCY_SECONDS.observe(time.perf_counter() - start_model)
 
-    except Exception:
+    except AdmissionRejected as exc:
+        # Load shedding, not a failure: tell the client when to come back
+        raise HTTPException(
+            status_code=exc.status_code,
+            detail="Server overloaded, retry later",
+            headers={"Retry-After": str(exc.retry_after)},
+        ) from exc
+
+    except DeadlineExceeded as exc:
+        EVAL_REQUESTS_CANCELLED_TOTAL.labels(reason=exc.reason).inc()
+        if exc.reason == "disconnect":
+            # Nobody is listening anymore, the status is only for the access logs
+            raise HTTPException(status_code=499, detail="Client closed request") from exc
+        EVAL_REQUESTS_FAILED_TOTAL.inc()
+        raise HTTPException(status_code=504, detail="Evaluation deadline exceeded") from exc
+
+    except Exception as exc:
         # Any error that bubbles up to here is an inference failure
         EVAL_REQUESTS_FAILED_TOTAL.inc()
         # Still let FastAPI handle it as 500
-        raise HTTPException(status_code=500, detail="Model prediction failed")
+        raise HTTPException(status_code=500, detail="Model prediction failed") from exc
 
     finally:
-        EVAL_REQUEST_LATENCY_SECONDS.observe(time.perf_counter() - start_request)
-
-    # Normal successful path
-    output_criteria: list[EvalResponse.CriteriaItem] = []
-    for criteria in response.key_criteria:
-        item = EvalResponse.CriteriaItem(
-            description=criteria.description,
-            # model returns importance in 0–100; API exposes 0–1
-            importance=criteria.importance / 100,
-        )
-        output_criteria.append(item)
+        _observe_request_latency(time.perf_counter() - start_request)
+
+    return response
+
+
+_first_request_observed = False
+
+
+def _observe_request_latency(elapsed: float):
+    """Record the latency of an evaluation request, and separately that of the first one since startup."""
+    global _first_request_observed  # pylint: disable=W0603
+    EVAL_REQUEST_LATENCY_SECONDS.observe(elapsed)
+    if not _first_request_observed:
+        _first_request_observed = True
+        FIRST_REQUEST_LATENCY_SECONDS.set(elapsed)
+
+
+def _validation_error(exc: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in exc.errors())
+
 
-    return EvalResponse(criteria=output_criteria)
+def _approximate_similarity(response: KeyCriteriaResponse) -> Optional[float]:
+    """Similarity of the near-duplicate the criteria were reused from, if they were and flagging is on."""
+    if isinstance(response, ApproximateKeyCriteriaResponse) and settings.near_duplicate_flag_header:
+        return response.similarity
+    return None
 
 
 @app.get("/health")
-def health():
+def health(response: Response):
+    """Readiness of the API: 503 until the startup warm-up of the model has finished."""
+    if not getattr(app.state, "ready", False):
+        response.status_code = 503
+        return {"status": "warming_up"}
     return {"status": "ok"}
 
 
@@ -114,12 +364,14 @@ def metrics() -> Response:
     """
     Expose Prometheus metrics in the OpenMetrics / Prometheus text format.
 
-    Prometheus will scrape this endpoint at /metrics.
+    Prometheus will scrape this endpoint at /metrics. When the API runs in several
+    worker processes (`PROMETHEUS_MULTIPROC_DIR` set), the samples of all the workers
+    are aggregated, whichever worker answers the scrape.
     """
-    # Using default global registry here; if you ever need a custom registry
-    # you can wire it up via CollectorRegistry().
-    registry = CollectorRegistry()
-    # In simple setups generate_latest() uses the default REGISTRY implicitly,
-    # so we can just call it without passing registry.
-    data = generate_latest()  # type: ignore[arg-type]
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        data = generate_latest(registry)
+    else:
+        data = generate_latest()
     return Response(content=data, media_type=CONTENT_TYPE_LATEST)
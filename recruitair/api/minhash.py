@@ -0,0 +1,199 @@
+"""
+MinHash LSH index of offers, to find near-duplicates of an offer in sublinear time.
+
+The index is CPU-only numpy: signatures are split in bands, each band is hashed, and
+candidates are the offers sharing at least one band hash, found by binary search in a
+per-band sorted order. Candidates are then checked against the full signature.
+
+It is only imported when near-duplicate reuse is enabled, so that numpy stays out of
+the API import otherwise.
+"""
+
+import re
+import threading
+import time
+from typing import List, Optional, Tuple
+import unicodedata
+import zlib
+
+import numpy as np
+
+from recruitair.job_offers.models import KeyCriteriaResponse
+
+from .monitoring import NEAR_DUPLICATE_INDEX_SIZE, NEAR_DUPLICATE_LOOKUP_SECONDS, NEAR_DUPLICATE_LOOKUPS_TOTAL
+
+_WORD_RE = re.compile(r"\w+")
+# Largest prime below 2**32: hash values stay within uint32
+_PRIME = np.uint64(4294967291)
+# Recall asked of the banding at the similarity threshold when choosing the band size
+_BAND_RECALL = 0.99
+# Inserts kept out of the sorted band orders, and scanned linearly, until they are merged in
+_MERGE_BATCH = 1024
+
+
+def shingles(text: str, size: int = 3) -> List[str]:
+    """Overlapping `size`-word shingles of the offer, case-, accent- and punctuation-insensitive."""
+    words = _WORD_RE.findall(unicodedata.normalize("NFKC", text).casefold())
+    if len(words) <= size:
+        return [" ".join(words)]
+    return [" ".join(words[idx : idx + size]) for idx in range(len(words) - size + 1)]
+
+
+class MinHashIndex:
+    """
+    Append-only MinHash LSH index of offers, bounded to `max_entries` (oldest dropped first).
+
+    The bands are sized for the `threshold`, so that pairs at the threshold share a band
+    with probability 0.99; more similar pairs are found even more reliably.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        num_perm: int = 64,
+        shingle_words: int = 3,
+        max_entries: int = 100_000,
+        seed: int = 1,
+    ):
+        if not 0 < threshold <= 1:
+            raise ValueError("threshold must be in (0, 1]")
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_words = shingle_words
+        self.max_entries = max_entries
+        self.bands, self.rows = self._band_layout(num_perm, threshold)
+        rng = np.random.default_rng(seed)
+        # Universal hashing (a * x + b) mod p; a < 2**31 keeps the product within uint64
+        self._a = rng.integers(1, 2**31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 2**32, size=num_perm, dtype=np.uint64)
+        self._band_mix = rng.integers(1, 2**32, size=self.rows, dtype=np.uint64) | np.uint64(1)
+        self._lock = threading.Lock()
+        self._clear(capacity=min(max_entries, 1024))
+
+    @staticmethod
+    def _band_layout(num_perm: int, threshold: float) -> Tuple[int, int]:
+        """The (bands, rows) split with the most rows that still finds pairs at the threshold."""
+        for rows in sorted((r for r in range(1, num_perm + 1) if num_perm % r == 0), reverse=True):
+            bands = num_perm // rows
+            if 1 - (1 - threshold**rows) ** bands >= _BAND_RECALL:
+                return bands, rows
+        return num_perm, 1
+
+    def _clear(self, capacity: int):
+        self._size = 0
+        # Entries below this index are in the sorted band orders
+        self._sorted = 0
+        self._signatures = np.empty((capacity, self.num_perm), dtype=np.uint32)
+        self._band_hashes = np.empty((self.bands, capacity), dtype=np.uint32)
+        # Per band, the merged entries sorted by band hash: their ids and, contiguous for the search, their hashes
+        self._orders = [np.empty(0, dtype=np.int32) for _ in range(self.bands)]
+        self._sorted_keys = [np.empty(0, dtype=np.uint32) for _ in range(self.bands)]
+        self._values: List[KeyCriteriaResponse] = []
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        """Memory used by the index arrays (not the stored responses)."""
+        sorted_bands = sum(order.nbytes + keys.nbytes for order, keys in zip(self._orders, self._sorted_keys))
+        return self._signatures.nbytes + self._band_hashes.nbytes + sorted_bands
+
+    def signature(self, text: str) -> np.ndarray:
+        hashes = np.unique(
+            np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles(text, self.shingle_words)), dtype=np.uint64)
+        )
+        return ((np.outer(hashes, self._a) + self._b) % _PRIME).min(axis=0).astype(np.uint32)
+
+    def _hash_bands(self, signatures: np.ndarray) -> np.ndarray:
+        """Band hashes of signatures of shape (n, num_perm), as an array of shape (bands, n)."""
+        bands = signatures.reshape(len(signatures), self.bands, self.rows).astype(np.uint64)
+        # Wrapping uint64 arithmetic, truncated to 32 bits; collisions are filtered by the signature check
+        return (bands * self._band_mix).sum(axis=2).T.astype(np.uint32)
+
+    def add(self, text: str, value: KeyCriteriaResponse):
+        self.add_signatures(self.signature(text)[np.newaxis, :], [value])
+
+    def add_signatures(self, signatures: np.ndarray, values: List[KeyCriteriaResponse]):
+        """Index precomputed signatures of shape (n, num_perm), e.g. to bulk-load an index."""
+        band_hashes = self._hash_bands(signatures)
+        with self._lock:
+            for start in range(0, len(values), self.max_entries):
+                stop = start + self.max_entries
+                self._append(signatures[start:stop], band_hashes[:, start:stop], values[start:stop])
+            NEAR_DUPLICATE_INDEX_SIZE.set(self._size)
+
+    def _append(self, signatures: np.ndarray, band_hashes: np.ndarray, values: List[KeyCriteriaResponse]):
+        count = len(values)
+        if self._size + count > self.max_entries:
+            # Drop the oldest quarter at once, rather than rebuilding the orders on every insert
+            self._drop_oldest(max(self._size + count - self.max_entries, self.max_entries // 4))
+        if self._size + count > len(self._signatures):
+            self._grow(min(self.max_entries, max(2 * len(self._signatures), self._size + count)))
+        self._signatures[self._size : self._size + count] = signatures
+        self._band_hashes[:, self._size : self._size + count] = band_hashes
+        self._values.extend(values)
+        self._size += count
+        if self._size - self._sorted >= _MERGE_BATCH:
+            self._merge()
+
+    def _grow(self, capacity: int):
+        signatures = np.empty((capacity, self.num_perm), dtype=np.uint32)
+        signatures[: self._size] = self._signatures[: self._size]
+        band_hashes = np.empty((self.bands, capacity), dtype=np.uint32)
+        band_hashes[:, : self._size] = self._band_hashes[:, : self._size]
+        self._signatures, self._band_hashes = signatures, band_hashes
+
+    def _merge(self):
+        """Insert the pending entries into the sorted band orders."""
+        pending = np.arange(self._sorted, self._size)
+        for band in range(self.bands):
+            new = pending[np.argsort(self._band_hashes[band, pending], kind="stable")]
+            new_keys = self._band_hashes[band, new]
+            positions = np.searchsorted(self._sorted_keys[band], new_keys)
+            self._orders[band] = np.insert(self._orders[band], positions, new)
+            self._sorted_keys[band] = np.insert(self._sorted_keys[band], positions, new_keys)
+        self._sorted = self._size
+
+    def _drop_oldest(self, count: int):
+        keep = self._size - min(count, self._size)
+        signatures = self._signatures[self._size - keep : self._size].copy()
+        band_hashes = self._band_hashes[:, self._size - keep : self._size].copy()
+        values = self._values[self._size - keep :]
+        self._clear(capacity=len(self._signatures))
+        self._signatures[:keep] = signatures
+        self._band_hashes[:, :keep] = band_hashes
+        self._values = values
+        self._size = keep
+        self._merge()
+
+    def lookup(self, text: str) -> Optional[Tuple[KeyCriteriaResponse, float]]:
+        """The stored response of the most similar indexed offer and its similarity, if above the threshold."""
+        start = time.perf_counter()
+        signature = self.signature(text)
+        result = self.lookup_signature(signature)
+        NEAR_DUPLICATE_LOOKUP_SECONDS.observe(time.perf_counter() - start)
+        NEAR_DUPLICATE_LOOKUPS_TOTAL.labels(result="miss" if result is None else "hit").inc()
+        return result
+
+    def lookup_signature(self, signature: np.ndarray) -> Optional[Tuple[KeyCriteriaResponse, float]]:
+        query = self._hash_bands(signature[np.newaxis, :])[:, 0]
+        with self._lock:
+            candidates = []
+            for band in range(self.bands):
+                keys = self._sorted_keys[band]
+                left = np.searchsorted(keys, query[band], side="left")
+                right = np.searchsorted(keys, query[band], side="right")
+                candidates.append(self._orders[band][left:right])
+            pending = self._band_hashes[:, self._sorted : self._size]
+            candidates.append(self._sorted + np.flatnonzero((pending == query[:, np.newaxis]).any(axis=0)))
+            ids = np.unique(np.concatenate(candidates))
+            if not len(ids):
+                return None
+            similarities = (self._signatures[ids] == signature).mean(axis=1)
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+            return self._values[ids[best]], float(similarities[best])
@@ -1,10 +1,25 @@
+import asyncio
+from contextlib import contextmanager
 import logging
-from typing import Any, Dict, Optional
+import math
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple, Union
 
-from langchain_ollama import ChatOllama
-import mlflow
+from recruitair.job_offers.models import KeyCriteriaResponse, KeyCriterion
 
-from recruitair.job_offers.models import KeyCriteriaResponse
+from .backends import BackendPool, OllamaBackend
+from .deadlines import GenerationCostTracker
+from .http_pool import SharedHTTPPool
+from .monitoring import (
+    CONTEXT_TRUNCATIONS_TOTAL,
+    CONTEXT_WINDOW_REQUESTS_TOTAL,
+    LLM_TOKENS,
+    LLM_TOKENS_PER_SECOND,
+    MODEL_STAGE_LATENCY_SECONDS,
+    MODEL_WARMUP_SECONDS,
+)
+from .prompts import compile_prompt
+from .streaming import KeyCriteriaStreamParser
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +30,19 @@ class BaseEvaluatorModel:
     def evaluate(self, job_offer: str) -> KeyCriteriaResponse:
         raise NotImplementedError()
 
+    async def aevaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        """Async variant of `evaluate`; defaults to running `evaluate` in a worker thread."""
+        return await asyncio.to_thread(self.evaluate, job_offer)
+
+    async def astream_criteria(self, job_offer: str) -> AsyncIterator[KeyCriterion]:
+        """Yield the key criteria as they become available; defaults to yielding them all at the end."""
+        response = await self.aevaluate(job_offer)
+        for criterion in response.key_criteria:
+            yield criterion
+
+    async def warmup(self) -> None:
+        """Get ready to serve, e.g. load the model weights; called once at startup, a no-op by default."""
+
     @property
     def version(self) -> Optional[str]:
         return None
@@ -33,28 +61,257 @@ class DummyEvaluator(BaseEvaluatorModel):
     def evaluate(self, job_offer: str) -> KeyCriteriaResponse:
         return KeyCriteriaResponse(key_criteria=[])
 
+    async def aevaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        return self.evaluate(job_offer)
+
+
+class _EvaluationStages:
+    """Stage timings and Ollama token usage of one evaluation, recorded with the evaluator's labels."""
+
+    def __init__(self, labels: Dict[str, str]):
+        self._labels = labels
+        self._mark = time.perf_counter()
+
+    def lap(self, stage: str):
+        """Record the time since the previous stage ended as the duration of `stage`."""
+        now = time.perf_counter()
+        MODEL_STAGE_LATENCY_SECONDS.labels(stage=stage, **self._labels).observe(now - self._mark)
+        self._mark = now
+
+    def usage(self, metadata: Mapping[str, Any]):
+        """Record the token counts and throughputs Ollama reports with the last chunk of a generation."""
+        for kind, count_key, duration_key, phase in (
+            ("prompt", "prompt_eval_count", "prompt_eval_duration", "prompt_eval"),
+            ("completion", "eval_count", "eval_duration", "eval"),
+        ):
+            count = metadata.get(count_key)
+            if count is None:
+                continue
+            LLM_TOKENS.labels(kind=kind, **self._labels).observe(count)
+            # Durations are in nanoseconds
+            duration = metadata.get(duration_key)
+            if duration:
+                LLM_TOKENS_PER_SECOND.labels(phase=phase, **self._labels).observe(count / (duration / 1e9))
+
 
 class OLlamaEvaluator(BaseEvaluatorModel):
 
-    def __init__(self, model: str, version: str, prompt_uri: str, ollama_base_url: Optional[str] = None):
+    def __init__(
+        self,
+        model: str,
+        version: str,
+        prompt_uri: str,
+        ollama_base_url: Union[str, Sequence[str], None] = None,
+        max_concurrency: Optional[int] = None,
+        prompt_loader: Optional[Callable[[str], Any]] = None,
+        backend_pool: Optional[BackendPool] = None,
+        http_pool: Optional[SharedHTTPPool] = None,
+        ollama_options: Optional[Mapping[str, Any]] = None,
+        warmup_offer: str = "",
+        warmup_generations: int = 0,
+        num_ctx_buckets: Sequence[int] = (),
+        chars_per_token: float = 3.0,
+        expected_output_tokens: int = 512,
+    ):
         self._model = model
         self._version = version
         self._prompt_uri = prompt_uri
-        self._ollama_base_url = ollama_base_url
+        # Caps in-flight async calls to each Ollama backend; extra callers wait here instead of piling up upstream
+        if backend_pool is None:
+            urls = [ollama_base_url] if ollama_base_url is None or isinstance(ollama_base_url, str) else ollama_base_url
+            backend_pool = BackendPool(list(urls), max_concurrency=max_concurrency)
+        elif max_concurrency is not None and max_concurrency != backend_pool.max_concurrency:
+            raise ValueError("With a backend_pool, set max_concurrency on the pool")
+        self._pool = backend_pool
+        self._http_pool = http_pool
+        self._prompt_loader = prompt_loader
+        # ChatOllama fields such as keep_alive or num_ctx; unset ones keep Ollama's defaults
+        self._ollama_options = {key: value for key, value in (ollama_options or {}).items() if value is not None}
+        self._warmup_offer = warmup_offer
+        self._warmup_generations = warmup_generations
+        # Context windows to pick from per request; Ollama reloads the model whenever num_ctx changes, so keep few
+        self._num_ctx_buckets = sorted(set(num_ctx_buckets))
+        self._chars_per_token = chars_per_token
+        self._expected_output_tokens = expected_output_tokens
         self._prompt = None
-        self._llm = None
+        # JSON-constrained client of each backend, by label and context window (None without buckets)
+        self._clients: Dict[Tuple[str, Optional[int]], Any] = {}
+        self._labels: Dict[str, str] = {}
+        self._generation_costs = GenerationCostTracker()
         self._load()
 
     def _load(self):
-        self._llm = ChatOllama(model=f"{self._model}:{self._version}", temperature=0, base_url=self._ollama_base_url)
-        self._prompt = mlflow.genai.load_prompt(self._prompt_uri)
+        self._prompt = compile_prompt(self._load_prompt())
+        self._labels = {
+            "model": self._model,
+            "model_version": self._version,
+            "prompt_version": str(getattr(self._prompt, "version", None) or "unknown"),
+        }
+        for backend in self._pool.backends:
+            for num_ctx in self._num_ctx_buckets or [None]:
+                options = self._ollama_options if num_ctx is None else {**self._ollama_options, "num_ctx": num_ctx}
+                self._clients[backend.label, num_ctx] = self._make_client(backend, options)
+        self._pool.start_health_checks()
+
+    def _load_prompt(self) -> Any:
+        if self._prompt_loader is not None:
+            return self._prompt_loader(self._prompt_uri)
+        # MLflow is heavy to import, so it is only loaded with the model
+        import mlflow
+
+        return mlflow.genai.load_prompt(self._prompt_uri)
+
+    def _make_client(self, backend: OllamaBackend, options: Mapping[str, Any]) -> Any:
+        """The JSON-constrained chat model of one backend, with the given ChatOllama options."""
+        # LangChain is heavy to import, so it is only loaded with the model
+        from langchain_ollama import ChatOllama
+
+        client_kwargs = self._http_pool.chat_ollama_kwargs() if self._http_pool is not None else {}
+        llm = ChatOllama(
+            model=f"{self._model}:{self._version}",
+            temperature=0,
+            base_url=backend.url,
+            **options,
+            **client_kwargs,
+        )
+        # Binding the response schema renders it once here instead of on every request. The
+        # response is always streamed, so that the time to first token can be measured, and
+        # validated straight from the JSON text.
+        return llm.bind(format=self._prompt.response_format)
+
+    def _stream(self, client: Any, messages) -> Iterator[Tuple[str, Mapping[str, Any]]]:
+        """Stream the generated text of a call, with the response metadata Ollama sends along."""
+        for chunk in client.stream(messages):
+            yield chunk.text, chunk.response_metadata
+
+    async def _astream(self, client: Any, messages) -> AsyncIterator[Tuple[str, Mapping[str, Any]]]:
+        async for chunk in client.astream(messages):
+            yield chunk.text, chunk.response_metadata
+
+    def _format(self, job_offer: str):
+        return self._prompt.format(job_offer_text=job_offer)
+
+    def _context_window(self, messages) -> Optional[int]:
+        """
+        The smallest context window bucket fitting the prompt and the expected output, estimated
+        from their length in characters; None when no buckets are configured.
+        """
+        if not self._num_ctx_buckets:
+            return None
+        chars = len(messages) if isinstance(messages, str) else sum(len(m["content"]) for m in messages)
+        tokens = math.ceil(chars / self._chars_per_token) + self._expected_output_tokens
+        num_ctx = next((bucket for bucket in self._num_ctx_buckets if bucket >= tokens), None)
+        if num_ctx is None:
+            num_ctx = self._num_ctx_buckets[-1]
+            CONTEXT_TRUNCATIONS_TOTAL.labels(**self._labels).inc()
+            logger.warning(
+                "Prompt and output of ~%d tokens exceed the largest context window (%d), Ollama will truncate them",
+                tokens,
+                num_ctx,
+            )
+        CONTEXT_WINDOW_REQUESTS_TOTAL.labels(num_ctx=str(num_ctx), **self._labels).inc()
+        logger.debug("Estimated %d tokens, using a context window of %d", tokens, num_ctx)
+        return num_ctx
 
     def evaluate(self, job_offer: str) -> KeyCriteriaResponse:
-        response = self._llm.with_structured_output(
-            self._prompt.response_format,
-            method="json_schema",
-        ).invoke(self._prompt.format(job_offer_text=job_offer))
-        return KeyCriteriaResponse.model_validate(response)
+        stages = _EvaluationStages(self._labels)
+        messages = self._format(job_offer)
+        num_ctx = self._context_window(messages)
+        stages.lap("format")
+        pieces: List[str] = []
+        metadata: Dict[str, Any] = {}
+        with self._pool.acquire() as backend:
+            stages.lap("queue_wait")
+            for text, chunk_metadata in self._stream(self._clients[backend.label, num_ctx], messages):
+                if not pieces:
+                    stages.lap("time_to_first_token")
+                pieces.append(text)
+                metadata.update(chunk_metadata)
+            stages.lap("generation")
+        response = KeyCriteriaResponse.model_validate_json("".join(pieces))
+        stages.lap("parse_validate")
+        stages.usage(metadata)
+        return response
+
+    async def aevaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        stages = _EvaluationStages(self._labels)
+        messages = self._format(job_offer)
+        num_ctx = self._context_window(messages)
+        stages.lap("format")
+        pieces: List[str] = []
+        metadata: Dict[str, Any] = {}
+        async with self._pool.aacquire() as backend:
+            with self._track_generation():
+                stages.lap("queue_wait")
+                async for text, chunk_metadata in self._astream(self._clients[backend.label, num_ctx], messages):
+                    if not pieces:
+                        stages.lap("time_to_first_token")
+                    pieces.append(text)
+                    metadata.update(chunk_metadata)
+                stages.lap("generation")
+        response = KeyCriteriaResponse.model_validate_json("".join(pieces))
+        stages.lap("parse_validate")
+        stages.usage(metadata)
+        return response
+
+    async def astream_criteria(self, job_offer: str) -> AsyncIterator[KeyCriterion]:
+        stages = _EvaluationStages(self._labels)
+        messages = self._format(job_offer)
+        num_ctx = self._context_window(messages)
+        stages.lap("format")
+        parser = KeyCriteriaStreamParser()
+        metadata: Dict[str, Any] = {}
+        first = True
+        async with self._pool.aacquire() as backend:
+            with self._track_generation():
+                stages.lap("queue_wait")
+                async for text, chunk_metadata in self._astream(self._clients[backend.label, num_ctx], messages):
+                    if first:
+                        stages.lap("time_to_first_token")
+                        first = False
+                    metadata.update(chunk_metadata)
+                    for criterion in parser.feed(text):
+                        yield criterion
+                # Criteria are parsed as they stream, so generation includes the time the consumer took
+                stages.lap("generation")
+        stages.usage(metadata)
+
+    async def warmup(self) -> None:
+        """
+        Run `warmup_generations` generations of the warm-up offer on every backend.
+
+        The first one loads the weights into Ollama's memory, where `keep_alive` keeps them,
+        and every one leaves the prompt prefix in Ollama's prompt cache. A backend failing to
+        warm up is only logged: it is then warmed up by the first requests it gets.
+        """
+        if not self._warmup_generations:
+            return
+        messages = self._format(self._warmup_offer)
+        num_ctx = self._context_window(messages)
+
+        async def warm(backend):
+            start = time.perf_counter()
+            for _ in range(self._warmup_generations):
+                async for _chunk in self._astream(self._clients[backend.label, num_ctx], messages):
+                    pass
+            MODEL_WARMUP_SECONDS.labels(backend=backend.label).set(time.perf_counter() - start)
+            logger.info("Warmed up Ollama backend %s in %.1fs", backend.label, time.perf_counter() - start)
+
+        results = await asyncio.gather(*(warm(backend) for backend in self._pool.backends), return_exceptions=True)
+        for backend, result in zip(self._pool.backends, results):
+            if isinstance(result, Exception):
+                logger.warning("Warm-up of Ollama backend %s failed: %s", backend.label, result)
+
+    @contextmanager
+    def _track_generation(self) -> Iterator[None]:
+        # Cancelling the awaiting task closes the HTTP request, which makes Ollama stop generating
+        start = time.perf_counter()
+        try:
+            yield
+        except (asyncio.CancelledError, GeneratorExit):
+            self._generation_costs.cancelled(time.perf_counter() - start)
+            raise
+        self._generation_costs.completed(time.perf_counter() - start)
 
     @property
     def version(self) -> str:
@@ -2,9 +2,14 @@
 Shared Prometheus metrics for the RecruitAIr Job Criteria Extractor.
 
 Import these metrics from API / training code and update them there.
+
+When the API runs in several worker processes, `PROMETHEUS_MULTIPROC_DIR` must be set
+before this module is imported: every worker then writes its samples there and
+`/metrics` aggregates them. The `multiprocess_mode` of each gauge says how the values
+of the live workers are combined.
 """
 
-from prometheus_client import Counter, Histogram
+from prometheus_client import Counter, Gauge, Histogram
 
 # --- API-level metrics ---
 
@@ -24,6 +29,71 @@ EVAL_REQUEST_LATENCY_SECONDS = Histogram(
     buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10),
 )
 
+FIRST_REQUEST_LATENCY_SECONDS = Gauge(
+    "recruitair_first_request_latency_seconds",
+    "Latency of the first evaluation request served since startup, in seconds (worst worker)",
+    multiprocess_mode="max",
+)
+
+EVAL_REQUESTS_COALESCED_TOTAL = Counter(
+    "recruitair_eval_requests_coalesced_total",
+    "Total number of evaluations that waited on an identical in-flight call instead of calling the model",
+)
+
+EVAL_BATCH_SIZE = Histogram(
+    "recruitair_eval_batch_size",
+    "Number of offers per /eval/batch request",
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500),
+)
+
+EVAL_STREAM_TIME_TO_FIRST_CRITERION_SECONDS = Histogram(
+    "recruitair_eval_stream_time_to_first_criterion_seconds",
+    "Time from receiving a /eval/stream request to emitting its first criterion, in seconds",
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10),
+)
+
+EVAL_STREAM_INTER_CRITERION_SECONDS = Histogram(
+    "recruitair_eval_stream_inter_criterion_seconds",
+    "Time between consecutive criteria emitted by /eval/stream, in seconds",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5),
+)
+
+# --- Admission control metrics ---
+
+ADMISSION_IN_FLIGHT = Gauge(
+    "recruitair_admission_in_flight",
+    "Number of evaluations currently admitted and running, per priority lane",
+    ["lane"],
+    multiprocess_mode="livesum",
+)
+
+ADMISSION_QUEUE_DEPTH = Gauge(
+    "recruitair_admission_queue_depth",
+    "Number of evaluations waiting in the admission queue, per priority lane",
+    ["lane"],
+    multiprocess_mode="livesum",
+)
+
+ADMISSION_QUEUE_WAIT_SECONDS = Histogram(
+    "recruitair_admission_queue_wait_seconds",
+    "Time evaluations spent waiting in the admission queue, per priority lane, in seconds",
+    ["lane"],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 3, 5, 10, 30),
+)
+
+ADMISSION_LANE_LATENCY_SECONDS = Histogram(
+    "recruitair_admission_lane_latency_seconds",
+    "Latency of admitted evaluations, queue wait included, per priority lane, in seconds",
+    ["lane"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30),
+)
+
+ADMISSION_REJECTED_TOTAL = Counter(
+    "recruitair_admission_rejected_total",
+    "Total number of evaluations rejected by admission control, per priority lane",
+    ["lane", "reason"],
+)
+
 # --- Model-level metrics ---
 
 MODEL_EVALUATION_LATENCY_SECONDS = Histogram(
@@ -32,11 +102,120 @@ MODEL_EVALUATION_LATENCY_SECONDS = Histogram(
     buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10),
 )
 
+# Labels of the evaluator-level metrics, to tell a new prompt version from a saturated backend
+MODEL_LABELS = ["model", "model_version", "prompt_version"]
+
+MODEL_STAGE_LATENCY_SECONDS = Histogram(
+    "recruitair_model_stage_latency_seconds",
+    "Time spent in each stage of an Ollama evaluation (format, queue_wait, time_to_first_token, generation, "
+    "parse_validate), in seconds",
+    ["stage", *MODEL_LABELS],
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30),
+)
+
+LLM_TOKENS = Histogram(
+    "recruitair_llm_tokens",
+    "Tokens per Ollama generation as reported by Ollama, by kind (prompt or completion)",
+    ["kind", *MODEL_LABELS],
+    buckets=(16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192),
+)
+
+LLM_TOKENS_PER_SECOND = Histogram(
+    "recruitair_llm_tokens_per_second",
+    "Ollama token throughput per generation, by phase (prompt_eval or eval)",
+    ["phase", *MODEL_LABELS],
+    buckets=(1, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000),
+)
+
+CONTEXT_WINDOW_REQUESTS_TOTAL = Counter(
+    "recruitair_context_window_requests_total",
+    "Total number of Ollama generations by context window (num_ctx bucket) chosen for the prompt",
+    ["num_ctx", *MODEL_LABELS],
+)
+
+CONTEXT_TRUNCATIONS_TOTAL = Counter(
+    "recruitair_context_truncations_total",
+    "Total number of prompts estimated to exceed the largest context window, which Ollama truncates",
+    MODEL_LABELS,
+)
+
 MODEL_EVALUATION_ERRORS_TOTAL = Counter(
     "recruitair_model_evaluation_errors_total",
     "Total number of exceptions raised by model.evaluate()",
 )
 
+EVAL_REQUESTS_CANCELLED_TOTAL = Counter(
+    "recruitair_eval_requests_cancelled_total",
+    "Total number of evaluations cancelled because of their deadline or a client disconnect",
+    ["reason"],
+)
+
+LLM_GENERATIONS_CANCELLED_TOTAL = Counter(
+    "recruitair_llm_generations_cancelled_total",
+    "Total number of in-flight Ollama generations cancelled before completion",
+    ["reason"],
+)
+
+LLM_COMPUTE_SECONDS_SAVED_TOTAL = Counter(
+    "recruitair_llm_compute_seconds_saved_total",
+    "Estimated Ollama generation seconds saved by cancelling abandoned generations",
+)
+
+# --- Ollama backend metrics ---
+
+MODEL_WARMUP_SECONDS = Gauge(
+    "recruitair_model_warmup_seconds",
+    "Duration of the startup warm-up generations on each Ollama backend, in seconds",
+    ["backend"],
+    multiprocess_mode="max",
+)
+
+OLLAMA_BACKEND_IN_FLIGHT = Gauge(
+    "recruitair_ollama_backend_in_flight",
+    "Number of calls currently in flight to each Ollama backend",
+    ["backend"],
+    multiprocess_mode="livesum",
+)
+
+OLLAMA_BACKEND_LATENCY_SECONDS = Histogram(
+    "recruitair_ollama_backend_latency_seconds",
+    "Latency of calls to each Ollama backend, in seconds",
+    ["backend"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10),
+)
+
+OLLAMA_BACKEND_ERRORS_TOTAL = Counter(
+    "recruitair_ollama_backend_errors_total",
+    "Total number of failed calls and health checks of each Ollama backend",
+    ["backend"],
+)
+
+OLLAMA_BACKEND_HEALTHY = Gauge(
+    "recruitair_ollama_backend_healthy",
+    "Whether each Ollama backend is currently routable (1) or ejected (0), by every worker",
+    ["backend"],
+    multiprocess_mode="livemin",
+)
+
+OLLAMA_HTTP_POOL_CONNECTIONS = Gauge(
+    "recruitair_ollama_http_pool_connections",
+    "Connections of the shared Ollama HTTP pool, by transport and state (active or idle)",
+    ["transport", "state"],
+    multiprocess_mode="livesum",
+)
+
+OLLAMA_HTTP_CONNECTIONS_OPENED_TOTAL = Counter(
+    "recruitair_ollama_http_connections_opened_total",
+    "Total number of new TCP connections opened by the shared Ollama HTTP pool",
+    ["transport"],
+)
+
+LONG_OFFER_CHUNKS = Histogram(
+    "recruitair_long_offer_chunks",
+    "Number of chunks a long offer was split into for map-reduce extraction",
+    buckets=(1, 2, 3, 4, 6, 8, 12, 16),
+)
+
 # --- Payload / business metrics (optional but useful) ---
 
 OFFER_TEXT_LENGTH = Histogram(
@@ -44,3 +223,56 @@ OFFER_TEXT_LENGTH = Histogram(
     "Length of offer_text passed to /eval (in characters)",
     buckets=(128, 256, 512, 1024, 2048, 4096, 8192),
 )
+
+OFFER_TEXT_NORMALIZED_LENGTH = Histogram(
+    "recruitair_offer_text_normalization_length_chars",
+    "Length of the offer text before and after pre-normalization (in characters)",
+    ["stage"],
+    buckets=(128, 256, 512, 1024, 2048, 4096, 8192),
+)
+
+OFFER_TEXT_ESTIMATED_TOKENS = Histogram(
+    "recruitair_offer_text_normalization_estimated_tokens",
+    "Estimated prompt tokens of the offer text before and after pre-normalization",
+    ["stage"],
+    buckets=(32, 64, 128, 256, 512, 1024, 2048),
+)
+
+# --- Result cache metrics ---
+
+RESULT_CACHE_HITS_TOTAL = Counter(
+    "recruitair_result_cache_hits_total",
+    "Total number of extraction results served from the result cache",
+    ["tier"],
+)
+
+RESULT_CACHE_MISSES_TOTAL = Counter(
+    "recruitair_result_cache_misses_total",
+    "Total number of lookups that missed every result cache tier",
+)
+
+RESULT_CACHE_EVICTIONS_TOTAL = Counter(
+    "recruitair_result_cache_evictions_total",
+    "Total number of entries evicted from the result cache",
+    ["tier", "reason"],
+)
+
+# --- Near-duplicate reuse metrics ---
+
+NEAR_DUPLICATE_INDEX_SIZE = Gauge(
+    "recruitair_near_duplicate_index_size",
+    "Number of extracted offers in the near-duplicate index",
+    multiprocess_mode="livesum",
+)
+
+NEAR_DUPLICATE_LOOKUP_SECONDS = Histogram(
+    "recruitair_near_duplicate_lookup_seconds",
+    "Time to look an offer up in the near-duplicate index, signature included, in seconds",
+    buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+)
+
+NEAR_DUPLICATE_LOOKUPS_TOTAL = Counter(
+    "recruitair_near_duplicate_lookups_total",
+    "Total number of near-duplicate index lookups, by result (hit reuses stored criteria, miss calls the model)",
+    ["result"],
+)
@@ -0,0 +1,97 @@
+"""
+Near-duplicate reuse of extracted criteria.
+
+Offers are often reposted with small edits (a location line, the salary, reordered
+bullets), which an exact-text cache misses. Every extracted offer is indexed by a
+MinHash signature of its word shingles (see `recruitair.api.minhash`), and a new offer
+whose estimated Jaccard similarity to an indexed one reaches the threshold reuses that
+offer's criteria instead of calling the model.
+"""
+
+import logging
+from typing import TYPE_CHECKING, AsyncIterator, Optional
+
+from recruitair.job_offers.models import KeyCriteriaResponse, KeyCriterion
+
+from .model import BaseEvaluatorModel
+
+if TYPE_CHECKING:
+    from .minhash import MinHashIndex
+
+logger = logging.getLogger(__name__)
+
+
+class ApproximateKeyCriteriaResponse(KeyCriteriaResponse):
+    """Criteria reused from a near-duplicate offer, with the estimated similarity to that offer."""
+
+    similarity: float
+
+
+class ApproximateKeyCriterion(KeyCriterion):
+    """A criterion streamed from the criteria of a near-duplicate offer, with the estimated similarity."""
+
+    similarity: float
+
+
+class NearDuplicateEvaluator(BaseEvaluatorModel):
+    """
+    Evaluator wrapper that reuses the criteria of a near-duplicate of the offer, if one
+    was extracted before, and indexes every offer it extracts.
+
+    Reused results are `ApproximateKeyCriteriaResponse`s (`ApproximateKeyCriterion`s when
+    streamed); they are not indexed themselves, so that reuse never chains from one edit
+    to the next.
+    """
+
+    def __init__(self, inner: BaseEvaluatorModel, index: "MinHashIndex"):
+        self._inner = inner
+        self._index = index
+
+    def _reuse(self, job_offer: str) -> Optional[ApproximateKeyCriteriaResponse]:
+        found = self._index.lookup(job_offer)
+        if found is None:
+            return None
+        response, similarity = found
+        return ApproximateKeyCriteriaResponse(key_criteria=response.key_criteria, similarity=similarity)
+
+    def _remember(self, job_offer: str, response: KeyCriteriaResponse):
+        if not isinstance(response, ApproximateKeyCriteriaResponse):
+            self._index.add(job_offer, response)
+
+    def evaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        reused = self._reuse(job_offer)
+        if reused is not None:
+            return reused
+        response = self._inner.evaluate(job_offer)
+        self._remember(job_offer, response)
+        return response
+
+    async def aevaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        reused = self._reuse(job_offer)
+        if reused is not None:
+            return reused
+        response = await self._inner.aevaluate(job_offer)
+        self._remember(job_offer, response)
+        return response
+
+    async def astream_criteria(self, job_offer: str) -> AsyncIterator[KeyCriterion]:
+        reused = self._reuse(job_offer)
+        if reused is not None:
+            for criterion in reused.key_criteria:
+                yield ApproximateKeyCriterion(
+                    description=criterion.description, importance=criterion.importance, similarity=reused.similarity
+                )
+            return
+        criteria = []
+        async for criterion in self._inner.astream_criteria(job_offer):
+            criteria.append(criterion)
+            yield criterion
+        # Only reached when the stream completed, so partial results are never indexed
+        self._remember(job_offer, KeyCriteriaResponse(key_criteria=criteria))
+
+    async def warmup(self) -> None:
+        await self._inner.warmup()
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._inner.version
@@ -0,0 +1,221 @@
+"""
+Deterministic pre-normalization of offer text before it is sent to the model.
+
+Offers scraped from job boards often carry HTML remnants, runs of whitespace and
+legal or benefits blocks that never contribute criteria, but still cost prompt
+tokens and prefill latency on every request.
+"""
+
+import html
+import math
+import re
+from typing import AsyncIterator, Callable, Iterable, List, Optional, Sequence
+import unicodedata
+
+from recruitair.job_offers.models import KeyCriteriaResponse, KeyCriterion
+
+from .model import BaseEvaluatorModel
+from .monitoring import OFFER_TEXT_ESTIMATED_TOKENS, OFFER_TEXT_NORMALIZED_LENGTH
+
+_COMMENT_RE = re.compile(r"<!--.*?-->", re.S)
+_SCRIPT_STYLE_RE = re.compile(r"<(script|style)\b[^>]*>.*?</\1\s*>", re.I | re.S)
+_LIST_ITEM_RE = re.compile(r"<li\b[^>]*>", re.I)
+_BLOCK_TAG_RE = re.compile(r"<(?:br|hr)\b[^>]*>|</(?:p|div|li|ul|ol|h[1-6]|tr|table|section)\s*>", re.I)
+_TAG_RE = re.compile(r"</?[a-zA-Z][^>]*>")
+_INLINE_SPACE_RE = re.compile(r"[^\S\n]+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
+# Longer paragraphs likely mix boilerplate with requirements, so they are kept whole
+_MAX_BOILERPLATE_PARAGRAPH_CHARS = 1000
+
+# A short line that introduces a section: "Benefits:", "## What we offer", "ABOUT US"
+_HEADING_RE = re.compile(r"^(?:#{1,6}\s+.+|[A-Z][A-Z &/-]{2,}|[^.!?:]{1,60}:)$")
+# A capitalized line of at most four words without punctuation: "Responsibilities", "Your profile"
+_PLAIN_HEADING_RE = re.compile(r"^[A-Z][\w'&/()-]*(?: [\w'&/()-]+){0,3}$")
+_LIST_MARKER_RE = re.compile(r"^(?:[-*\u2022]|\d+[.)])\s")
+
+DEFAULT_BOILERPLATE_SECTIONS = (
+    r"benefits",
+    r"perks( (and|&) benefits)?",
+    r"what we offer",
+    r"what('s| is) in it for you",
+    r"why (join|work with) us",
+    r"about (us|the company)",
+)
+
+DEFAULT_BOILERPLATE_PARAGRAPHS = (
+    r"equal (employment )?opportunit(y|ies)",
+    r"without regard to (race|age|gender|sex|religion|color|national origin)",
+    r"reasonable accommodations?",
+    r"e-verify",
+    r"(privacy (notice|policy)|data protection).{0,80}(personal data|applicants?|candidates?)",
+)
+
+
+def estimate_tokens(text: str, chars_per_token: float) -> int:
+    """Estimate the number of prompt tokens of `text`, without loading a tokenizer."""
+    return math.ceil(len(text) / chars_per_token)
+
+
+def strip_markup(text: str) -> str:
+    """Drop HTML comments, scripts and tags (keeping line breaks of block elements) and unescape entities."""
+    text = _COMMENT_RE.sub("", text)
+    text = _SCRIPT_STYLE_RE.sub("", text)
+    text = _LIST_ITEM_RE.sub("\n- ", text)
+    text = _BLOCK_TAG_RE.sub("\n", text)
+    text = _TAG_RE.sub("", text)
+    return html.unescape(text)
+
+
+def collapse_whitespace(text: str) -> str:
+    """Collapse runs of spaces within lines and keep at most one blank line between paragraphs."""
+    text = unicodedata.normalize("NFC", text).replace("\r\n", "\n").replace("\r", "\n")
+    lines = [_INLINE_SPACE_RE.sub(" ", line).strip() for line in text.split("\n")]
+    return _BLANK_LINES_RE.sub("\n\n", "\n".join(lines)).strip()
+
+
+class BoilerplateFilter:
+    """
+    Removes boilerplate from an offer: whole sections whose heading matches one of
+    `section_patterns`, and short paragraphs matching one of `paragraph_patterns`.
+
+    A dropped section ends at the next heading-like line, or at the first paragraph after a
+    blank line that is not a list item, so that a heading the filter does not recognize
+    never takes the rest of the offer with it.
+    """
+
+    def __init__(
+        self,
+        section_patterns: Iterable[str] = DEFAULT_BOILERPLATE_SECTIONS,
+        paragraph_patterns: Iterable[str] = DEFAULT_BOILERPLATE_PARAGRAPHS,
+    ):
+        sections = "|".join(f"(?:{pattern})" for pattern in section_patterns)
+        paragraphs = "|".join(f"(?:{pattern})" for pattern in paragraph_patterns)
+        self._section_re = re.compile(rf"^[#\s]*(?:{sections})\s*:?$", re.I) if sections else None
+        self._paragraph_re = re.compile(paragraphs, re.I) if paragraphs else None
+
+    def __call__(self, text: str) -> str:
+        kept: List[str] = []
+        dropping = False
+        # Whether the dropped section has content, whether a blank line followed it, and whether its
+        # last line was short enough to read as a heading (a run of those is a list without markers)
+        dropped_content = after_blank = after_short_line = False
+        for line in text.split("\n"):
+            stripped = line.strip()
+            if dropping:
+                if not stripped:
+                    after_blank = dropped_content
+                    continue
+                if (
+                    _HEADING_RE.match(stripped)
+                    or (_PLAIN_HEADING_RE.match(stripped) and not after_short_line)
+                    or (after_blank and not _LIST_MARKER_RE.match(stripped))
+                ):
+                    dropping = False
+                else:
+                    dropped_content = True
+                    after_blank = False
+                    after_short_line = bool(_PLAIN_HEADING_RE.match(stripped))
+                    continue
+            if self._section_re and self._section_re.match(stripped):
+                dropping = True
+                dropped_content = after_blank = False
+                after_short_line = True
+                continue
+            kept.append(line)
+        paragraphs = "\n".join(kept).split("\n\n")
+        if self._paragraph_re is not None:
+            paragraphs = [p for p in paragraphs if not self._is_boilerplate_paragraph(p)]
+        filtered = _BLANK_LINES_RE.sub("\n\n", "\n\n".join(paragraphs)).strip()
+        # Never hand the model an empty offer because everything looked like boilerplate
+        return filtered or text
+
+    def _is_boilerplate_paragraph(self, paragraph: str) -> bool:
+        if self._paragraph_re is None or len(paragraph) > _MAX_BOILERPLATE_PARAGRAPH_CHARS:
+            return False
+        return bool(self._paragraph_re.search(paragraph))
+
+
+NORMALIZATION_STEPS = ("strip_markup", "collapse_whitespace", "drop_boilerplate")
+
+# Part of the result cache key: bump it whenever a change to the steps changes their output
+NORMALIZATION_VERSION = "2"
+
+
+class OfferNormalizer:
+    """
+    Pipeline of text normalization steps, applied in order.
+
+    Each call records the character and estimated-token counts of the offer before and
+    after normalization, estimating tokens with the same `chars_per_token` ratio as the
+    evaluator's context window sizing.
+    """
+
+    def __init__(self, steps: Sequence[Callable[[str], str]], chars_per_token: float = 3.0):
+        self._steps = list(steps)
+        self._chars_per_token = chars_per_token
+
+    @classmethod
+    def from_names(
+        cls,
+        names: Iterable[str],
+        boilerplate_sections: Optional[Iterable[str]] = None,
+        boilerplate_paragraphs: Optional[Iterable[str]] = None,
+        chars_per_token: float = 3.0,
+    ) -> "OfferNormalizer":
+        """Build a normalizer from step names of `NORMALIZATION_STEPS`."""
+        steps = []
+        for name in names:
+            if name == "strip_markup":
+                steps.append(strip_markup)
+            elif name == "collapse_whitespace":
+                steps.append(collapse_whitespace)
+            elif name == "drop_boilerplate":
+                steps.append(
+                    BoilerplateFilter(
+                        section_patterns=(*DEFAULT_BOILERPLATE_SECTIONS, *(boilerplate_sections or ())),
+                        paragraph_patterns=(*DEFAULT_BOILERPLATE_PARAGRAPHS, *(boilerplate_paragraphs or ())),
+                    )
+                )
+            else:
+                raise ValueError(f"Unknown normalization step {name!r}, expected one of {NORMALIZATION_STEPS}")
+        return cls(steps, chars_per_token=chars_per_token)
+
+    def __call__(self, text: str) -> str:
+        OFFER_TEXT_NORMALIZED_LENGTH.labels(stage="before").observe(len(text))
+        OFFER_TEXT_ESTIMATED_TOKENS.labels(stage="before").observe(estimate_tokens(text, self._chars_per_token))
+        for step in self._steps:
+            text = step(text)
+        OFFER_TEXT_NORMALIZED_LENGTH.labels(stage="after").observe(len(text))
+        OFFER_TEXT_ESTIMATED_TOKENS.labels(stage="after").observe(estimate_tokens(text, self._chars_per_token))
+        return text
+
+
+class NormalizingEvaluator(BaseEvaluatorModel):
+    """
+    Evaluator wrapper that normalizes the offer once, before the inner evaluator sees it.
+
+    It sits above the long-offer `ChunkedEvaluator`, so that offers are measured against the
+    chunking threshold and split after their markup and boilerplate are gone.
+    """
+
+    def __init__(self, inner: BaseEvaluatorModel, normalizer: Callable[[str], str]):
+        self._inner = inner
+        self._normalizer = normalizer
+
+    def evaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        return self._inner.evaluate(self._normalizer(job_offer))
+
+    async def aevaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        return await self._inner.aevaluate(self._normalizer(job_offer))
+
+    async def astream_criteria(self, job_offer: str) -> AsyncIterator[KeyCriterion]:
+        async for criterion in self._inner.astream_criteria(self._normalizer(job_offer)):
+            yield criterion
+
+    async def warmup(self) -> None:
+        await self._inner.warmup()
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._inner.version
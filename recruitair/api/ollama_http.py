@@ -0,0 +1,112 @@
+"""
+Ollama evaluator that calls Ollama's HTTP API directly, without LangChain.
+
+Each evaluation is one streamed `POST /api/chat` with the prompt's JSON schema as `format`.
+The request body, schema and options included, is rendered once per backend and context
+window, so a call only serializes its messages. Everything else (prompts, context window
+buckets, backends, admission, metrics, warm-up) is shared with `OLlamaEvaluator`.
+"""
+
+from typing import Any, AsyncIterator, Dict, Iterator, Mapping, Tuple
+
+import orjson
+
+from .backends import OllamaBackend, OllamaResponseError
+from .model import OLlamaEvaluator
+
+# Where the Ollama client connects when no base URL is configured
+DEFAULT_OLLAMA_URL = "http://127.0.0.1:11434"
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+# ChatOllama fields sent at the top level of the request rather than in its options
+_REQUEST_FIELDS = frozenset({"keep_alive"})
+# Message roles of LangChain-style prompts, as named by the Ollama API
+_ROLES = {"human": "user", "ai": "assistant"}
+_NO_METADATA: Mapping[str, Any] = {}
+
+
+class _ChatEndpoint:
+    """The `/api/chat` request of one backend and context window, and the HTTP clients that send it."""
+
+    __slots__ = ("client", "async_client", "_body_prefix")
+
+    def __init__(self, client: Any, async_client: Any, body: Dict[str, Any]):
+        self.client = client
+        self.async_client = async_client
+        # Everything but the messages, left open for them: '{..., "messages":'
+        self._body_prefix = orjson.dumps(body)[:-1] + b',"messages":'
+
+    def request_body(self, messages: Any) -> bytes:
+        if isinstance(messages, str):
+            messages = [{"role": "user", "content": messages}]
+        else:
+            messages = [{"role": _ROLES.get(m["role"], m["role"]), "content": m["content"]} for m in messages]
+        return self._body_prefix + orjson.dumps(messages) + b"}"
+
+
+def _response_error(status_code: int, content: bytes) -> OllamaResponseError:
+    try:
+        error = orjson.loads(content)["error"]
+    except (orjson.JSONDecodeError, KeyError, TypeError):
+        error = content.decode("utf-8", errors="replace")
+    return OllamaResponseError(error, status_code)
+
+
+def _parse_line(line: str) -> Tuple[str, Mapping[str, Any]]:
+    part = orjson.loads(line)
+    if "error" in part:
+        # The generation failed after the response had started
+        raise OllamaResponseError(part["error"], 500)
+    message = part.get("message")
+    text = message["content"] if message else ""
+    # Only the last part carries the token counts and durations
+    return text, part if part.get("done") else _NO_METADATA
+
+
+class OllamaHTTPEvaluator(OLlamaEvaluator):
+    """
+    `OLlamaEvaluator` that streams `/api/chat` over httpx directly instead of through
+    LangChain's `ChatOllama`: no LangChain import, no runnable or message objects per call.
+    """
+
+    def _make_client(self, backend: OllamaBackend, options: Mapping[str, Any]) -> _ChatEndpoint:
+        # httpx is only needed once a model is loaded
+        import httpx
+
+        base_url = backend.url or DEFAULT_OLLAMA_URL
+        if self._http_pool is not None:
+            client = httpx.Client(base_url=base_url, **self._http_pool.sync_client_kwargs())
+            async_client = httpx.AsyncClient(base_url=base_url, **self._http_pool.async_client_kwargs())
+        else:
+            # Like the Ollama client, wait as long as the generation takes
+            client = httpx.Client(base_url=base_url, timeout=None)
+            async_client = httpx.AsyncClient(base_url=base_url, timeout=None)
+        body: Dict[str, Any] = {
+            "model": f"{self._model}:{self._version}",
+            "stream": True,
+            "format": self._prompt.response_format,
+            "options": {"temperature": 0, **{k: v for k, v in options.items() if k not in _REQUEST_FIELDS}},
+        }
+        body.update((k, v) for k, v in options.items() if k in _REQUEST_FIELDS)
+        return _ChatEndpoint(client, async_client, body)
+
+    def _stream(self, client: _ChatEndpoint, messages) -> Iterator[Tuple[str, Mapping[str, Any]]]:
+        content = client.request_body(messages)
+        with client.client.stream("POST", "/api/chat", content=content, headers=_JSON_HEADERS) as response:
+            if response.status_code >= 400:
+                raise _response_error(response.status_code, response.read())
+            for line in response.iter_lines():
+                if line:
+                    yield _parse_line(line)
+
+    async def _astream(self, client: _ChatEndpoint, messages) -> AsyncIterator[Tuple[str, Mapping[str, Any]]]:
+        content = client.request_body(messages)
+        # Leaving the block on cancellation closes the connection, which makes Ollama stop generating
+        async with client.async_client.stream(
+            "POST", "/api/chat", content=content, headers=_JSON_HEADERS
+        ) as response:
+            if response.status_code >= 400:
+                raise _response_error(response.status_code, await response.aread())
+            async for line in response.aiter_lines():
+                if line:
+                    yield _parse_line(line)
@@ -0,0 +1,142 @@
+"""
+Local on-disk snapshots of MLflow prompts.
+
+Loading a prompt from the MLflow tracking server on every process start adds seconds
+of cold-start latency and makes startup depend on MLflow being reachable. The snapshot
+cache persists the resolved template and `response_format` locally, serves them
+immediately at startup, and refreshes stale snapshots from MLflow in the background.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from .prompts import CompiledPrompt, compile_prompt
+
+logger = logging.getLogger(__name__)
+
+
+def _load_from_mlflow(prompt_uri: str) -> Any:
+    import mlflow
+
+    return mlflow.genai.load_prompt(prompt_uri)
+
+
+class PromptSnapshotCache:
+    """Prompt loader that serves local snapshots and refreshes them from MLflow with a TTL."""
+
+    def __init__(
+        self,
+        directory: str | Path,
+        ttl_seconds: float = 3600,
+        namespace: str = "",
+        loader: Callable[[str], Any] = _load_from_mlflow,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._directory = Path(directory)
+        self._ttl_seconds = ttl_seconds
+        # Typically the tracking URI, so snapshots of different MLflow servers never collide
+        self._namespace = namespace
+        self._loader = loader
+        self._clock = clock
+        self._refreshing: Dict[str, threading.Thread] = {}
+        self._lock = threading.Lock()
+
+    def load(self, prompt_uri: str) -> Any:
+        """Return the prompt for `prompt_uri`, from the local snapshot when there is one."""
+        path = self._path(prompt_uri)
+        snapshot = self._read(path)
+        if snapshot is None:
+            logger.info("No local snapshot of prompt %s, loading it from MLflow", prompt_uri)
+            return self._fetch(prompt_uri, path)
+
+        age = self._clock() - snapshot["fetched_at"]
+        if age > self._ttl_seconds:
+            logger.info("Snapshot of prompt %s is %.0fs old, refreshing it in the background", prompt_uri, age)
+            self.refresh_in_background(prompt_uri)
+        return _prompt_from_snapshot(snapshot)
+
+    def refresh_in_background(self, prompt_uri: str) -> threading.Thread:
+        """Re-fetch the prompt from MLflow in a daemon thread and update its snapshot."""
+        with self._lock:
+            thread = self._refreshing.get(prompt_uri)
+            if thread is None or not thread.is_alive():
+                thread = threading.Thread(
+                    target=self._refresh, args=(prompt_uri,), name="prompt-snapshot-refresh", daemon=True
+                )
+                self._refreshing[prompt_uri] = thread
+                thread.start()
+        return thread
+
+    def _refresh(self, prompt_uri: str) -> None:
+        try:
+            self._fetch(prompt_uri, self._path(prompt_uri))
+        except Exception as exc:  # noqa: BLE001
+            # Keep serving the stale snapshot, it is retried on the next start
+            logger.warning("Could not refresh prompt %s from MLflow: %s", prompt_uri, exc)
+
+    def _fetch(self, prompt_uri: str, path: Path) -> Any:
+        prompt = self._loader(prompt_uri)
+        snapshot = {
+            "prompt_uri": prompt_uri,
+            "name": getattr(prompt, "name", None),
+            "version": getattr(prompt, "version", None),
+            "template": prompt.template,
+            "response_format": prompt.response_format,
+            "fetched_at": self._clock(),
+        }
+        self._write(path, snapshot)
+        return compile_prompt(prompt)
+
+    def _path(self, prompt_uri: str) -> Path:
+        digest = hashlib.sha256(f"{self._namespace}\x00{prompt_uri}".encode("utf-8")).hexdigest()
+        return self._directory / f"{digest[:32]}.json"
+
+    @staticmethod
+    def _read(path: Path) -> Optional[Dict[str, Any]]:
+        try:
+            with path.open("r", encoding="utf-8") as fh:
+                return json.load(fh)
+        except FileNotFoundError:
+            return None
+        except (OSError, json.JSONDecodeError) as exc:
+            logger.warning("Ignoring unreadable prompt snapshot %s: %s", path, exc)
+            return None
+
+    @staticmethod
+    def _write(path: Path, snapshot: Dict[str, Any]) -> None:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write-then-rename, so concurrent readers never see a partial snapshot
+            fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".prompt-", suffix=".json")
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(snapshot, fh)
+            os.replace(tmp_name, path)
+        except OSError as exc:
+            logger.warning("Could not write prompt snapshot %s: %s", path, exc)
+
+
+def _prompt_from_snapshot(snapshot: Dict[str, Any]) -> Any:
+    try:
+        return CompiledPrompt(
+            template=snapshot["template"],
+            response_format=snapshot["response_format"],
+            name=snapshot["name"],
+            version=snapshot["version"],
+        )
+    except ValueError:
+        # Jinja2 templates are rendered by MLflow itself
+        from mlflow.entities.model_registry import PromptVersion
+
+        return PromptVersion(
+            snapshot["name"],
+            snapshot["version"],
+            snapshot["template"],
+            response_format=snapshot["response_format"],
+        )
@@ -0,0 +1,84 @@
+"""Pre-compiled prompt templates for the per-request hot path."""
+
+import re
+from typing import Any, Dict, List, Optional, Union
+
+# Same variable syntax as MLflow's double-brace prompt templates
+_VARIABLE_RE = re.compile(r"\{\{\s*([a-zA-Z_][a-zA-Z0-9_]*(?:\.[a-zA-Z_][a-zA-Z0-9_]*)*)\s*\}\}")
+
+FormattedPrompt = Union[str, List[Dict[str, Any]]]
+
+
+def _split(text: str) -> List[str]:
+    # Even indices are literal text, odd indices are variable names
+    return _VARIABLE_RE.split(text)
+
+
+def _join(parts: List[str], values: Dict[str, Any]) -> str:
+    return "".join(str(values[part]) if idx % 2 else part for idx, part in enumerate(parts))
+
+
+class CompiledPrompt:
+    """
+    A prompt whose template was split around its variables once, so that formatting
+    a request is a single string join instead of a regex pass over the whole template.
+
+    Text and chat (list of messages) double-brace templates are supported, mirroring
+    `mlflow.entities.model_registry.PromptVersion.format`.
+    """
+
+    def __init__(
+        self,
+        template: FormattedPrompt,
+        response_format: Optional[Dict[str, Any]] = None,
+        name: Optional[str] = None,
+        version: Optional[str] = None,
+    ):
+        if _is_jinja2_template(template):
+            raise ValueError("Jinja2 prompt templates are not supported by CompiledPrompt")
+        self.template = template
+        self.response_format = response_format
+        self.name = name
+        self.version = version
+        if isinstance(template, str):
+            self._text_parts: Optional[List[str]] = _split(template)
+            self._chat_parts: List[tuple[str, List[str]]] = []
+            variables = self._text_parts[1::2]
+        else:
+            self._text_parts = None
+            self._chat_parts = [(message["role"], _split(message.get("content", ""))) for message in template]
+            variables = [var for _, parts in self._chat_parts for var in parts[1::2]]
+        self.variables = frozenset(variables)
+
+    @classmethod
+    def from_prompt_version(cls, prompt: Any) -> "CompiledPrompt":
+        """Compile an MLflow `PromptVersion` (or any object exposing the same attributes)."""
+        return cls(
+            template=prompt.template,
+            response_format=prompt.response_format,
+            name=getattr(prompt, "name", None),
+            version=getattr(prompt, "version", None),
+        )
+
+    def format(self, **values: Any) -> FormattedPrompt:
+        if missing := self.variables - values.keys():
+            raise ValueError(f"Missing variables: {missing}")
+        if self._text_parts is not None:
+            return _join(self._text_parts, values)
+        return [{"role": role, "content": _join(parts, values)} for role, parts in self._chat_parts]
+
+
+def compile_prompt(prompt: Any) -> Any:
+    """Pre-compile a prompt for the hot path, or return it unchanged if it cannot be (Jinja2 templates)."""
+    if isinstance(prompt, CompiledPrompt):
+        return prompt
+    try:
+        return CompiledPrompt.from_prompt_version(prompt)
+    except ValueError:
+        return prompt
+
+
+def _is_jinja2_template(template: FormattedPrompt) -> bool:
+    if isinstance(template, str):
+        return "{%" in template and "%}" in template
+    return any("{%" in msg.get("content", "") and "%}" in msg.get("content", "") for msg in template)
@@ -0,0 +1,37 @@
+"""
+Compact JSON responses of the evaluation endpoints.
+
+The criteria are already validated (importance within 0–100) when decoded from the model
+output, so the responses are built as plain dicts in one pass and serialized with orjson,
+instead of being rebuilt as pydantic models and validated again by FastAPI.
+"""
+
+from typing import Any, Dict
+
+from fastapi.responses import Response
+import orjson
+
+from recruitair.job_offers.models import KeyCriteriaResponse, KeyCriterion
+
+
+class CompactJSONResponse(Response):
+    """
+    JSON response rendered with orjson.
+
+    Endpoints return it directly, so FastAPI does not validate and serialize the content
+    again through their `response_model`, which still documents the schema in OpenAPI.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content)
+
+
+def criterion_item(criterion: KeyCriterion) -> Dict[str, Any]:
+    """An `EvalResponse.CriteriaItem` as a dict; the model rates importance from 0 to 100, the API from 0 to 1."""
+    return {"description": criterion.description, "importance": criterion.importance / 100}
+
+
+def criteria_items(response: KeyCriteriaResponse) -> list[Dict[str, Any]]:
+    return [criterion_item(criterion) for criterion in response.key_criteria]
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from pydantic import BaseModel, Field
 
@@ -21,3 +21,31 @@ class EvalResponse(BaseModel):
         )
 
     criteria: List[CriteriaItem]
+
+
+class EvalBatchItem(BaseModel):
+    # Checked against EvalRequest per item, so that one empty or overlong offer does not fail the whole batch
+    offer_text: str = Field(
+        ...,
+        description="Job criteria description; an offer EvalRequest would reject gets an error result",
+        examples=["Experience with Python", "Knowledge of ML algorithms."],
+    )
+
+
+class EvalBatchRequest(BaseModel):
+    items: List[EvalBatchItem] = Field(
+        ..., min_length=1, max_length=500, description="Job offers to evaluate, at most 500 per batch"
+    )
+
+
+class EvalBatchResponse(BaseModel):
+    class Result(BaseModel):
+        criteria: Optional[List[EvalResponse.CriteriaItem]] = Field(
+            None, description="Extracted criteria, or null if this offer failed"
+        )
+        error: Optional[str] = Field(None, description="Error message if this offer failed")
+        approximate_similarity: Optional[float] = Field(
+            None, description="Similarity of the near-duplicate offer the criteria were reused from, if they were"
+        )
+
+    results: List[Result] = Field(..., description="One result per requested offer, in request order")
@@ -0,0 +1,99 @@
+"""
+Single-flight coalescing of identical concurrent evaluations.
+
+Concurrent requests for the same (offer, model, prompt) key wait on one in-flight
+upstream call and share its result (or its exception).
+"""
+
+import asyncio
+from concurrent.futures import Future
+import threading
+from typing import AsyncIterator, Dict, Iterable, Optional
+
+from recruitair.job_offers.models import KeyCriteriaResponse, KeyCriterion
+
+from .cache import make_cache_key
+from .model import BaseEvaluatorModel
+from .monitoring import EVAL_REQUESTS_COALESCED_TOTAL
+
+
+class _Flight:
+    """An in-flight async evaluation and the number of callers waiting on it."""
+
+    def __init__(self, task: "asyncio.Task[KeyCriteriaResponse]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlightEvaluator(BaseEvaluatorModel):
+    """Evaluator wrapper that coalesces concurrent identical requests into one upstream call."""
+
+    def __init__(self, inner: BaseEvaluatorModel, key_parts: Iterable[str]):
+        self._inner = inner
+        self._key_parts = tuple(key_parts)
+        self._flights: Dict[str, _Flight] = {}
+        self._sync_flights: Dict[str, "Future[KeyCriteriaResponse]"] = {}
+        self._sync_lock = threading.Lock()
+
+    def evaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        key = make_cache_key(job_offer, *self._key_parts)
+        with self._sync_lock:
+            future = self._sync_flights.get(key)
+            leader = future is None
+            if future is None:
+                future = Future()
+                self._sync_flights[key] = future
+
+        if not leader:
+            EVAL_REQUESTS_COALESCED_TOTAL.inc()
+            return future.result()
+
+        try:
+            response = self._inner.evaluate(job_offer)
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(response)
+            return response
+        finally:
+            with self._sync_lock:
+                del self._sync_flights[key]
+
+    async def aevaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        key = make_cache_key(job_offer, *self._key_parts)
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(self._inner.aevaluate(job_offer)))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            EVAL_REQUESTS_COALESCED_TOTAL.inc()
+
+        flight.waiters += 1
+        try:
+            # Shielded, so one caller going away does not cancel the call for the others
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            if flight.waiters == 1:
+                # Nobody is left waiting for this result, stop the upstream call
+                flight.task.cancel()
+            raise
+        finally:
+            flight.waiters -= 1
+
+    async def astream_criteria(self, job_offer: str) -> AsyncIterator[KeyCriterion]:
+        # Streams are not coalesced: each caller needs its own incremental view
+        async for criterion in self._inner.astream_criteria(job_offer):
+            yield criterion
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    async def warmup(self) -> None:
+        await self._inner.warmup()
+
+    @property
+    def version(self) -> Optional[str]:
+        return self._inner.version
@@ -0,0 +1,67 @@
+"""Incremental parsing of a streamed `KeyCriteriaResponse` JSON document."""
+
+import json
+from typing import List, Optional
+
+from recruitair.job_offers.models import KeyCriterion
+
+
+class KeyCriteriaStreamParser:
+    """
+    Parses the `key_criteria` array of a `KeyCriteriaResponse` as its JSON text arrives.
+
+    Feed the generated text in arbitrary chunks; each `KeyCriterion` is returned as soon
+    as its closing brace has been received, without waiting for the rest of the document.
+    """
+
+    def __init__(self, array_key: str = "key_criteria"):
+        self._array_key = array_key
+        self._stack: List[str] = []  # open containers, "{" or "["
+        self._in_string = False
+        self._escape = False
+        self._string: List[str] = []
+        self._last_root_string: Optional[str] = None
+        self._array_depth: Optional[int] = None
+        self._item: List[str] = []
+
+    def feed(self, text: str) -> List[KeyCriterion]:
+        """Consume a chunk of generated text and return the criteria completed by it."""
+        completed: List[KeyCriterion] = []
+        for char in text:
+            capturing = self._array_depth is not None and len(self._stack) > self._array_depth
+            if capturing:
+                self._item.append(char)
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        self._last_root_string = "".join(self._string)
+                elif len(self._stack) == 1:
+                    self._string.append(char)
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string = []
+            elif char in "{[":
+                if char == "{" and self._array_depth is not None and len(self._stack) == self._array_depth:
+                    self._item = [char]
+                self._stack.append(char)
+                if char == "[" and self._stack == ["{", "["] and self._last_root_string == self._array_key:
+                    self._array_depth = len(self._stack)
+            elif char in "}]":
+                if not self._stack:
+                    raise ValueError("Unbalanced JSON in streamed response")
+                self._stack.pop()
+                if self._array_depth is not None:
+                    if char == "}" and len(self._stack) == self._array_depth:
+                        completed.append(KeyCriterion.model_validate(json.loads("".join(self._item))))
+                        self._item = []
+                    elif char == "]" and len(self._stack) < self._array_depth:
+                        self._array_depth = None
+        return completed
@@ -1,16 +1,10 @@
 """Base project config."""
 
+from functools import lru_cache
 from pathlib import Path
 
-from dotenv import load_dotenv
-from loguru import logger
-
-# Load environment variables from .env file if it exists
-load_dotenv()
-
 # Paths
 PROJ_ROOT = Path(__file__).resolve().parents[2]
-logger.info(f"PROJ_ROOT path is: {PROJ_ROOT}")
 
 DATA_DIR = PROJ_ROOT / "data"
 RAW_DATA_DIR = DATA_DIR / "raw"
@@ -21,12 +15,28 @@ MODELS_DIR = PROJ_ROOT / "models"
 REPORTS_DIR = PROJ_ROOT / "reports"
 FIGURES_DIR = REPORTS_DIR / "figures"
 
-# If tqdm is installed, configure loguru with tqdm.write
-# https://github.com/Delgan/loguru/issues/135
-try:
-    from tqdm import tqdm
 
-    logger.remove(0)
-    logger.add(lambda msg: tqdm.write(msg, end=""), colorize=True)
-except ModuleNotFoundError:
-    pass
+@lru_cache()
+def init_runtime() -> None:
+    """
+    Load environment variables from the .env file and configure logging.
+
+    Called once by the CLI entry points instead of at import time, so that importing
+    the project config has no side effects.
+    """
+    from dotenv import load_dotenv
+    from loguru import logger
+
+    # Load environment variables from .env file if it exists
+    load_dotenv()
+    logger.info(f"PROJ_ROOT path is: {PROJ_ROOT}")
+
+    # If tqdm is installed, configure loguru with tqdm.write
+    # https://github.com/Delgan/loguru/issues/135
+    try:
+        from tqdm import tqdm
+
+        logger.remove(0)
+        logger.add(lambda msg: tqdm.write(msg, end=""), colorize=True)
+    except ModuleNotFoundError:
+        pass
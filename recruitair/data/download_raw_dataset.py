@@ -11,6 +11,7 @@ import kagglehub
 from kagglehub import KaggleDatasetAdapter
 from requests import RequestException
 
+from recruitair.config.config_base import init_runtime
 from recruitair.config.data_download_config import (
     HF_RESUME_SCORE_DETAILS_REPO,
     HF_RESUME_SCORE_DETAILS_REVISION,
@@ -129,6 +130,7 @@ def download_huggingface_dataset(
 
 
 if __name__ == "__main__":
+    init_runtime()
     download_kaggle_dataset()
     download_huggingface_dataset_jsons(
         repo_id=HF_RESUME_SCORE_DETAILS_REPO,
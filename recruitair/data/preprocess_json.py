@@ -23,6 +23,7 @@ import re
 import sys
 from typing import List, Optional
 
+from recruitair.config.config_base import init_runtime
 from recruitair.config.data_preprocess_config import INTERIM_DATA_DIR, RAW_DATA_DIR
 
 FNAME_RE = re.compile(r"^(?P<label>match|mismatch)_(?P<num>\d+)\.json$", re.IGNORECASE)
@@ -112,4 +113,5 @@ def main():
 
 
 if __name__ == "__main__":
+    init_runtime()
     main()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Parallel, resumable criteria extraction over a JSONL file of job offers.
+
+Input:
+ - JSONL file, one offer per line (e.g. data/interim/preprocessed_jobs.jsonl)
+Output:
+ - JSONL file, each line:
+    {
+      "id": "...",
+      "key_criteria": [{"description": "...", "importance": 80}, ...],
+      "prompt_tokens": 512,
+      "completion_tokens": 96
+    }
+ - <output>.errors.jsonl with the offers that failed, retried on the next run
+
+Finished offers are appended to the output as they complete, so an interrupted run
+resumes by skipping every id already present in the output file.
+"""
+
+import argparse
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import itertools
+import json
+import os
+from pathlib import Path
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from recruitair.config.config_base import init_runtime
+from recruitair.config.data_preprocess_config import INTERIM_DATA_DIR, PROCESSED_DATA_DIR
+
+from .extract_criteria import Extraction, get_criteria_extractor
+
+ExtractFn = Callable[[str], Extraction]
+
+
+def iter_offers(path: Path, text_field: str, id_field: Optional[str] = None) -> Iterator[Tuple[str, str]]:
+    """Stream (id, offer text) pairs from a JSONL file; the id defaults to the line number."""
+    with path.open("r", encoding="utf-8") as fh:
+        for line_no, line in enumerate(fh, start=1):
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except json.JSONDecodeError as e:
+                print(f"WARNING: Skipping invalid JSON on line {line_no}: {e}", file=sys.stderr)
+                continue
+            text = obj.get(text_field)
+            if not text:
+                print(f"WARNING: No '{text_field}' found on line {line_no}", file=sys.stderr)
+                continue
+            offer_id = str(obj[id_field]) if id_field else str(line_no)
+            yield offer_id, text
+
+
+def load_checkpoint(output_path: Path) -> Set[str]:
+    """
+    Return the ids already written to the output file.
+
+    A trailing partial line (left by a run killed mid-write) is truncated away so that
+    new results are appended on a clean line.
+    """
+    if not output_path.exists():
+        return set()
+
+    done: Set[str] = set()
+    valid_bytes = 0
+    with output_path.open("rb") as fh:
+        for line in fh:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                done.add(str(json.loads(line)["id"]))
+            except (json.JSONDecodeError, KeyError):
+                break
+            valid_bytes += len(line)
+
+    if valid_bytes < output_path.stat().st_size:
+        print(f"WARNING: Truncating incomplete trailing record in {output_path}", file=sys.stderr)
+        with output_path.open("r+b") as fh:
+            fh.truncate(valid_bytes)
+    return done
+
+
+class ThroughputMeter:
+    """Thread-safe counters for offers and generated tokens per second."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self.offers = 0
+        self.failed = 0
+        self.completion_tokens = 0
+
+    def record(self, extraction: Optional[Extraction]) -> None:
+        with self._lock:
+            if extraction is None:
+                self.failed += 1
+                return
+            self.offers += 1
+            self.completion_tokens += extraction.completion_tokens
+
+    def report(self) -> str:
+        elapsed = max(time.perf_counter() - self._start, 1e-9)
+        return (
+            f"{self.offers} done, {self.failed} failed in {elapsed:.0f}s: "
+            f"{self.offers / elapsed:.2f} offers/s, {self.completion_tokens / elapsed:.1f} tokens/s"
+        )
+
+
+def run(
+    offers: Iterator[Tuple[str, str]],
+    extract_fns: List[ExtractFn],
+    output_path: Path,
+    workers: int = 4,
+    progress_every: float = 10.0,
+) -> ThroughputMeter:
+    """
+    Extract criteria for every offer not already in the output file.
+
+    Offers are spread round-robin over `extract_fns` (one per Ollama endpoint) and at most
+    `2 * workers` offers are held in memory at any time.
+    """
+    done = load_checkpoint(output_path)
+    if done:
+        print(f"Resuming: {len(done)} offers already extracted in {output_path}")
+
+    errors_path = output_path.with_name(output_path.name + ".errors.jsonl")
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    meter = ThroughputMeter()
+    endpoints = itertools.cycle(extract_fns)
+    pending: Dict[Future, str] = {}
+    last_report = [time.perf_counter()]
+
+    def maybe_report() -> None:
+        if time.perf_counter() - last_report[0] >= progress_every:
+            print(f"Progress: {meter.report()}")
+            last_report[0] = time.perf_counter()
+
+    with (
+        output_path.open("a", encoding="utf-8") as out_f,
+        errors_path.open("a", encoding="utf-8") as err_f,
+        ThreadPoolExecutor(max_workers=workers) as pool,
+    ):
+
+        def drain() -> None:
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                offer_id = pending.pop(future)
+                try:
+                    extraction = future.result()
+                except Exception as e:  # noqa: BLE001
+                    meter.record(None)
+                    err_f.write(json.dumps({"id": offer_id, "error": str(e)}, ensure_ascii=False) + "\n")
+                    err_f.flush()
+                    continue
+                meter.record(extraction)
+                record = {
+                    "id": offer_id,
+                    "key_criteria": extraction.criteria.model_dump()["key_criteria"],
+                    "prompt_tokens": extraction.prompt_tokens,
+                    "completion_tokens": extraction.completion_tokens,
+                }
+                out_f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out_f.flush()
+
+        for offer_id, text in offers:
+            if offer_id in done:
+                continue
+            pending[pool.submit(next(endpoints), text)] = offer_id
+            if len(pending) >= 2 * workers:
+                drain()
+            maybe_report()
+
+        while pending:
+            drain()
+            maybe_report()
+
+    return meter
+
+
+def main():
+    p = argparse.ArgumentParser(description="Extract key criteria for every offer of a JSONL file")
+    p.add_argument(
+        "--input-jsonl",
+        "-i",
+        type=Path,
+        default=INTERIM_DATA_DIR / "preprocessed_jobs.jsonl",
+        help="Input JSONL file (default: INTERIM_DATA_DIR/preprocessed_jobs.jsonl)",
+    )
+    p.add_argument(
+        "--output-jsonl",
+        "-o",
+        type=Path,
+        default=PROCESSED_DATA_DIR / "extracted_criteria.jsonl",
+        help="Output JSONL file, also used as checkpoint (default: PROCESSED_DATA_DIR/extracted_criteria.jsonl)",
+    )
+    p.add_argument("--text-field", default="job_description", help="Field holding the offer text")
+    p.add_argument("--id-field", default=None, help="Field holding the offer id (default: line number)")
+    p.add_argument("--workers", "-w", type=int, default=4, help="Number of concurrent extractions (default: 4)")
+    p.add_argument(
+        "--ollama-url",
+        action="append",
+        default=None,
+        help="Ollama base URL; repeat to spread the load over several endpoints (default: OLLAMA_HOST)",
+    )
+    p.add_argument("--model", default=None, help="Ollama model (default: OLLAMA_MODEL_NAME or dolphin3:8b)")
+    p.add_argument("--progress-every", type=float, default=10.0, help="Seconds between progress reports")
+    args = p.parse_args()
+
+    input_path: Path = args.input_jsonl
+    if not input_path.exists():
+        print(f"ERROR: input file does not exist: {input_path}", file=sys.stderr)
+        sys.exit(2)
+
+    base_urls = args.ollama_url or [os.getenv("OLLAMA_HOST")]
+    extract_fns = [get_criteria_extractor(args.model, url).extract_with_usage for url in base_urls]
+
+    print(f"Extracting criteria from {input_path} with {args.workers} workers over {len(base_urls)} endpoint(s)...")
+    meter = run(
+        iter_offers(input_path, args.text_field, args.id_field),
+        extract_fns,
+        args.output_jsonl,
+        workers=args.workers,
+        progress_every=args.progress_every,
+    )
+    print(f"✅ Done. {meter.report()}. JSONL written to: {args.output_jsonl}")
+
+
+if __name__ == "__main__":
+    init_runtime()
+    main()
@@ -1,19 +1,13 @@
 """Functions for criteria extraction."""
 
+from functools import lru_cache
 import os
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional, cast
 
-from langchain_ollama import ChatOllama
-import mlflow
+from recruitair.config.config_base import init_runtime
 
 from .models import KeyCriteriaResponse
 
-PROMPT_NAME = os.getenv("CRITERIA_EXTRACTION_PROMPT_NAME", "criteria-extraction")
-PROMPT_VERSION = os.getenv("CRITERIA_EXTRACTION_PROMPT_VERSION", "1")
-if not PROMPT_VERSION.isdigit():
-    raise ValueError("CRITERIA_EXTRACTION_PROMPT_VERSION must be a digit or not set")
-PROMPT_VERSION = int(PROMPT_VERSION)
-OLLAMA_MODEL = os.getenv("OLLAMA_MODEL_NAME", "dolphin3:8b")
-
 SAMPLE_JOB_OFFER = """
 We are looking for a Software Engineer with experience in Python and machine
 learning. The ideal candidate should have at least 3 years of experience in
@@ -24,18 +18,102 @@ ability to work in a team are essential.
 """
 
 
-def extract_key_criteria_from_job_offer(job_offer_text: str) -> KeyCriteriaResponse:
-    prompt = mlflow.genai.load_prompt(PROMPT_NAME, version=PROMPT_VERSION)
-    llm = ChatOllama(model=OLLAMA_MODEL, temperature=0)
-    response = llm.with_structured_output(prompt.response_format, method="json_schema").invoke(
-        prompt.format(job_offer_text=job_offer_text)
+class Extraction(NamedTuple):
+    """Extracted criteria together with the token usage reported by Ollama."""
+
+    criteria: KeyCriteriaResponse
+    prompt_tokens: int
+    completion_tokens: int
+
+
+class CriteriaExtractor:
+    """
+    Extracts key criteria from job offers with a prompt and structured-output chain
+    that are loaded once, so looping over many offers only pays for the LLM calls.
+
+    `client_kwargs` are extra `ChatOllama` arguments, such as the `chat_ollama_kwargs()`
+    of a shared HTTP pool.
+    """
+
+    def __init__(
+        self,
+        prompt: Any,
+        model: str,
+        base_url: Optional[str] = None,
+        client_kwargs: Optional[Mapping[str, Any]] = None,
+    ):
+        self.prompt = prompt
+        self.model = model
+        self.base_url = base_url
+        # Imported here so that importing this module (e.g. for the CLI's --help) stays cheap
+        from langchain_ollama import ChatOllama
+
+        llm = ChatOllama(model=model, temperature=0, base_url=base_url, **(client_kwargs or {}))
+        self._chain = llm.with_structured_output(prompt.response_format, method="json_schema", include_raw=True)
+
+    def extract(self, job_offer_text: str) -> KeyCriteriaResponse:
+        return self.extract_with_usage(job_offer_text).criteria
+
+    def extract_with_usage(self, job_offer_text: str) -> Extraction:
+        return self._to_extraction(self._chain.invoke(self.prompt.format(job_offer_text=job_offer_text)))
+
+    def extract_many(self, job_offer_texts: List[str], concurrency: int = 4) -> List[KeyCriteriaResponse]:
+        """Extract the criteria of several offers, running up to `concurrency` LLM calls at once."""
+        results = self._chain.batch(
+            [self.prompt.format(job_offer_text=text) for text in job_offer_texts],
+            config={"max_concurrency": concurrency},
+        )
+        return [self._to_extraction(result).criteria for result in results]
+
+    @staticmethod
+    def _to_extraction(output: Any) -> Extraction:
+        # With include_raw=True, the chain returns the raw message, the parsed output and the parsing error
+        result = cast(Dict[str, Any], output)
+        if result["parsing_error"] is not None:
+            raise result["parsing_error"]
+        usage = result["raw"].usage_metadata or {}
+        return Extraction(
+            criteria=KeyCriteriaResponse.model_validate(result["parsed"]),
+            prompt_tokens=usage.get("input_tokens", 0),
+            completion_tokens=usage.get("output_tokens", 0),
+        )
+
+
+@lru_cache()
+def _load_prompt(name: str, version: int) -> Any:
+    import mlflow
+
+    return mlflow.genai.load_prompt(name, version=version)
+
+
+@lru_cache()
+def get_criteria_extractor(model: Optional[str] = None, base_url: Optional[str] = None) -> CriteriaExtractor:
+    """
+    Get the criteria extractor for `model` and `base_url`, building it on first use.
+
+    The prompt comes from the CRITERIA_EXTRACTION_PROMPT_NAME and
+    CRITERIA_EXTRACTION_PROMPT_VERSION environment variables, and the model defaults
+    to OLLAMA_MODEL_NAME.
+    """
+    prompt_name = os.getenv("CRITERIA_EXTRACTION_PROMPT_NAME", "criteria-extraction")
+    prompt_version = os.getenv("CRITERIA_EXTRACTION_PROMPT_VERSION", "1")
+    if not prompt_version.isdigit():
+        raise ValueError("CRITERIA_EXTRACTION_PROMPT_VERSION must be a digit or not set")
+    return CriteriaExtractor(
+        _load_prompt(prompt_name, int(prompt_version)),
+        model=model or os.environ.get("OLLAMA_MODEL_NAME", "dolphin3:8b"),
+        base_url=base_url,
     )
-    return KeyCriteriaResponse.model_validate(response)
+
+
+def extract_key_criteria_from_job_offer(job_offer_text: str) -> KeyCriteriaResponse:
+    return get_criteria_extractor().extract(job_offer_text)
 
 
 if __name__ == "__main__":
+    init_runtime()
     criteria = extract_key_criteria_from_job_offer(SAMPLE_JOB_OFFER)
     for criterion in criteria.key_criteria:
-        print(f"Title: {criterion.name}")
+        print(f"Description: {criterion.description}")
         print(f"Importance: {criterion.importance}")
         print()
@@ -0,0 +1,177 @@
+"""Unit tests for admission control of evaluations."""
+
+import asyncio
+
+import pytest
+
+from recruitair.api.admission import (
+    BULK_LANE,
+    INTERACTIVE_LANE,
+    AdmissionControlledEvaluator,
+    AdmissionController,
+    AdmissionRejected,
+    LaneConfig,
+    lane_scope,
+)
+from recruitair.api.model import BaseEvaluatorModel
+from recruitair.job_offers.models import KeyCriteriaResponse, KeyCriterion
+
+
+class SlowModel(BaseEvaluatorModel):
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.started = []
+
+    async def aevaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        self.started.append(job_offer)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        return KeyCriteriaResponse(key_criteria=[KeyCriterion(description=job_offer, importance=50)])
+
+
+async def _gather(model: BaseEvaluatorModel, count: int):
+    return await asyncio.gather(*(model.aevaluate(f"offer {i}") for i in range(count)), return_exceptions=True)
+
+
+def test_queued_requests_run_in_order_within_limit():
+    inner = SlowModel(delay=0.02)
+    model = AdmissionControlledEvaluator(inner, AdmissionController(max_in_flight=2, max_queue_depth=10))
+
+    results = asyncio.run(_gather(model, 6))
+
+    assert [r.key_criteria[0].description for r in results] == [f"offer {i}" for i in range(6)]
+    assert inner.max_in_flight == 2
+
+
+def test_full_queue_is_rejected_with_429():
+    controller = AdmissionController(max_in_flight=1, max_queue_depth=2)
+    model = AdmissionControlledEvaluator(SlowModel(delay=0.05), controller)
+
+    results = asyncio.run(_gather(model, 5))
+
+    rejected = [r for r in results if isinstance(r, AdmissionRejected)]
+    assert len(rejected) == 2
+    assert all(r.status_code == 429 and r.retry_after >= 1 for r in rejected)
+    assert controller.in_flight == 0 and controller.queue_depth == 0
+
+
+def test_queue_wait_over_limit_is_rejected_with_503():
+    controller = AdmissionController(max_in_flight=1, max_queue_depth=10, max_queue_wait_seconds=0.05)
+    model = AdmissionControlledEvaluator(SlowModel(delay=0.2), controller)
+
+    first, second = asyncio.run(_gather(model, 2))
+
+    assert isinstance(first, KeyCriteriaResponse)
+    assert isinstance(second, AdmissionRejected)
+    assert (second.status_code, second.reason) == (503, "queue_timeout")
+
+
+def test_predicted_wait_rejects_without_waiting():
+    controller = AdmissionController(max_in_flight=1, max_queue_depth=10, max_queue_wait_seconds=0.15)
+    model = AdmissionControlledEvaluator(SlowModel(delay=0.1), controller)
+
+    async def run():
+        await model.aevaluate("warm-up")
+        return await _gather(model, 4)
+
+    results = asyncio.run(run())
+
+    reasons = [r.reason for r in results if isinstance(r, AdmissionRejected)]
+    assert reasons == ["predicted_wait", "predicted_wait"]
+
+
+def test_capacity_limits_the_slots_below_max_in_flight():
+    inner = SlowModel(delay=0.02)
+    capacity = [2]
+    controller = AdmissionController(max_in_flight=4, max_queue_depth=10, capacity=lambda: capacity[0])
+    model = AdmissionControlledEvaluator(inner, controller)
+
+    asyncio.run(_gather(model, 6))
+    assert inner.max_in_flight == 2
+
+    capacity[0] = 10
+    asyncio.run(_gather(model, 6))
+    assert inner.max_in_flight == 4
+
+
+def test_cancelled_waiter_releases_its_place():
+    controller = AdmissionController(max_in_flight=1, max_queue_depth=10)
+    model = AdmissionControlledEvaluator(SlowModel(delay=0.05), controller)
+
+    async def run():
+        running = asyncio.ensure_future(model.aevaluate("running"))
+        waiting = asyncio.ensure_future(model.aevaluate("waiting"))
+        await asyncio.sleep(0.01)
+        waiting.cancel()
+        await running
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        return await model.aevaluate("next")
+
+    response = asyncio.run(run())
+
+    assert response.key_criteria[0].description == "next"
+    assert controller.in_flight == 0 and controller.queue_depth == 0
+
+
+def _lanes(interactive_reserved: int = 0, interactive_weight: int = 1):
+    return {
+        INTERACTIVE_LANE: LaneConfig(weight=interactive_weight, reserved=interactive_reserved),
+        BULK_LANE: LaneConfig(max_queue_depth=100),
+    }
+
+
+async def _in_lane(model: BaseEvaluatorModel, lane: str, offer: str):
+    with lane_scope(lane):
+        return await model.aevaluate(offer)
+
+
+def test_bulk_traffic_cannot_use_reserved_slots():
+    inner = SlowModel(delay=0.05)
+    controller = AdmissionController(max_in_flight=2, lanes=_lanes(interactive_reserved=1))
+    model = AdmissionControlledEvaluator(inner, controller)
+
+    async def run():
+        bulk = [asyncio.ensure_future(_in_lane(model, BULK_LANE, f"bulk {i}")) for i in range(4)]
+        await asyncio.sleep(0.01)
+        assert controller.in_flight == 1
+        await _in_lane(model, INTERACTIVE_LANE, "interactive")
+        # The interactive request did not wait behind the bulk backlog
+        assert controller.queue_depth >= 2
+        await asyncio.gather(*bulk)
+
+    asyncio.run(run())
+
+    assert inner.started.index("interactive") == 1
+
+
+@pytest.mark.parametrize(
+    "policy, interactive_weight, expected",
+    [
+        ("strict", 1, ["i0", "i1", "i2", "b0", "b1", "b2"]),
+        ("weighted", 2, ["i0", "b0", "i1", "i2", "b1", "b2"]),
+    ],
+)
+def test_dequeue_policies(policy: str, interactive_weight: int, expected: list):
+    inner = SlowModel(delay=0.01)
+    controller = AdmissionController(
+        max_in_flight=1, lanes=_lanes(interactive_weight=interactive_weight), policy=policy
+    )
+    model = AdmissionControlledEvaluator(inner, controller)
+
+    async def run():
+        running = asyncio.ensure_future(_in_lane(model, BULK_LANE, "running"))
+        await asyncio.sleep(0)
+        queued = [_in_lane(model, BULK_LANE, f"b{i}") for i in range(3)]
+        queued += [_in_lane(model, INTERACTIVE_LANE, f"i{i}") for i in range(3)]
+        await asyncio.gather(running, *queued)
+
+    asyncio.run(run())
+
+    assert inner.started == ["running"] + expected
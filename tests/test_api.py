@@ -1,12 +1,24 @@
 # /tests/test_api.py
+import asyncio
+import json
+import threading
+import time
+
 from fastapi.testclient import TestClient
 import pytest
 
+from recruitair.api.admission import AdmissionRejected
 from recruitair.api.dependencies import get_model
 from recruitair.api.main import app
 from recruitair.api.model import BaseEvaluatorModel
+from recruitair.api.minhash import MinHashIndex
+from recruitair.api.near_duplicates import NearDuplicateEvaluator
 from recruitair.job_offers.models import KeyCriteriaResponse, KeyCriterion
 
+FAILING_OFFER = "This offer makes the model fail"
+SHED_OFFER = "This offer arrives while the model is overloaded"
+SLOW_OFFER = "This offer takes the model a while"
+
 
 class MockModel(BaseEvaluatorModel):
     def __init__(self):
@@ -17,6 +29,12 @@ class MockModel(BaseEvaluatorModel):
         return self._version
 
     def evaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        if job_offer == FAILING_OFFER:
+            raise RuntimeError("model failure")
+        if job_offer == SLOW_OFFER:
+            time.sleep(0.3)
+        if job_offer == SHED_OFFER:
+            raise AdmissionRejected(429, "queue_full", retry_after=2)
         return KeyCriteriaResponse(key_criteria=[KeyCriterion(description="Python programming", importance=80)])
 
 
@@ -40,13 +58,132 @@ def test_eval_python_match(client: TestClient):
     assert data["criteria"][0]["description"] == "Python programming"
 
 
+@pytest.mark.parametrize("path,schema", [("/eval", "EvalResponse"), ("/eval/batch", "EvalBatchResponse")])
+def test_compact_responses_keep_the_documented_schema(path: str, schema: str):
+    responses = app.openapi()["paths"][path]["post"]["responses"]
+    assert responses["200"]["content"]["application/json"]["schema"] == {"$ref": f"#/components/schemas/{schema}"}
+
+
 def test_eval_empty_job_offer(client: TestClient):
     req1 = {"offer_text": ""}
     r1 = client.post("/eval", json=req1)
     assert r1.status_code == 422
 
 
+def test_eval_batch_returns_per_item_results(client: TestClient):
+    req = {
+        "items": [
+            {"offer_text": "Looking for a Python developer"},
+            {"offer_text": FAILING_OFFER},
+            {"offer_text": "Looking for an ML engineer"},
+        ]
+    }
+    r = client.post("/eval/batch", json=req)
+    assert r.status_code == 200, r.text
+    results = r.json()["results"]
+    assert len(results) == 3
+    assert results[0]["criteria"][0]["importance"] == 0.8
+    assert results[1]["criteria"] is None
+    assert results[1]["error"] == "Model prediction failed"
+    assert results[2]["error"] is None
+
+
+def test_eval_batch_reports_invalid_offers_per_item(client: TestClient):
+    req = {"items": [{"offer_text": ""}, {"offer_text": "Looking for a Python developer"}, {"offer_text": "x" * 10001}]}
+    r = client.post("/eval/batch", json=req)
+    assert r.status_code == 200, r.text
+    results = r.json()["results"]
+    assert results[0]["criteria"] is None
+    assert results[0]["error"] == "offer_text: String should have at least 1 character"
+    assert results[1]["criteria"][0]["importance"] == 0.8
+    assert results[2]["error"] == "offer_text: String should have at most 10000 characters"
+
+
+def test_eval_batch_empty(client: TestClient):
+    r = client.post("/eval/batch", json={"items": []})
+    assert r.status_code == 422
+
+
+def test_eval_stream_returns_ndjson(client: TestClient):
+    r = client.post("/eval/stream", json={"offer_text": "Looking for a Python developer"})
+    assert r.status_code == 200, r.text
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in r.text.splitlines()]
+    assert lines == [{"description": "Python programming", "importance": 0.8}]
+
+
+def test_eval_stream_reports_errors_inline(client: TestClient):
+    r = client.post("/eval/stream", json={"offer_text": FAILING_OFFER})
+    assert r.status_code == 200
+    assert json.loads(r.text.splitlines()[-1]) == {"error": "Model prediction failed"}
+
+
+def test_eval_shed_by_admission_control(client: TestClient):
+    r = client.post("/eval", json={"offer_text": SHED_OFFER})
+    assert r.status_code == 429
+    assert r.headers["retry-after"] == "2"
+    assert r.json() == {"detail": "Server overloaded, retry later"}
+
+
+def test_eval_deadline_from_header(client: TestClient):
+    r = client.post("/eval", json={"offer_text": SLOW_OFFER}, headers={"X-Request-Timeout": "0.05"})
+    assert r.status_code == 504
+    assert r.json() == {"detail": "Evaluation deadline exceeded"}
+
+
+@pytest.mark.parametrize("timeout", ["soon", "0", "-1", "1e9"])
+def test_eval_invalid_deadline_header(client: TestClient, timeout: str):
+    r = client.post("/eval", json={"offer_text": "Python developer"}, headers={"X-Request-Timeout": timeout})
+    assert r.status_code == 400
+
+
+def test_eval_invalid_priority_header(client: TestClient):
+    r = client.post("/eval", json={"offer_text": "Python developer"}, headers={"X-Priority": "urgent"})
+    assert r.status_code == 400
+
+
+def test_eval_flags_near_duplicate_reuse(client: TestClient):
+    evaluator = NearDuplicateEvaluator(MockModel(), MinHashIndex(threshold=0.8))
+    app.dependency_overrides[get_model] = lambda: evaluator
+    offer = "Looking for a backend developer with five years of experience with Python, SQL and Docker in Barcelona"
+    try:
+        first = client.post("/eval", json={"offer_text": offer})
+        repost = client.post("/eval", json={"offer_text": offer + " (hybrid)"})
+        batch = client.post("/eval/batch", json={"items": [{"offer_text": offer + " (remote)"}]})
+    finally:
+        app.dependency_overrides[get_model] = lambda: MockModel()
+
+    assert "x-approximate-match" not in first.headers
+    assert 0.8 <= float(repost.headers["x-approximate-match"]) < 1
+    assert repost.json()["criteria"] == first.json()["criteria"]
+    assert batch.json()["results"][0]["approximate_similarity"] >= 0.8
+
+
 def test_health(client: TestClient):
     r = client.get("/health")
     assert r.status_code == 200
     assert r.json() == {"status": "ok"}
+
+
+def test_health_reports_not_ready_until_warm_up_finishes():
+    warm_up_done = threading.Event()
+
+    class WarmingUpModel(MockModel):
+        async def warmup(self):
+            while not warm_up_done.is_set():
+                await asyncio.sleep(0.01)
+
+    app.dependency_overrides[get_model] = WarmingUpModel
+    try:
+        with TestClient(app) as c:
+            r = c.get("/health")
+            assert r.status_code == 503
+            assert r.json() == {"status": "warming_up"}
+            warm_up_done.set()
+            for _ in range(100):
+                if c.get("/health").status_code == 200:
+                    break
+                time.sleep(0.01)
+            assert c.get("/health").json() == {"status": "ok"}
+    finally:
+        app.dependency_overrides[get_model] = lambda: MockModel()
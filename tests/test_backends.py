@@ -0,0 +1,131 @@
+"""Tests of the Ollama backend pool, against local stub Ollama servers."""
+
+# pylint: disable=W0621
+import asyncio
+
+import pytest
+
+from benchmarks.stub_ollama import StubOllamaServer
+from benchmarks.stubs import make_prompt
+from recruitair.api.backends import BackendPool
+from recruitair.api.model import OLlamaEvaluator
+
+
+@pytest.fixture
+def servers():
+    with StubOllamaServer(delay=0.05) as first, StubOllamaServer(delay=0.05) as second:
+        yield first, second
+
+
+def make_evaluator(pool: BackendPool) -> OLlamaEvaluator:
+    return OLlamaEvaluator(
+        model="dolphin3",
+        version="8b",
+        prompt_uri="prompts:/criteria-extraction/1",
+        prompt_loader=lambda uri: make_prompt(),
+        backend_pool=pool,
+    )
+
+
+def test_routes_to_least_outstanding_backend():
+    pool = BackendPool(["http://a", "http://b", "http://c"])
+
+    with pool.acquire() as first, pool.acquire() as second, pool.acquire() as third:
+        assert len({first.url, second.url, third.url}) == 3
+        with pool.acquire() as fourth:
+            assert fourth.in_flight == 2
+    assert [b.in_flight for b in pool.backends] == [0, 0, 0]
+
+
+def test_concurrent_calls_are_spread_over_backends(servers):
+    evaluator = make_evaluator(BackendPool([server.url for server in servers]))
+
+    async def run():
+        return await asyncio.gather(*(evaluator.aevaluate(f"offer {i}") for i in range(8)))
+
+    responses = asyncio.run(run())
+
+    assert all(r.key_criteria[0].importance == 80 for r in responses)
+    assert [len(server.requests) for server in servers] == [4, 4]
+
+
+def test_concurrency_cap_is_per_backend_when_one_is_ejected(servers):
+    first, second = servers
+    pool = BackendPool([first.url, second.url], max_concurrency=2, health_check_interval=0)
+    pool.eject(pool.backends[0])
+    evaluator = make_evaluator(pool)
+
+    async def run():
+        return await asyncio.gather(*(evaluator.aevaluate(f"offer {i}") for i in range(6)))
+
+    asyncio.run(run())
+
+    assert (len(first.requests), len(second.requests)) == (0, 6)
+    assert second.max_in_flight == 2
+    assert pool.routable_count() == 1
+
+
+def test_call_cancelled_while_waiting_for_a_slot_is_unrouted():
+    pool = BackendPool(["http://a"], max_concurrency=1)
+
+    async def call():
+        async with pool.aacquire():
+            pass
+
+    async def run():
+        async with pool.aacquire():
+            waiting = asyncio.create_task(call())
+            await asyncio.sleep(0.01)
+            assert pool.backends[0].in_flight == 2
+            waiting.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiting
+            assert pool.backends[0].in_flight == 1
+
+    asyncio.run(run())
+
+    assert pool.backends[0].in_flight == 0
+
+
+def test_failing_backend_is_ejected(servers):
+    first, second = servers
+    first.failing = True
+    pool = BackendPool([first.url, second.url], failure_threshold=2, health_check_interval=0)
+    evaluator = make_evaluator(pool)
+
+    failures = 0
+    for idx in range(8):
+        try:
+            evaluator.evaluate(f"offer {idx}")
+        except Exception:  # pylint: disable=W0718
+            failures += 1
+
+    assert failures == 2
+    assert not pool.is_healthy(pool.backends[0])
+    assert len(second.requests) == 6
+
+
+def test_health_check_ejects_and_readmits(servers):
+    first, second = servers
+    pool = BackendPool([first.url, second.url])
+
+    first.stop()
+    pool.check_health()
+    assert [pool.is_healthy(b) for b in pool.backends] == [False, True]
+
+    first.start()
+    pool.check_health()
+    assert [pool.is_healthy(b) for b in pool.backends] == [True, True]
+
+
+def test_all_backends_ejected_still_routes():
+    now = [0.0]
+    pool = BackendPool(["http://a", "http://b"], eject_seconds=10, clock=lambda: now[0])
+    for backend in pool.backends:
+        pool.eject(backend)
+
+    with pool.acquire() as backend:
+        assert backend.url in ("http://a", "http://b")
+
+    now[0] = 11.0
+    assert all(pool.is_healthy(b) for b in pool.backends)
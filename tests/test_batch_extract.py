@@ -0,0 +1,56 @@
+"""Unit tests for the resumable batch extraction CLI."""
+
+import json
+from pathlib import Path
+
+from recruitair.job_offers.batch_extract import Extraction, iter_offers, load_checkpoint, run
+from recruitair.job_offers.models import KeyCriteriaResponse, KeyCriterion
+
+
+def _write_jsonl(path: Path, rows: list[dict]) -> None:
+    path.write_text("".join(json.dumps(row) + "\n" for row in rows), encoding="utf-8")
+
+
+def _fake_extract(text: str) -> Extraction:
+    if text == "bad offer":
+        raise RuntimeError("model failure")
+    criteria = KeyCriteriaResponse(key_criteria=[KeyCriterion(description=text, importance=50)])
+    return Extraction(criteria=criteria, prompt_tokens=10, completion_tokens=5)
+
+
+def test_iter_offers_uses_line_number_as_default_id(tmp_path: Path):
+    path = tmp_path / "jobs.jsonl"
+    path.write_text('{"job_description": "a"}\n\n{"other": 1}\nnot json\n{"job_description": "b"}\n')
+
+    assert list(iter_offers(path, "job_description")) == [("1", "a"), ("5", "b")]
+
+
+def test_load_checkpoint_truncates_partial_line(tmp_path: Path):
+    path = tmp_path / "out.jsonl"
+    path.write_text('{"id": "1", "key_criteria": []}\n{"id": "2", "key_cri')
+
+    assert load_checkpoint(path) == {"1"}
+    assert path.read_text() == '{"id": "1", "key_criteria": []}\n'
+
+
+def test_run_resumes_and_records_failures(tmp_path: Path):
+    input_path = tmp_path / "jobs.jsonl"
+    output_path = tmp_path / "out.jsonl"
+    _write_jsonl(input_path, [{"job_description": text} for text in ["first", "bad offer", "third"]])
+    _write_jsonl(output_path, [{"id": "1", "key_criteria": []}])
+
+    calls = []
+
+    def extract(text: str) -> Extraction:
+        calls.append(text)
+        return _fake_extract(text)
+
+    meter = run(iter_offers(input_path, "job_description"), [extract], output_path, workers=2)
+
+    assert sorted(calls) == ["bad offer", "third"]
+    assert (meter.offers, meter.failed, meter.completion_tokens) == (1, 1, 5)
+    records = [json.loads(line) for line in output_path.read_text().splitlines()]
+    assert [r["id"] for r in records] == ["1", "3"]
+    assert records[1]["key_criteria"] == [{"description": "third", "importance": 50}]
+    errors = [json.loads(line) for line in (tmp_path / "out.jsonl.errors.jsonl").read_text().splitlines()]
+    assert errors == [{"id": "2", "error": "model failure"}]
@@ -0,0 +1,97 @@
+"""Tests of the load-test driver and of the stub Ollama server's latency and error model."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from benchmarks.bench_load import Sample, drive, find_regressions, load_offers, summarize
+from benchmarks.stub_ollama import StubOllamaServer
+
+
+def make_client(failing_offer: str = "") -> httpx.AsyncClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        if failing_offer and failing_offer.encode() in request.content:
+            return httpx.Response(429)
+        return httpx.Response(200, json={"criteria": []})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://api")
+
+
+def test_closed_loop_sends_requested_count_and_counts_statuses():
+    async def scenario():
+        async with make_client(failing_offer="offer 1") as client:
+            return await drive(client, ["offer 0", "offer 1"], requests=10, concurrency=3)
+
+    samples = asyncio.run(scenario())
+    report = summarize(samples, elapsed=2.0)
+
+    assert report["requests"] == 10
+    assert report["status_counts"] == {"200": 5, "429": 5}
+    assert report["error_rate"] == 0.5
+    assert report["throughput_rps"] == 2.5
+    assert set(report["latency_ms"]) == {"p50", "p95", "p99", "mean", "max"}
+
+
+def test_open_loop_sends_at_the_target_rate_for_the_duration():
+    async def scenario():
+        async with make_client() as client:
+            return await drive(client, ["offer"], duration=0.5, rps=100, seed=1)
+
+    samples = asyncio.run(scenario())
+
+    assert 25 <= len(samples) <= 80
+    assert all(sample.status == "200" for sample in samples)
+
+
+def test_find_regressions_flags_latency_throughput_and_errors():
+    baseline = summarize([Sample(0.1, "200")] * 99 + [Sample(0.01, "500")], elapsed=10.0)
+    same = summarize([Sample(0.105, "200")] * 99 + [Sample(0.01, "500")], elapsed=10.0)
+    worse = summarize([Sample(0.2, "200")] * 80 + [Sample(0.01, "500")] * 20, elapsed=10.0)
+
+    assert find_regressions(same, baseline, tolerance=0.1) == []
+    regressions = [regression.split()[0] for regression in find_regressions(worse, baseline, tolerance=0.1)]
+    assert regressions == ["latency", "latency", "latency", "throughput", "error"]
+
+
+def test_load_offers_falls_back_to_distinct_synthetic_offers(tmp_path):
+    offers = load_offers(tmp_path / "missing.jsonl", "job_description", limit=20, seed=3)
+
+    assert len(set(offers)) == 20
+    assert offers == load_offers(None, "job_description", limit=20, seed=3)
+
+
+def test_load_offers_reads_jsonl(tmp_path):
+    path = tmp_path / "jobs.jsonl"
+    path.write_text('{"job_description": "first"}\n{"other": "x"}\n{"job_description": "second"}\n')
+
+    assert load_offers(path, "job_description", limit=10) == ["first", "second"]
+
+
+@pytest.mark.parametrize("error_rate, failures", [(0.0, 0), (1.0, 3)])
+def test_stub_server_error_rate(error_rate, failures):
+    with StubOllamaServer(error_rate=error_rate) as stub:
+        statuses = [httpx.post(f"{stub.url}/api/chat", json={"stream": False}).status_code for _ in range(3)]
+
+    assert statuses.count(500) == failures
+
+
+def test_stub_server_latency_is_log_normal_and_reproducible():
+    first = StubOllamaServer(delay=0.1, delay_sigma=0.5, seed=7)
+    second = StubOllamaServer(delay=0.1, delay_sigma=0.5, seed=7)
+
+    delays = [first.sample()[0] for _ in range(200)]
+
+    assert delays == [second.sample()[0] for _ in range(200)]
+    assert len(set(delays)) == 200
+    assert 0.07 < sorted(delays)[100] < 0.14
+
+
+def test_stub_server_reports_generation_time_at_token_rate():
+    stub = StubOllamaServer(delay=0.05, tokens_per_second=100)
+
+    final = stub.chat_parts("dolphin3")[-1]
+
+    assert final["eval_count"] == stub.eval_count
+    assert final["eval_duration"] == int(stub.eval_count / 100 * 1e9)
+    assert final["prompt_eval_duration"] == int(0.05 * 1e9)
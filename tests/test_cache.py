@@ -0,0 +1,142 @@
+"""Unit tests for the extraction result cache."""
+
+# pylint: disable=W0621
+import asyncio
+from pathlib import Path
+import threading
+
+from recruitair.api.cache import (
+    CachedEvaluator,
+    InMemoryLRUCache,
+    SQLiteResultCache,
+    TieredResultCache,
+    make_cache_key,
+)
+from recruitair.api.model import BaseEvaluatorModel
+from recruitair.job_offers.models import KeyCriteriaResponse, KeyCriterion
+
+
+class CountingModel(BaseEvaluatorModel):
+    def __init__(self):
+        self.calls = 0
+
+    def evaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        self.calls += 1
+        return KeyCriteriaResponse(key_criteria=[KeyCriterion(description=job_offer.strip(), importance=50)])
+
+
+class ThreadRecordingSQLiteCache(SQLiteResultCache):
+    """SQLite tier recording the threads its reads and writes run on."""
+
+    def __init__(self, path: Path):
+        super().__init__(path)
+        self.threads = []
+
+    def get(self, key):
+        self.threads.append(threading.get_ident())
+        return super().get(key)
+
+    def set(self, key, value):
+        self.threads.append(threading.get_ident())
+        super().set(key, value)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _response(description: str) -> KeyCriteriaResponse:
+    return KeyCriteriaResponse(key_criteria=[KeyCriterion(description=description, importance=10)])
+
+
+def test_cache_key_normalizes_whitespace_and_includes_parts():
+    key = make_cache_key("Python  developer\n", "dolphin3", "8b")
+    assert key == make_cache_key(" Python developer", "dolphin3", "8b")
+    assert key != make_cache_key("Python developer", "dolphin3", "3b")
+
+
+def test_lru_evicts_least_recently_used():
+    cache = InMemoryLRUCache(max_entries=2)
+    cache.set("a", _response("a"))
+    cache.set("b", _response("b"))
+    assert cache.get("a") is not None
+    cache.set("c", _response("c"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+def test_lru_ttl_expiry():
+    clock = FakeClock()
+    cache = InMemoryLRUCache(max_entries=10, ttl_seconds=5, clock=clock)
+    cache.set("a", _response("a"))
+    clock.now = 4
+    assert cache.get("a") is not None
+    clock.now = 6
+    assert cache.get("a") is None
+    assert len(cache) == 0
+
+
+def test_sqlite_tier_survives_restart(tmp_path: Path):
+    path = tmp_path / "cache.sqlite"
+    cache = SQLiteResultCache(path)
+    cache.set("a", _response("persisted"))
+    cache.close()
+
+    reopened = SQLiteResultCache(path)
+    assert reopened.get("a") == _response("persisted")
+
+
+def test_sqlite_tier_size_eviction(tmp_path: Path):
+    clock = FakeClock()
+    cache = SQLiteResultCache(tmp_path / "cache.sqlite", max_entries=2, clock=clock)
+    for idx, key in enumerate("abc"):
+        clock.now = idx
+        cache.set(key, _response(key))
+
+    assert len(cache) == 2
+    assert cache.get("a") is None
+
+
+def test_tiered_cache_promotes_disk_hits(tmp_path: Path):
+    memory = InMemoryLRUCache(max_entries=10)
+    disk = SQLiteResultCache(tmp_path / "cache.sqlite")
+    disk.set("a", _response("a"))
+
+    cache = TieredResultCache([memory, disk])
+    assert cache.get("a") == _response("a")
+    assert memory.get("a") == _response("a")
+
+
+def test_cached_evaluator_calls_model_once():
+    inner = CountingModel()
+    model = CachedEvaluator(inner, InMemoryLRUCache(), key_parts=("dolphin3", "8b", "prompts:/p/1", "1"))
+
+    first = model.evaluate("Python developer")
+    second = model.evaluate("Python   developer ")
+
+    assert inner.calls == 1
+    assert first == second
+
+
+def test_async_evaluations_keep_disk_io_off_the_event_loop(tmp_path: Path):
+    disk = ThreadRecordingSQLiteCache(tmp_path / "cache.sqlite")
+    model = CachedEvaluator(CountingModel(), TieredResultCache([InMemoryLRUCache(), disk]), key_parts=("m",))
+
+    async def run():
+        first = await model.aevaluate("Python developer")
+        streamed = [criterion async for criterion in model.astream_criteria("SQL analyst")]
+        return first, streamed
+
+    first, streamed = asyncio.run(run())
+
+    # A miss and a write each, for both offers
+    assert len(disk.threads) == 4
+    assert threading.get_ident() not in disk.threads
+    assert first.key_criteria[0].description == "Python developer"
+    assert streamed[0].description == "SQL analyst"
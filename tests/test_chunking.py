@@ -0,0 +1,117 @@
+"""Unit tests for map-reduce extraction of long offers."""
+
+import asyncio
+import time
+
+from prometheus_client import REGISTRY
+import pytest
+
+from recruitair.api.chunking import ChunkedEvaluator, merge_criteria, split_offer
+from recruitair.api.model import BaseEvaluatorModel
+from recruitair.job_offers.models import KeyCriteriaResponse, KeyCriterion
+
+SKILLS = ["Python", "Docker", "Kubernetes", "English", "Leadership", "SQL"]
+LONG_OFFER = "\n\n".join(
+    f"{skill}:\n" + " ".join(f"Requirement {idx}.{sentence} is needed." for sentence in range(20))
+    for idx, skill in enumerate(SKILLS)
+)
+
+
+class SectionModel(BaseEvaluatorModel):
+    """Returns one criterion per skill heading found in the offer, after a fixed delay."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.calls = 0
+
+    def _criteria(self, job_offer: str) -> KeyCriteriaResponse:
+        self.calls += 1
+        headings = [line.rstrip(":") for line in job_offer.splitlines() if line.rstrip(":") in SKILLS]
+        return KeyCriteriaResponse(key_criteria=[KeyCriterion(description=h, importance=50) for h in headings])
+
+    def evaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        time.sleep(self.delay)
+        return self._criteria(job_offer)
+
+    async def aevaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        await asyncio.sleep(self.delay)
+        return self._criteria(job_offer)
+
+
+def test_split_offer_respects_size_and_overlap():
+    chunks = split_offer(LONG_OFFER, max_chars=800, overlap_chars=100)
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 800 for chunk in chunks)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert previous[-50:] in chunk
+    # Every sentence survives the split
+    assert all(f"Requirement 5.{sentence} is needed." in "".join(chunks) for sentence in range(20))
+
+
+def test_split_offer_rejects_overlap_larger_than_chunk():
+    with pytest.raises(ValueError):
+        split_offer(LONG_OFFER, max_chars=100, overlap_chars=100)
+
+
+def test_merge_criteria_dedupes_near_identical_descriptions():
+    merged = merge_criteria(
+        [
+            KeyCriteriaResponse(
+                key_criteria=[
+                    KeyCriterion(description="Python programming", importance=60),
+                    KeyCriterion(description="Team work", importance=30),
+                ]
+            ),
+            KeyCriteriaResponse(
+                key_criteria=[
+                    KeyCriterion(description="Python programming.", importance=90),
+                    KeyCriterion(description="Cloud platforms (AWS, GCP)", importance=40),
+                ]
+            ),
+        ]
+    )
+
+    assert [(c.description, c.importance) for c in merged.key_criteria] == [
+        ("Python programming.", 90),
+        ("Team work", 30),
+        ("Cloud platforms (AWS, GCP)", 40),
+    ]
+
+
+def test_short_offers_are_not_chunked():
+    inner = SectionModel()
+    model = ChunkedEvaluator(inner, threshold_chars=len(LONG_OFFER))
+
+    response = model.evaluate(LONG_OFFER)
+
+    assert inner.calls == 1
+    assert len(response.key_criteria) == 6
+
+
+def test_long_offer_chunks_run_in_parallel():
+    inner = SectionModel(delay=0.1)
+    model = ChunkedEvaluator(inner, threshold_chars=1000, chunk_chars=800, overlap_chars=100)
+
+    start = time.perf_counter()
+    response = asyncio.run(model.aevaluate(LONG_OFFER))
+    elapsed = time.perf_counter() - start
+
+    assert inner.calls > 2
+    assert elapsed < 0.1 * inner.calls / 2
+    assert [c.description for c in response.key_criteria] == SKILLS
+    assert model.evaluate(LONG_OFFER) == response
+
+
+def test_streamed_long_offer_is_counted_once():
+    inner = SectionModel(delay=0)
+    model = ChunkedEvaluator(inner, threshold_chars=1000, chunk_chars=800, overlap_chars=100)
+    before = REGISTRY.get_sample_value("recruitair_long_offer_chunks_count") or 0
+
+    async def stream():
+        return [criterion async for criterion in model.astream_criteria(LONG_OFFER)]
+
+    criteria = asyncio.run(stream())
+
+    assert [c.description for c in criteria] == SKILLS
+    assert REGISTRY.get_sample_value("recruitair_long_offer_chunks_count") == before + 1
@@ -0,0 +1,79 @@
+"""Unit tests for request deadlines and cancellation of abandoned evaluations."""
+
+import asyncio
+
+from prometheus_client import REGISTRY
+import pytest
+
+from benchmarks.stub_ollama import StubOllamaServer
+from benchmarks.stubs import make_prompt
+from recruitair.api.deadlines import DeadlineExceeded, RequestDeadline, remaining_time, run_with_deadline
+from recruitair.api.model import OLlamaEvaluator
+
+
+def _cancelled_generations(reason: str) -> float:
+    return REGISTRY.get_sample_value("recruitair_llm_generations_cancelled_total", {"reason": reason}) or 0.0
+
+
+def test_deadline_is_visible_to_the_evaluation():
+    async def evaluation():
+        return remaining_time()
+
+    remaining = asyncio.run(run_with_deadline(evaluation(), RequestDeadline(5)))
+
+    assert 4 < remaining <= 5
+    assert remaining_time() is None
+
+
+def test_expired_deadline_cancels_the_evaluation():
+    cancelled = []
+
+    async def evaluation():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    with pytest.raises(DeadlineExceeded) as exc_info:
+        asyncio.run(run_with_deadline(evaluation(), RequestDeadline(0.05)))
+
+    assert exc_info.value.reason == "deadline"
+    assert cancelled == [True]
+
+
+def test_client_disconnect_cancels_the_evaluation():
+    checks = []
+
+    async def is_disconnected() -> bool:
+        checks.append(True)
+        return len(checks) > 1
+
+    with pytest.raises(DeadlineExceeded) as exc_info:
+        asyncio.run(run_with_deadline(asyncio.sleep(5), RequestDeadline(None), is_disconnected))
+
+    assert exc_info.value.reason == "disconnect"
+
+
+def test_abandoned_ollama_generation_is_cancelled():
+    with StubOllamaServer(delay=0.3) as server:
+        evaluator = OLlamaEvaluator(
+            model="dolphin3",
+            version="8b",
+            prompt_uri="prompts:/criteria-extraction/1",
+            ollama_base_url=server.url,
+            prompt_loader=lambda uri: make_prompt(),
+        )
+        before_cancelled = _cancelled_generations("deadline")
+        before_saved = REGISTRY.get_sample_value("recruitair_llm_compute_seconds_saved_total")
+
+        async def run():
+            await evaluator.aevaluate("warm-up")
+            server.delay = 1.0
+            await run_with_deadline(evaluator.aevaluate("abandoned"), RequestDeadline(0.1))
+
+        with pytest.raises(DeadlineExceeded):
+            asyncio.run(run())
+
+    assert _cancelled_generations("deadline") == before_cancelled + 1
+    assert REGISTRY.get_sample_value("recruitair_llm_compute_seconds_saved_total") > before_saved + 0.1
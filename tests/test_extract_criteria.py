@@ -0,0 +1,53 @@
+"""Unit tests for the reusable criteria extractor."""
+
+# pylint: disable=W0621
+import langchain_ollama
+import mlflow
+import pytest
+
+from benchmarks.stubs import StubChatOllama, make_prompt
+from recruitair.job_offers import extract_criteria
+
+
+@pytest.fixture
+def prompt_loads(monkeypatch: pytest.MonkeyPatch):
+    """Stub Ollama and MLflow, and count prompt loads."""
+    loads = []
+
+    def load_prompt(name, version):
+        loads.append((name, version))
+        return make_prompt()
+
+    monkeypatch.setattr(langchain_ollama, "ChatOllama", StubChatOllama)
+    monkeypatch.setattr(mlflow.genai, "load_prompt", load_prompt)
+    monkeypatch.setenv("CRITERIA_EXTRACTION_PROMPT_VERSION", "3")
+    extract_criteria.get_criteria_extractor.cache_clear()
+    extract_criteria._load_prompt.cache_clear()  # pylint: disable=W0212
+    yield loads
+    extract_criteria.get_criteria_extractor.cache_clear()
+    extract_criteria._load_prompt.cache_clear()  # pylint: disable=W0212
+
+
+def test_module_function_reuses_extractor(prompt_loads):
+    for _ in range(3):
+        criteria = extract_criteria.extract_key_criteria_from_job_offer("Python developer")
+        assert criteria.key_criteria[0].importance == 80
+
+    assert prompt_loads == [("criteria-extraction", 3)]
+
+
+def test_extract_many_and_usage(prompt_loads):
+    extractor = extract_criteria.get_criteria_extractor("dolphin3:8b", "http://ollama:11434")
+
+    results = extractor.extract_many(["a", "b", "c"], concurrency=2)
+    usage = extractor.extract_with_usage("d")
+
+    assert [r.key_criteria[0].description for r in results] == ["Python programming"] * 3
+    assert (usage.prompt_tokens, usage.completion_tokens) == (20, 1)
+    assert len(prompt_loads) == 1
+
+
+def test_invalid_prompt_version(prompt_loads, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setenv("CRITERIA_EXTRACTION_PROMPT_VERSION", "latest")
+    with pytest.raises(ValueError):
+        extract_criteria.get_criteria_extractor()
@@ -0,0 +1,98 @@
+"""Tests of the shared Ollama HTTP connection pool, against a local stub Ollama server."""
+
+# pylint: disable=W0621
+import asyncio
+
+from prometheus_client import REGISTRY
+import pytest
+
+from benchmarks.stub_ollama import StubOllamaServer
+from benchmarks.stubs import make_prompt
+from recruitair.api.http_pool import SharedHTTPPool, aclose_shared_http_pool, get_shared_http_pool
+from recruitair.api.model import OLlamaEvaluator
+
+
+@pytest.fixture
+def server():
+    with StubOllamaServer(delay=0.02) as stub:
+        yield stub
+
+
+def make_evaluator(url: str, http_pool: SharedHTTPPool) -> OLlamaEvaluator:
+    return OLlamaEvaluator(
+        model="dolphin3",
+        version="8b",
+        prompt_uri="prompts:/criteria-extraction/1",
+        ollama_base_url=url,
+        prompt_loader=lambda uri: make_prompt(),
+        http_pool=http_pool,
+    )
+
+
+def test_evaluators_share_kept_alive_connections(server):
+    http_pool = SharedHTTPPool()
+    evaluators = [make_evaluator(server.url, http_pool) for _ in range(3)]
+
+    for idx in range(9):
+        evaluators[idx % 3].evaluate(f"offer {idx}")
+
+    assert len(server.requests) == 9
+    assert http_pool.connections_opened == 1
+    idle = REGISTRY.get_sample_value("recruitair_ollama_http_pool_connections", {"transport": "sync", "state": "idle"})
+    assert idle == 1
+
+
+def test_async_calls_reuse_connections_and_respect_limit(server):
+    http_pool = SharedHTTPPool(max_connections=2)
+    evaluator = make_evaluator(server.url, http_pool)
+
+    async def run():
+        await asyncio.gather(*(evaluator.aevaluate(f"offer {i}") for i in range(8)))
+        await asyncio.gather(*(evaluator.aevaluate(f"offer {i}") for i in range(8)))
+
+    asyncio.run(run())
+
+    assert server.max_in_flight == 2
+    assert http_pool.connections_opened == 2
+
+
+def _connections(transport: str, state: str) -> float:
+    return REGISTRY.get_sample_value(
+        "recruitair_ollama_http_pool_connections", {"transport": transport, "state": state}
+    )
+
+
+def test_aclose_closes_the_async_connections(server):
+    http_pool = SharedHTTPPool(max_connections=2)
+    evaluator = make_evaluator(server.url, http_pool)
+
+    async def run():
+        await asyncio.gather(*(evaluator.aevaluate(f"offer {i}") for i in range(4)))
+        idle = _connections("async", "idle")
+        await http_pool.aclose()
+        return idle
+
+    idle = asyncio.run(run())
+
+    assert idle == 2
+    assert _connections("async", "idle") == 0
+    assert _connections("async", "active") == 0
+
+
+def test_closed_shared_pool_is_replaced():
+    closed = get_shared_http_pool()
+
+    asyncio.run(aclose_shared_http_pool())
+
+    assert get_shared_http_pool() is not closed
+    asyncio.run(aclose_shared_http_pool())
+
+
+def test_disabled_keepalive_opens_a_connection_per_call(server):
+    http_pool = SharedHTTPPool(max_keepalive_connections=0)
+    evaluator = make_evaluator(server.url, http_pool)
+
+    for idx in range(4):
+        evaluator.evaluate(f"offer {idx}")
+
+    assert http_pool.connections_opened == 4
@@ -0,0 +1,16 @@
+"""Lazy imports of the API and CLI entry points.
+
+Time and module-count budgets depend on the machine and the locked dependencies, so they are
+only checked by `python -m benchmarks.bench_import_time`.
+"""
+
+import pytest
+
+from benchmarks.bench_import_time import LAZY_MODULES, check_budget, profile_import
+
+
+@pytest.mark.parametrize("module", sorted(LAZY_MODULES))
+def test_entry_point_keeps_heavy_imports_lazy(module: str):
+    profile = profile_import(module)
+
+    assert check_budget(profile, float("inf"), LAZY_MODULES[module]) == []
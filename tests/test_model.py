@@ -0,0 +1,189 @@
+"""Unit tests for the OLlama evaluator, using a stubbed chat model and prompt."""
+
+# pylint: disable=W0621,W0212
+import asyncio
+import json
+
+import langchain_ollama
+import mlflow
+from prometheus_client import REGISTRY
+import pytest
+
+from benchmarks.stub_ollama import StubOllamaServer
+from benchmarks.stubs import StubChatOllama, make_prompt
+from recruitair.api.backends import BackendPool
+from recruitair.api.model import OLlamaEvaluator
+from recruitair.api.prompts import CompiledPrompt
+from recruitair.api.streaming import KeyCriteriaStreamParser
+
+
+@pytest.fixture
+def stub_ollama(monkeypatch: pytest.MonkeyPatch):
+    """Patch the evaluator so it uses the stub chat model and a local prompt."""
+    prompt = make_prompt()
+    monkeypatch.setattr(langchain_ollama, "ChatOllama", lambda **kwargs: StubChatOllama(delay=0.05, **kwargs))
+    monkeypatch.setattr(mlflow.genai, "load_prompt", lambda uri: prompt)
+    StubChatOllama.reset()
+    return StubChatOllama
+
+
+def test_evaluate_returns_structured_response(stub_ollama):
+    evaluator = OLlamaEvaluator(model="dolphin3", version="8b", prompt_uri="prompts:/criteria-extraction/1")
+
+    response = evaluator.evaluate("We need a Python developer")
+
+    assert response.key_criteria[0].description == "Python programming"
+    assert response.key_criteria[0].importance == 80
+    assert "We need a Python developer" in stub_ollama.requests[0]["messages"][0]["content"]
+
+
+def test_aevaluate_caps_concurrent_calls(stub_ollama):
+    evaluator = OLlamaEvaluator(
+        model="dolphin3", version="8b", prompt_uri="prompts:/criteria-extraction/1", max_concurrency=2
+    )
+
+    async def run_all():
+        return await asyncio.gather(*(evaluator.aevaluate(f"offer {i}") for i in range(6)))
+
+    responses = asyncio.run(run_all())
+
+    assert len(responses) == 6
+    assert all(r.key_criteria[0].importance == 80 for r in responses)
+    assert stub_ollama.max_in_flight == 2
+
+
+def test_warmup_runs_the_real_prompt_on_every_backend_with_ollama_options(stub_ollama):
+    evaluator = OLlamaEvaluator(
+        model="dolphin3",
+        version="8b",
+        prompt_uri="prompts:/criteria-extraction/1",
+        backend_pool=BackendPool(["http://ollama-a:11434", "http://ollama-b:11434"], health_check_interval=0),
+        ollama_options={"keep_alive": "30m", "num_ctx": 4096, "num_thread": None},
+        warmup_offer="Warm-up offer",
+        warmup_generations=2,
+    )
+
+    asyncio.run(evaluator.warmup())
+
+    assert len(stub_ollama.requests) == 4
+    for request in stub_ollama.requests:
+        assert request["messages"][0]["content"] == "Extract the key criteria of this job offer:\nWarm-up offer"
+        assert request["keep_alive"] == "30m"
+        assert request["options"]["num_ctx"] == 4096
+        assert "num_thread" not in request["options"]
+    for backend in ("http://ollama-a:11434", "http://ollama-b:11434"):
+        assert REGISTRY.get_sample_value("recruitair_model_warmup_seconds", {"backend": backend}) >= 0.1
+
+
+def test_context_window_is_the_smallest_bucket_fitting_the_prompt(stub_ollama):
+    evaluator = OLlamaEvaluator(
+        model="buckets",
+        version="8b",
+        prompt_uri="prompts:/criteria-extraction/1",
+        ollama_options={"num_ctx": 2048},
+        num_ctx_buckets=[4096, 1024],
+        chars_per_token=4,
+        expected_output_tokens=512,
+    )
+    labels = {"model": "buckets", "model_version": "8b", "prompt_version": "1"}
+
+    # ~20, ~2500 and ~5000 prompt tokens, plus the 512 reserved for the output
+    for offer in ("Python developer", "x" * 10_000, "x" * 20_000):
+        evaluator.evaluate(offer)
+
+    assert [request["options"]["num_ctx"] for request in stub_ollama.requests] == [1024, 4096, 4096]
+    for num_ctx, count in (("1024", 1), ("4096", 2)):
+        requests = REGISTRY.get_sample_value(
+            "recruitair_context_window_requests_total", {"num_ctx": num_ctx, **labels}
+        )
+        assert requests == count
+    assert REGISTRY.get_sample_value("recruitair_context_truncations_total", labels) == 1
+
+
+@pytest.mark.parametrize(
+    "template",
+    [
+        "Offer:\n{{ job_offer_text }}\nAgain: {{job_offer_text}}",
+        [
+            {"role": "system", "content": "You extract criteria."},
+            {"role": "user", "content": "Offer: {{ job_offer_text }}"},
+        ],
+    ],
+)
+def test_compiled_prompt_matches_mlflow_format(template):
+    prompt = make_prompt(template)
+    offer = "Senior C\\u engineer {{ not_a_variable }}"
+
+    assert CompiledPrompt.from_prompt_version(prompt).format(job_offer_text=offer) == prompt.format(
+        job_offer_text=offer
+    )
+
+
+def test_stream_parser_emits_criteria_as_they_close():
+    document = (
+        '{"key_criteria": [{"description": "Python {3.12} \\"expert\\"", "importance": 90},'
+        ' {"description": "SQL [advanced]", "importance": 40}]}'
+    )
+    parser = KeyCriteriaStreamParser()
+
+    emitted = []
+    for idx, char in enumerate(document):
+        for criterion in parser.feed(char):
+            emitted.append((idx, criterion))
+
+    assert [c.description for _, c in emitted] == ['Python {3.12} "expert"', "SQL [advanced]"]
+    # The first criterion is emitted right after its closing brace, not at the end
+    assert emitted[0][0] == document.index("90}") + 2
+
+
+def test_astream_criteria_streams_from_chat_model(stub_ollama, monkeypatch: pytest.MonkeyPatch):
+    content = json.dumps(
+        {"key_criteria": [{"description": f"criterion {i}", "importance": 10 * i} for i in range(1, 4)]}
+    )
+    monkeypatch.setattr(
+        langchain_ollama, "ChatOllama", lambda **kwargs: StubChatOllama(content=content, chunk_chars=7, **kwargs)
+    )
+    evaluator = OLlamaEvaluator(model="dolphin3", version="8b", prompt_uri="prompts:/criteria-extraction/1")
+
+    async def collect():
+        return [criterion async for criterion in evaluator.astream_criteria("offer")]
+
+    criteria = asyncio.run(collect())
+
+    assert [c.importance for c in criteria] == [10, 20, 30]
+
+
+@pytest.mark.parametrize("call", ["evaluate", "aevaluate"])
+def test_evaluation_stages_are_timed_with_model_and_prompt_labels(stub_ollama, call):
+    evaluator = OLlamaEvaluator(model=f"stages-{call}", version="8b", prompt_uri="prompts:/criteria-extraction/1")
+    labels = {"model": f"stages-{call}", "model_version": "8b", "prompt_version": "1"}
+
+    result = evaluator.evaluate("offer") if call == "evaluate" else asyncio.run(evaluator.aevaluate("offer"))
+
+    assert result.key_criteria[0].importance == 80
+    for stage in ("format", "queue_wait", "time_to_first_token", "generation", "parse_validate"):
+        count = REGISTRY.get_sample_value("recruitair_model_stage_latency_seconds_count", {"stage": stage, **labels})
+        assert count == 1, stage
+    ttft = REGISTRY.get_sample_value(
+        "recruitair_model_stage_latency_seconds_sum", {"stage": "time_to_first_token", **labels}
+    )
+    assert ttft >= 0.05
+    assert REGISTRY.get_sample_value("recruitair_llm_tokens_sum", {"kind": "prompt", **labels}) == 20
+
+
+def test_token_throughput_comes_from_ollama_metadata():
+    labels = {"model": "throughput", "model_version": "8b", "prompt_version": "1"}
+    with StubOllamaServer(delay=0.01, tokens_per_second=400) as server:
+        evaluator = OLlamaEvaluator(
+            model="throughput",
+            version="8b",
+            prompt_uri="prompts:/criteria-extraction/1",
+            ollama_base_url=server.url,
+            prompt_loader=lambda uri: make_prompt(),
+        )
+        evaluator.evaluate("offer")
+
+    completion_tokens = REGISTRY.get_sample_value("recruitair_llm_tokens_sum", {"kind": "completion", **labels})
+    assert completion_tokens == server.eval_count
+    eval_rate = REGISTRY.get_sample_value("recruitair_llm_tokens_per_second_sum", {"phase": "eval", **labels})
+    assert eval_rate == pytest.approx(400, rel=0.01)
@@ -0,0 +1,47 @@
+"""Tests of /metrics aggregation across worker processes, each run in its own interpreter."""
+
+import os
+import subprocess
+import sys
+
+WORKER = """
+import os
+from recruitair.api.monitoring import ADMISSION_IN_FLIGHT, EVAL_REQUESTS_TOTAL
+EVAL_REQUESTS_TOTAL.inc(3)
+ADMISSION_IN_FLIGHT.labels(lane="bulk").set(2)
+print(os.getpid())
+"""
+
+SCRAPE = """
+import sys
+from fastapi.testclient import TestClient
+from prometheus_client import multiprocess
+from recruitair.api.main import app
+for pid in sys.argv[1:]:
+    multiprocess.mark_process_dead(int(pid))
+print(TestClient(app).get("/metrics").text)
+"""
+
+
+def _python(code: str, env: dict, *args: str) -> str:
+    return subprocess.run(
+        [sys.executable, "-c", code, *args], env=env, check=True, capture_output=True, text=True
+    ).stdout
+
+
+def _sample(text: str, name: str) -> float:
+    return next(float(line.split()[-1]) for line in text.splitlines() if line.startswith(name))
+
+
+def test_metrics_aggregate_every_worker(tmp_path):
+    env = os.environ | {"PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    pids = [_python(WORKER, env).strip() for _ in range(2)]
+
+    metrics = _python(SCRAPE, env)
+    assert _sample(metrics, "recruitair_eval_requests_total ") == 6
+    assert _sample(metrics, 'recruitair_admission_in_flight{lane="bulk"}') == 4
+
+    # A dead worker's counters are kept, its live gauges are dropped
+    metrics = _python(SCRAPE, env, pids[0])
+    assert _sample(metrics, "recruitair_eval_requests_total ") == 6
+    assert _sample(metrics, 'recruitair_admission_in_flight{lane="bulk"}') == 2
@@ -0,0 +1,166 @@
+"""Tests of the MinHash near-duplicate index and of the evaluator wrapper reusing its results."""
+
+import asyncio
+
+import numpy as np
+from prometheus_client import REGISTRY
+
+from recruitair.api.cache import CachedEvaluator, InMemoryLRUCache, SQLiteResultCache, TieredResultCache
+from recruitair.api.minhash import MinHashIndex
+from recruitair.api.model import BaseEvaluatorModel
+from recruitair.api.near_duplicates import (
+    ApproximateKeyCriteriaResponse,
+    ApproximateKeyCriterion,
+    NearDuplicateEvaluator,
+)
+from recruitair.job_offers.models import KeyCriteriaResponse, KeyCriterion
+
+OFFER = """Senior Data Engineer - Barcelona
+
+About the role:
+You will design and run the batch and streaming pipelines behind our recommendation products,
+working closely with data scientists and the platform team.
+
+Requirements:
+- 5+ years of experience building data pipelines in Python
+- Strong SQL skills and experience with Spark or Flink
+- Experience with Airflow or a similar workflow orchestrator
+- Familiarity with AWS services such as S3, EMR and Glue
+- Good communication skills in English
+
+Salary: 55,000 - 65,000 EUR per year.
+"""
+
+REPOST = """Senior Data Engineer - Madrid (hybrid)
+
+About the role:
+You will design and run the batch and streaming pipelines behind our recommendation products,
+working closely with data scientists and the platform team.
+
+Requirements:
+- Strong SQL skills and experience with Spark or Flink
+- 5+ years of experience building data pipelines in Python
+- Experience with Airflow or a similar workflow orchestrator
+- Familiarity with AWS services such as S3, EMR and Glue
+- Good communication skills in English
+
+Salary: 60,000 - 70,000 EUR per year.
+"""
+
+OTHER = """Frontend Developer
+
+We are looking for a React developer to build our customer dashboards. You know TypeScript,
+CSS and accessibility best practices, and you have shipped design systems before.
+"""
+
+
+def response(description: str) -> KeyCriteriaResponse:
+    return KeyCriteriaResponse(key_criteria=[KeyCriterion(description=description, importance=80)])
+
+
+def test_edited_repost_is_found_and_unrelated_offer_is_not():
+    index = MinHashIndex(threshold=0.6, num_perm=128)
+    index.add(OFFER, response("Python data pipelines"))
+
+    found = index.lookup(REPOST)
+
+    assert found is not None
+    assert found[0].key_criteria[0].description == "Python data pipelines"
+    assert 0.6 <= found[1] < 1
+    assert index.lookup(OTHER) is None
+
+
+def test_bands_find_pairs_at_the_threshold():
+    for threshold in (0.5, 0.8, 0.9):
+        index = MinHashIndex(threshold=threshold, num_perm=64)
+        assert index.bands * index.rows == 64
+        assert 1 - (1 - threshold**index.rows) ** index.bands >= 0.99
+
+
+def test_lookup_covers_merged_and_pending_entries():
+    index = MinHashIndex(num_perm=64, max_entries=10_000)
+    signatures = np.random.default_rng(0).integers(0, 2**32, size=(3000, 64), dtype=np.uint64).astype(np.uint32)
+    index.add_signatures(signatures, [response(f"offer {idx}") for idx in range(3000)])
+
+    assert len(index) == 3000
+    # 2048 entries are in the sorted band orders, the last ones are still pending
+    for idx in (0, 1500, 2047, 2048, 2999):
+        found = index.lookup_signature(signatures[idx])
+        assert found is not None
+        assert found[0].key_criteria[0].description == f"offer {idx}"
+        assert found[1] == 1.0
+    unseen = np.random.default_rng(1).integers(0, 2**32, size=64, dtype=np.uint64).astype(np.uint32)
+    assert index.lookup_signature(unseen) is None
+
+
+def test_index_drops_the_oldest_entries_beyond_max_entries():
+    index = MinHashIndex(num_perm=64, max_entries=100)
+    signatures = np.random.default_rng(2).integers(0, 2**32, size=(130, 64), dtype=np.uint64).astype(np.uint32)
+    for idx in range(130):
+        index.add_signatures(signatures[idx : idx + 1], [response(f"offer {idx}")])
+
+    assert len(index) <= 100
+    assert index.lookup_signature(signatures[0]) is None
+    assert index.lookup_signature(signatures[129])[0].key_criteria[0].description == "offer 129"
+
+
+class CountingModel(BaseEvaluatorModel):
+    def __init__(self):
+        self.calls = 0
+
+    def evaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        self.calls += 1
+        return response(f"call {self.calls}")
+
+
+def test_near_duplicates_reuse_criteria_without_calling_the_model():
+    inner = CountingModel()
+    evaluator = NearDuplicateEvaluator(inner, MinHashIndex(threshold=0.6, num_perm=128))
+    hits_before = REGISTRY.get_sample_value("recruitair_near_duplicate_lookups_total", {"result": "hit"}) or 0
+
+    first = asyncio.run(evaluator.aevaluate(OFFER))
+    reused = asyncio.run(evaluator.aevaluate(REPOST))
+    other = evaluator.evaluate(OTHER)
+
+    assert inner.calls == 2
+    assert not isinstance(first, ApproximateKeyCriteriaResponse)
+    assert isinstance(reused, ApproximateKeyCriteriaResponse)
+    assert reused.key_criteria == first.key_criteria
+    assert other.key_criteria[0].description == "call 2"
+    assert REGISTRY.get_sample_value("recruitair_near_duplicate_lookups_total", {"result": "hit"}) == hits_before + 1
+
+
+def test_reused_results_are_not_indexed():
+    index = MinHashIndex(threshold=0.6, num_perm=128)
+    evaluator = NearDuplicateEvaluator(CountingModel(), index)
+
+    evaluator.evaluate(OFFER)
+    evaluator.evaluate(REPOST)
+
+    assert len(index) == 1
+
+
+def test_reused_results_are_not_stored_as_exact_results_in_the_result_cache(tmp_path):
+    inner = CountingModel()
+    near_duplicates = NearDuplicateEvaluator(inner, MinHashIndex(threshold=0.6, num_perm=128))
+    disk = SQLiteResultCache(tmp_path / "cache.sqlite")
+
+    def stack() -> CachedEvaluator:
+        # A fresh memory tier over the same disk tier, as after an eviction or a restart
+        return CachedEvaluator(near_duplicates, TieredResultCache([InMemoryLRUCache(), disk]), key_parts=["m"])
+
+    stack().evaluate(OFFER)
+    reused = asyncio.run(stack().aevaluate(REPOST))
+
+    async def stream():
+        return [criterion async for criterion in stack().astream_criteria(REPOST)]
+
+    streamed = asyncio.run(stream())
+    again = stack().evaluate(REPOST)
+
+    assert inner.calls == 1
+    assert len(disk) == 1
+    assert isinstance(reused, ApproximateKeyCriteriaResponse)
+    assert all(isinstance(criterion, ApproximateKeyCriterion) for criterion in streamed)
+    assert isinstance(again, ApproximateKeyCriteriaResponse)
+    assert again.similarity == reused.similarity
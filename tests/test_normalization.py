@@ -0,0 +1,129 @@
+"""Unit tests for the offer text pre-normalization pipeline."""
+
+import asyncio
+
+import pytest
+
+from recruitair.api.chunking import ChunkedEvaluator
+from recruitair.api.model import BaseEvaluatorModel
+from recruitair.api.normalization import (
+    NORMALIZATION_STEPS,
+    BoilerplateFilter,
+    NormalizingEvaluator,
+    OfferNormalizer,
+    collapse_whitespace,
+    strip_markup,
+)
+from recruitair.job_offers.models import KeyCriteriaResponse
+
+HTML_OFFER = """
+<div class="offer"><h2>Data Engineer</h2>
+<p>We are looking for a&nbsp;<b>Data Engineer</b> with 3+ years of   experience.</p>
+<style>.offer { color: red }</style><!-- tracking pixel -->
+<h3>Requirements:</h3>
+<ul><li>Python &amp; SQL</li><li>Airflow</li></ul>
+<h3>Benefits:</h3>
+<ul><li>Private health insurance</li><li>Gym membership</li></ul>
+<h3>Nice to have:</h3>
+<p>Experience with Spark.</p>
+<p>Acme is an Equal Opportunity Employer. All applicants will be considered without regard to race.</p>
+</div>
+"""
+
+
+def test_strip_markup_keeps_block_structure():
+    text = strip_markup("<p>Python &amp; SQL</p><ul><li>Airflow</li></ul><script>alert(1)</script>")
+
+    assert text == "Python & SQL\n\n- Airflow\n\n"
+
+
+def test_collapse_whitespace():
+    assert collapse_whitespace("  Python\t\t and SQL \r\n\n\n\n Airflow  ") == "Python and SQL\n\nAirflow"
+
+
+def test_boilerplate_filter_drops_sections_and_paragraphs():
+    text = "Requirements:\nPython\n\nWhat we offer:\nFree lunch\nRemote work\n\nNice to have:\nSpark"
+
+    assert BoilerplateFilter()(text) == "Requirements:\nPython\n\nNice to have:\nSpark"
+
+
+def test_boilerplate_sections_end_at_plain_headings_and_paragraphs():
+    text = (
+        "Data Engineer\n\n"
+        "About us\nWe are a fast-growing startup.\n\n"
+        "Responsibilities\nBuild data pipelines.\n\n"
+        "Requirements\nPython and SQL.\n\n"
+        "Benefits\nHealth insurance.\n\n"
+        "You will report to the CTO."
+    )
+
+    assert BoilerplateFilter()(text) == (
+        "Data Engineer\n\n"
+        "Responsibilities\nBuild data pipelines.\n\n"
+        "Requirements\nPython and SQL.\n\n"
+        "You will report to the CTO."
+    )
+
+
+def test_boilerplate_filter_never_empties_an_offer():
+    text = "We are an equal opportunity employer looking for a Python developer."
+
+    assert BoilerplateFilter()(text) == text
+
+
+def test_full_pipeline_cuts_tokens_and_keeps_requirements():
+    normalize = OfferNormalizer.from_names(NORMALIZATION_STEPS)
+
+    text = normalize(HTML_OFFER)
+
+    assert text == (
+        "Data Engineer\n\n"
+        "We are looking for a Data Engineer with 3+ years of experience.\n\n"
+        "Requirements:\n\n"
+        "- Python & SQL\n\n"
+        "- Airflow\n\n"
+        "Nice to have:\n\n"
+        "Experience with Spark."
+    )
+    assert len(text) < len(HTML_OFFER) / 2
+
+
+def test_custom_boilerplate_patterns():
+    normalize = OfferNormalizer.from_names(["drop_boilerplate"], boilerplate_paragraphs=[r"apply (now|today)"])
+
+    assert normalize("Python developer.\n\nApply now on our website!") == "Python developer."
+
+
+def test_unknown_step_is_rejected():
+    with pytest.raises(ValueError):
+        OfferNormalizer.from_names(["strip_markup", "lowercase"])
+
+
+class RecordingModel(BaseEvaluatorModel):
+    """Records the offers it is asked to evaluate."""
+
+    def __init__(self):
+        self.offers = []
+
+    def evaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        self.offers.append(job_offer)
+        return KeyCriteriaResponse(key_criteria=[])
+
+    async def aevaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        return self.evaluate(job_offer)
+
+
+def test_offers_are_normalized_before_chunking():
+    inner = RecordingModel()
+    evaluator = NormalizingEvaluator(
+        ChunkedEvaluator(inner, threshold_chars=1000, chunk_chars=500, overlap_chars=50),
+        OfferNormalizer.from_names(NORMALIZATION_STEPS),
+    )
+    # Long because of its markup only
+    offer = HTML_OFFER + "<div class=\"footer\">" * 200 + "</div>"
+
+    asyncio.run(evaluator.aevaluate(offer))
+
+    assert len(offer) > 1000
+    assert len(inner.offers) == 1
+    assert "<" not in inner.offers[0]
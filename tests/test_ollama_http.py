@@ -0,0 +1,84 @@
+"""Tests of the direct-HTTP Ollama evaluator against the stub Ollama server."""
+
+import asyncio
+
+from prometheus_client import REGISTRY
+import pytest
+
+from benchmarks.stub_ollama import StubOllamaServer
+from benchmarks.stubs import make_prompt
+from recruitair.api.backends import BackendPool, OllamaResponseError
+from recruitair.api.ollama_http import OllamaHTTPEvaluator
+from recruitair.job_offers.models import KeyCriteriaResponse
+
+
+def make_evaluator(url: str, prompt=None, model: str = "http-client", **kwargs) -> OllamaHTTPEvaluator:
+    return OllamaHTTPEvaluator(
+        model=model,
+        version="8b",
+        prompt_uri="prompts:/criteria-extraction/1",
+        prompt_loader=lambda uri: prompt or make_prompt(),
+        backend_pool=BackendPool([url], health_check_interval=0),
+        **kwargs,
+    )
+
+
+def test_sync_async_and_streamed_calls_send_one_chat_request():
+    with StubOllamaServer(chunk_chars=7) as server:
+        evaluator = make_evaluator(server.url, ollama_options={"keep_alive": "30m", "num_ctx": 4096})
+
+        async def async_calls():
+            response = await evaluator.aevaluate("Python developer")
+            return response, [criterion async for criterion in evaluator.astream_criteria("Python developer")]
+
+        response, streamed = asyncio.run(async_calls())
+        responses = [evaluator.evaluate("Python developer"), response]
+
+    assert all(r.key_criteria[0].description == "Python programming" for r in responses)
+    assert [c.importance for c in streamed] == [80]
+    request = server.requests[0]
+    assert request["model"] == "http-client:8b"
+    assert request["messages"] == [
+        {"role": "user", "content": "Extract the key criteria of this job offer:\nPython developer"}
+    ]
+    assert request["format"] == KeyCriteriaResponse.model_json_schema()
+    assert request["options"] == {"temperature": 0, "num_ctx": 4096}
+    assert request["keep_alive"] == "30m"
+    assert request["stream"] is True
+
+
+def test_chat_prompts_keep_their_roles():
+    template = [
+        {"role": "system", "content": "You extract criteria."},
+        {"role": "user", "content": "Offer: {{ job_offer_text }}"},
+    ]
+    with StubOllamaServer() as server:
+        make_evaluator(server.url, prompt=make_prompt(template)).evaluate("SQL analyst")
+
+    assert server.requests[0]["messages"] == [
+        {"role": "system", "content": "You extract criteria."},
+        {"role": "user", "content": "Offer: SQL analyst"},
+    ]
+
+
+def test_token_usage_comes_from_the_last_streamed_part():
+    labels = {"model": "http-tokens", "model_version": "8b", "prompt_version": "1"}
+    with StubOllamaServer(tokens_per_second=400) as server:
+        make_evaluator(server.url, model="http-tokens").evaluate("offer")
+
+    assert REGISTRY.get_sample_value("recruitair_llm_tokens_sum", {"kind": "completion", **labels}) == server.eval_count
+
+
+@pytest.mark.parametrize("call", ["evaluate", "aevaluate"])
+def test_ollama_errors_raise_and_count_against_the_backend(call):
+    with StubOllamaServer(error_rate=1.0) as server:
+        evaluator = make_evaluator(server.url)
+        with pytest.raises(OllamaResponseError) as exc_info:
+            if call == "evaluate":
+                evaluator.evaluate("offer")
+            else:
+                asyncio.run(evaluator.aevaluate("offer"))
+
+    assert exc_info.value.status_code == 500
+    assert exc_info.value.error == "stub backend is failing"
+    assert evaluator._pool.backends[0].consecutive_failures == 1  # pylint: disable=W0212
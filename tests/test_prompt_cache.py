@@ -0,0 +1,78 @@
+"""Unit tests for the local prompt snapshot cache."""
+
+from pathlib import Path
+
+from benchmarks.stubs import make_prompt
+from recruitair.api.prompt_cache import PromptSnapshotCache
+from recruitair.api.prompts import CompiledPrompt
+from recruitair.job_offers.models import KeyCriteriaResponse
+
+URI = "prompts:/criteria-extraction/1"
+
+
+class CountingLoader:
+    def __init__(self, template: str = "Offer: {{ job_offer_text }}", fail: bool = False):
+        self.template = template
+        self.fail = fail
+        self.calls = 0
+
+    def __call__(self, prompt_uri: str):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("MLflow is down")
+        return make_prompt(self.template)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_cold_start_loads_from_mlflow_and_persists(tmp_path: Path):
+    loader = CountingLoader()
+    prompt = PromptSnapshotCache(tmp_path, loader=loader).load(URI)
+
+    assert loader.calls == 1
+    assert isinstance(prompt, CompiledPrompt)
+    assert prompt.format(job_offer_text="x") == "Offer: x"
+    assert len(list(tmp_path.glob("*.json"))) == 1
+
+
+def test_warm_start_serves_snapshot_without_mlflow(tmp_path: Path):
+    PromptSnapshotCache(tmp_path, loader=CountingLoader()).load(URI)
+
+    loader = CountingLoader(fail=True)
+    prompt = PromptSnapshotCache(tmp_path, loader=loader).load(URI)
+
+    assert loader.calls == 0
+    assert prompt.format(job_offer_text="x") == "Offer: x"
+    assert prompt.response_format == KeyCriteriaResponse.model_json_schema()
+
+
+def test_stale_snapshot_is_refreshed_in_background(tmp_path: Path):
+    clock = FakeClock()
+    PromptSnapshotCache(tmp_path, ttl_seconds=60, loader=CountingLoader(), clock=clock).load(URI)
+
+    clock.now += 120
+    loader = CountingLoader(template="New offer: {{ job_offer_text }}")
+    cache = PromptSnapshotCache(tmp_path, ttl_seconds=60, loader=loader, clock=clock)
+    stale = cache.load(URI)
+    cache.refresh_in_background(URI).join(timeout=5)
+
+    assert stale.format(job_offer_text="x") == "Offer: x"
+    assert loader.calls == 1
+    assert PromptSnapshotCache(tmp_path, loader=CountingLoader(fail=True)).load(URI).format(
+        job_offer_text="x"
+    ) == "New offer: x"
+
+
+def test_snapshots_are_namespaced_by_tracking_server(tmp_path: Path):
+    PromptSnapshotCache(tmp_path, namespace="http://mlflow-a", loader=CountingLoader()).load(URI)
+
+    loader = CountingLoader()
+    PromptSnapshotCache(tmp_path, namespace="http://mlflow-b", loader=loader).load(URI)
+
+    assert loader.calls == 1
@@ -0,0 +1,98 @@
+"""Unit tests for single-flight coalescing of identical evaluations."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+
+import pytest
+
+from recruitair.api.model import BaseEvaluatorModel
+from recruitair.api.singleflight import SingleFlightEvaluator
+from recruitair.job_offers.models import KeyCriteriaResponse, KeyCriterion
+
+
+class SlowModel(BaseEvaluatorModel):
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.calls = 0
+        self.cancelled = 0
+        self._lock = threading.Lock()
+
+    def evaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        with self._lock:
+            self.calls += 1
+        threading.Event().wait(self.delay)
+        return KeyCriteriaResponse(key_criteria=[KeyCriterion(description=job_offer, importance=70)])
+
+    async def aevaluate(self, job_offer: str) -> KeyCriteriaResponse:
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if job_offer == "fail":
+            raise RuntimeError("model failure")
+        return KeyCriteriaResponse(key_criteria=[KeyCriterion(description=job_offer, importance=70)])
+
+
+def test_concurrent_identical_requests_share_one_call():
+    inner = SlowModel()
+    model = SingleFlightEvaluator(inner, key_parts=("dolphin3", "8b"))
+
+    async def run():
+        return await asyncio.gather(*(model.aevaluate(offer) for offer in ["a", "a", "a ", "b"]))
+
+    responses = asyncio.run(run())
+
+    assert inner.calls == 2
+    assert responses[0] is responses[1] is responses[2]
+    assert responses[3].key_criteria[0].description == "b"
+
+
+def test_errors_are_shared_and_not_cached():
+    inner = SlowModel()
+    model = SingleFlightEvaluator(inner, key_parts=())
+
+    async def run():
+        return await asyncio.gather(model.aevaluate("fail"), model.aevaluate("fail"), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(model.aevaluate("fail"))
+    assert inner.calls == 2
+
+
+def test_upstream_call_cancelled_only_when_all_waiters_leave():
+    inner = SlowModel(delay=0.2)
+    model = SingleFlightEvaluator(inner, key_parts=())
+
+    async def run():
+        first = asyncio.ensure_future(model.aevaluate("a"))
+        second = asyncio.ensure_future(model.aevaluate("a"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        response = await second
+        assert inner.cancelled == 0
+
+        third = asyncio.ensure_future(model.aevaluate("b"))
+        await asyncio.sleep(0.01)
+        third.cancel()
+        await asyncio.sleep(0.01)
+        return response
+
+    assert asyncio.run(run()).key_criteria[0].description == "a"
+    assert inner.cancelled == 1
+
+
+def test_sync_evaluate_coalesces_across_threads():
+    inner = SlowModel(delay=0.1)
+    model = SingleFlightEvaluator(inner, key_parts=())
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        responses = list(pool.map(model.evaluate, ["a"] * 4))
+
+    assert inner.calls == 1
+    assert all(r is responses[0] for r in responses)